@@ -0,0 +1,99 @@
+"""
+Ingest throughput and query latency of the price history store. Simulates
+daily runs over a catalogue where a small share of prices, stock states and
+delivery prices change each day, then times a product's history over a
+range, its state on a past day and a page of the change feed.
+
+    python benchmarks/history_benchmark.py --products 100000 --days 30
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from canonical import product_key  # noqa: E402
+from price_history import PriceHistory  # noqa: E402
+
+STOCK = ["In Stock", "Limited Stock", "Out of Stock"]
+OPTIONS = [("Standard", 0.0), ("Express", 9.99), ("One-Day", 14.99)]
+BATCH_SIZE = 500
+
+
+def record(index: int, day: int, started: datetime, change_rate: float) -> dict:
+    """Snapshot of product ``index`` on ``day``; values drift on a stable per-product schedule"""
+    rng = random.Random(index * 7919 + day)
+    drift = sum(1 for past in range(day + 1) if random.Random(index * 104729 + past).random() < change_rate)
+    price = f"${10 + index % 990 + drift * 0.5:,.2f}"
+    url = f"https://www.amazon.com/dp/B{index:09d}"
+    scenarios = {
+        f"qty_{quantity}": {
+            'scenario_name': f"qty_{quantity}",
+            'delivery_options': [
+                {'company': "Amazon", 'type': kind, 'eta': "Tomorrow",
+                 'price': "FREE" if not fee else f"${fee + (drift % 3):.2f}"}
+                for kind, fee in OPTIONS
+            ],
+        }
+        for quantity in (1, 5)
+    }
+    return {
+        'store': "amazon.com", 'url': url, 'timestamp': started + timedelta(days=day, seconds=rng.random()),
+        'product': {'name': f"Product {index}", 'price': price, 'product_url': url,
+                    'stock_status': STOCK[drift % len(STOCK)]},
+        'scenarios': scenarios,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--products', type=int, default=100000, help='Products scraped each day')
+    parser.add_argument('--days', type=int, default=30, help='Daily runs to ingest')
+    parser.add_argument('--change-rate', type=float, default=0.05, help='Share of products changing per day')
+    args = parser.parse_args()
+
+    started = datetime(2025, 1, 1)
+    platform_of = lambda url: 'amazon'
+    with tempfile.TemporaryDirectory() as directory:
+        history = PriceHistory(os.path.join(directory, "history.sqlite3"))
+        changes = 0
+        for day in range(args.days):
+            ingest_started = time.perf_counter()
+            day_changes = 0
+            for start in range(0, args.products, BATCH_SIZE):
+                batch = [record(index, day, started, args.change_rate)
+                         for index in range(start, min(start + BATCH_SIZE, args.products))]
+                day_changes += history.ingest(batch, platform_of)
+            elapsed = time.perf_counter() - ingest_started
+            changes += day_changes
+            if day in (0, 1) or day == args.days - 1:
+                print(f"  day {day + 1:>3}: {day_changes:>9} changes  "
+                      f"{args.products / elapsed:8.0f} snapshots/s  ({changes} stored)")
+
+        keys = [product_key(f"https://www.amazon.com/dp/B{index:09d}", 'amazon')
+                for index in random.Random(1).sample(range(args.products), 200)]
+        middle = started + timedelta(days=args.days // 2)
+
+        def timed(label: str, func):
+            query_started = time.perf_counter()
+            for key in keys:
+                func(key)
+            print(f"  {label:<22} {(time.perf_counter() - query_started) / len(keys) * 1e3:7.2f} ms/query")
+
+        print(f"Queries ({os.path.getsize(history.path) / 1024 / 1024:.0f} MiB database):")
+        timed("history, last 7 days", lambda key: history.history(key, started + timedelta(days=args.days - 7)))
+        timed("full history", history.history)
+        timed("state at mid-range", lambda key: history.state_at(key, middle))
+        feed_started = time.perf_counter()
+        page = history.changes(after=changes // 2, limit=10000)
+        print(f"  {'feed page (10000)':<22} {(time.perf_counter() - feed_started) * 1e3:7.2f} ms ({len(page)} rows)")
+        history.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Throughput of price, rating and review normalization over flattened output
+rows (one row per delivery option, so each product's values repeat): a
+per-value regex parser in a Python loop, as the scrapers used before
+``normalize``, against the vectorized ``normalize`` functions.
+
+    python benchmarks/normalize_benchmark.py --rows 1000000
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from normalize import normalize_prices, normalize_ratings, normalize_reviews  # noqa: E402
+
+PRICE_FORMATS = ["${:,.2f}", "₦ {:,.0f}", "from {:.2f} €", "KSh {:,.0f}", "EGP {:,.2f}", "CDN$ {:.2f}"]
+ROWS_PER_PRODUCT = 9
+
+
+def sample_columns(rows: int):
+    """Price, rating and review columns of ``rows`` output rows"""
+    random.seed(7)
+    prices, ratings, reviews = [], [], []
+    for _ in range(rows // ROWS_PER_PRODUCT + 1):
+        price = random.choice(PRICE_FORMATS).format(random.uniform(1, 5000))
+        if random.random() < 0.1:
+            price = price.replace(".", ",")
+        rating = f"{random.randint(10, 50) / 10} out of 5 stars"
+        review = f"{random.randint(0, 50000):,} ratings"
+        prices.extend([price] * ROWS_PER_PRODUCT)
+        ratings.extend([rating] * ROWS_PER_PRODUCT)
+        reviews.extend([review] * ROWS_PER_PRODUCT)
+    return prices[:rows], ratings[:rows], reviews[:rows]
+
+
+def parse_price_value(text):
+    """The per-value baseline: "$1,299.99" or "1.299,99 €" -> float"""
+    match = re.search(r'\d[\d.,\s]*', text or '')
+    if not match:
+        return None
+    number = re.sub(r'\s', '', match.group(0)).rstrip('.,')
+    if ',' in number and '.' in number:
+        decimal = ',' if number.rfind(',') > number.rfind('.') else '.'
+        number = number.replace('.' if decimal == ',' else ',', '').replace(decimal, '.')
+    elif ',' in number:
+        whole, _, fraction = number.rpartition(',')
+        number = f"{whole.replace(',', '')}.{fraction}" if len(fraction) != 3 else number.replace(',', '')
+    elif number.count('.') > 1:
+        number = number.replace('.', '')
+    try:
+        return float(number)
+    except ValueError:
+        return None
+
+
+def parse_reviews(text):
+    numbers = re.findall(r'\d+', (text or '').replace(',', ''))
+    return numbers[0] if numbers else None
+
+
+def per_value(prices, ratings, reviews):
+    amounts = [parse_price_value(price) for price in prices]
+    scores = []
+    for rating in ratings:
+        try:
+            scores.append(float(rating))
+        except (TypeError, ValueError):
+            scores.append(None)
+    counts = [parse_reviews(review) for review in reviews]
+    return amounts, scores, counts
+
+
+def vectorized(prices, ratings, reviews):
+    return normalize_prices(prices), normalize_ratings(ratings), normalize_reviews(reviews)
+
+
+def measure(label: str, rows: int, func, *args):
+    started = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - started
+    print(f"  {label:<11} {elapsed:7.2f}s  {rows / elapsed / 1e6:6.2f}M rows/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000, help='Number of rows to normalize')
+    args = parser.parse_args()
+
+    columns = sample_columns(args.rows)
+    print(f"Price, rating and review columns, {args.rows} rows:")
+    measure("per value", args.rows, per_value, *columns)
+    measure("vectorized", args.rows, vectorized, *columns)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""
+Per-record CPU time and peak memory of deriving JSON + CSV output from a
+result stream: the previous path (one ``ScrapedResult`` per line, ``.dict()``,
+a dict copy per delivery option, a pandas frame per chunk) against the
+batch-validated ``RecordBatch`` path.
+
+    python benchmarks/records_benchmark.py --results 20000
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import tempfile
+import textwrap
+import time
+import tracemalloc
+import warnings
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from product_schema import CheckoutScenario, DeliveryOption, ProductData, ScrapedResult, StockStatus  # noqa: E402
+from records import COLUMNS, dump_record, read_batches  # noqa: E402
+from result_sink import NdjsonSink, iter_lines  # noqa: E402
+
+CHUNK_SIZE = 500
+
+
+def sample_result(index: int) -> ScrapedResult:
+    """A product with three quantity scenarios of three delivery options each"""
+    product = ProductData(
+        name=f"Sample product {index}", price="$1,299.99", currency="USD",
+        product_url=f"https://www.amazon.com/dp/B{index:09d}",
+        image_urls=["https://example.com/1.jpg", "https://example.com/2.jpg"],
+        stock_status=StockStatus.IN_STOCK, rating="4.5", reviews="1,234 ratings", seller="Sample seller"
+    )
+    options = [("Standard", "FREE"), ("Express", "$9.99"), ("One-Day", "$14.99")]
+    scenarios = {
+        f"qty_{quantity}": CheckoutScenario(
+            scenario_name=f"qty_{quantity}", screenshot_path=f"screenshots/{index}_{quantity}.png",
+            delivery_options=[DeliveryOption(company="Amazon", type=kind, price=price, eta="Tomorrow")
+                              for kind, price in options]
+        )
+        for quantity in (1, 2, 3)
+    }
+    return ScrapedResult(store="amazon", url=product.product_url, product=product, scenarios=scenarios)
+
+
+def legacy_rows(result: ScrapedResult):
+    """The flattening ``OutputWriter`` used before ``RecordBatch``"""
+    product = result.product
+    base = {
+        'store': result.store, 'url': result.url, 'name': product.name, 'price': product.price,
+        'currency': product.currency, 'discount_price': product.discount_price, 'sku': product.sku,
+        'brand': product.brand, 'category': product.category, 'product_url': product.product_url,
+        'image_url': product.image_urls[0] if product.image_urls else '',
+        'stock_status': product.stock_status, 'rating': product.rating, 'reviews': product.reviews,
+        'seller': product.seller, 'success': result.success, 'error_message': result.error_message,
+        'failure_kind': result.failure_kind, 'timestamp': result.timestamp,
+    }
+    rows = []
+    for name, scenario in result.scenarios.items():
+        for option in scenario.delivery_options:
+            row = base.copy()
+            row.update({'scenario': name, 'delivery_company': option.company, 'delivery_type': option.type,
+                        'delivery_price': option.price, 'eta': option.eta,
+                        'screenshot': scenario.screenshot_path})
+            rows.append(row)
+    return rows or [base]
+
+
+def legacy_outputs(path: str):
+    json_out, csv_out = open(os.devnull, 'w'), open(os.devnull, 'w')
+    chunk = []
+
+    def flush(header):
+        frame = pd.DataFrame([row for result in chunk for row in legacy_rows(result)], columns=COLUMNS)
+        frame.to_csv(csv_out, header=header, index=False)
+        chunk.clear()
+
+    header = True
+    for _, line in iter_lines(path):
+        result = ScrapedResult(**json.loads(line))
+        json_out.write(textwrap.indent(json.dumps(result.dict(), indent=2, ensure_ascii=False, default=str), "  "))
+        chunk.append(result)
+        if len(chunk) == CHUNK_SIZE:
+            flush(header)
+            header = False
+    if chunk:
+        flush(header)
+
+
+def batch_outputs(path: str):
+    json_out, csv_out = open(os.devnull, 'wb'), open(os.devnull, 'w')
+    writer = csv.writer(csv_out, lineterminator="\n")
+    writer.writerow(COLUMNS)
+    for batch in read_batches(path, batch_size=CHUNK_SIZE):
+        for record in batch.records:
+            json_out.write(dump_record(record, indent=2).replace(b"\n", b"\n  "))
+        writer.writerows(batch.rows())
+
+
+def legacy_sink_line(result: ScrapedResult) -> bytes:
+    return json.dumps(result.dict(), ensure_ascii=False, default=str).encode('utf-8')
+
+
+def sink_line(result: ScrapedResult) -> bytes:
+    return result.model_dump_json().encode('utf-8')
+
+
+def measure(label: str, count: int, func, *args):
+    """CPU time of one run, then peak allocations of a second, traced run"""
+    started = time.process_time()
+    func(*args)
+    elapsed = time.process_time() - started
+    tracemalloc.start()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<8} {elapsed / count * 1e6:8.1f} us/record   peak {peak / 1024 / 1024:7.1f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--results', type=int, default=20000, help='Number of results in the stream')
+    args = parser.parse_args()
+
+    # ``.dict()`` warns on pydantic 2; the warnings are not part of the comparison
+    warnings.simplefilter('ignore', DeprecationWarning)
+
+    results = [sample_result(index) for index in range(min(args.results, 1000))]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "results.ndjson")
+        with NdjsonSink(path, flush_every=CHUNK_SIZE) as sink:
+            for index in range(args.results):
+                sink.write(index, results[index % len(results)])
+
+        print(f"Sink serialization ({len(results)} results):")
+        measure("before", len(results), lambda: [legacy_sink_line(result) for result in results])
+        measure("after", len(results), lambda: [sink_line(result) for result in results])
+
+        print(f"JSON + CSV from the stream ({args.results} results, "
+              f"{args.results * 9} rows, {os.path.getsize(path) / 1024 / 1024:.1f} MiB):")
+        measure("before", args.results, legacy_outputs, path)
+        measure("after", args.results, batch_outputs, path)
+
+
+if __name__ == '__main__':
+    main()
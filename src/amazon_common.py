@@ -0,0 +1,85 @@
+"""
+Amazon page constants and parsers shared by the Selenium and Playwright
+scrapers. Nothing here imports a browser driver, so either backend can load
+it without pulling in the other.
+"""
+
+import re
+from typing import Any, Dict, Optional
+
+from canonical import parse_asin
+from dom_extractor import field_text, field_texts, product_from_fields
+from failures import BLOCKED, SELECTOR_MISS, ScrapeFailure
+from product_schema import DeliveryOption, ProductData
+
+# Page conditions that replace fixed sleeps in the checkout flow
+ADDED_TO_CART_SELECTORS = [
+    '#NATC_SMART_WAGON_CONF_MSG_SUCCESS',
+    '#sw-atc-details-single-container',
+    '#attachDisplayAddBaseAlert',
+    '#huc-v2-order-row-confirm-text',
+]
+CART_SELECTORS = ['#sc-active-cart', "[name='proceedToRetailCheckout']"]
+CHECKOUT_SELECTORS = ['.a-radio-label', '.ship-option', '#ap_email']
+CART_URL = "https://www.amazon.com/gp/cart/view.html"
+QUANTITY_SELECTOR = "select[name='quantity'], input[name='quantityBox']"
+
+# Fields that are not in selectors.yaml but are read in the same round trip
+AMAZON_EXTRA_FIELDS = {
+    'detail_rows': {'selectors': ['.prodDetTable tr'], 'multiple': True},
+}
+
+# Structured-data fields that make the extra fields above redundant
+AMAZON_FIELD_ALIASES = {
+    'sku': ['detail_rows'],
+}
+
+def parse_sku(fields: Dict[str, Any], url: str) -> Optional[str]:
+    """SKU from the product details table, falling back to the ASIN in the URL"""
+    for row in field_texts(fields, 'detail_rows'):
+        match = re.search(r'(?:ASIN|SKU|[Mm]odel(?: [Nn]umber)?)[\s:\u200e\u200f]+(\S+)', row)
+        if match:
+            return match.group(1)
+    return parse_asin(url)
+
+def require_name(fields: Dict[str, Any], structured: Dict[str, Any], blocked: bool):
+    """Raise a classified failure when the page yielded no product name"""
+    if structured.get('name') or field_text(fields, 'product_name'):
+        return
+    if blocked:
+        raise ScrapeFailure(BLOCKED, "Blocked or captcha page instead of the product", 'extract')
+    raise ScrapeFailure(SELECTOR_MISS, "Product name not found on the page", 'extract')
+
+def build_product(fields: Dict[str, Any], product_url: str,
+                  structured: Optional[Dict[str, Any]] = None) -> ProductData:
+    """ProductData from structured data plus a batched extraction of the remaining fields"""
+    structured = structured or {}
+    sku = structured.get('sku') or parse_sku(fields, product_url)
+    return product_from_fields(fields, product_url, structured, sku=sku)
+
+def parse_delivery_option(text: str) -> Optional[DeliveryOption]:
+    """Parse one delivery option label from the checkout page"""
+    if not any(keyword in text.lower() for keyword in ['delivery', 'shipping', 'ship']):
+        return None
+
+    company = "Amazon"
+    delivery_type = "Standard"
+    price = "0.00"
+    eta = "3-5 days"
+
+    # Extract price
+    price_match = re.search(r'\$(\d+\.\d+)', text)
+    if price_match:
+        price = price_match.group(0)
+
+    # Extract ETA
+    eta_match = re.search(r'(\d+[-–]\d+\s*(days|business days))', text, re.IGNORECASE)
+    if eta_match:
+        eta = eta_match.group(1)
+
+    return DeliveryOption(
+        company=company,
+        type=delivery_type,
+        price=price,
+        eta=eta
+    )
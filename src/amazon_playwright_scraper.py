@@ -0,0 +1,222 @@
+from playwright_backend import AsyncBaseScraper
+from amazon_common import (
+    AMAZON_EXTRA_FIELDS, AMAZON_FIELD_ALIASES, ADDED_TO_CART_SELECTORS, CART_SELECTORS, CART_URL,
+    CHECKOUT_SELECTORS, QUANTITY_SELECTOR, build_product, parse_delivery_option, require_name
+)
+from canonical import product_key
+from checkout_engine import failed_scenario, get_checkout_settings, scenario_name
+from failures import BLOCKED, CHECKOUT_FAILED, ScrapeFailure, as_failure
+from structured_data import remaining_plan
+from product_schema import ProductData, ScrapedResult, StockStatus, DeliveryOption, CheckoutScenario
+import asyncio
+import logging
+from typing import Dict, Any, List, Optional
+
+
+class AmazonPlaywrightScraper(AsyncBaseScraper):
+    """Amazon scraper for the Playwright backend; same output as AmazonScraper"""
+
+    def __init__(self, page, timeout: int = 30, behavior: str = "stealth"):
+        super().__init__(page, timeout, behavior)
+        self.platform = "amazon"
+        self._cart_quantity: Optional[int] = None
+        self._at_cart = False
+
+    async def restart_page(self):
+        # The context keeps the cart; make the next tier set its quantity again
+        if self._cart_quantity is not None:
+            self._cart_quantity = 0
+        self._at_cart = False
+        await super().restart_page()
+
+    async def scrape_product(self, url: str) -> ScrapedResult:
+        try:
+            await self.run_stage('navigate', self.open_page, url)
+            product_data = await self.run_stage('extract', self._extract_product_data)
+
+            return ScrapedResult(
+                store="amazon.com",
+                url=url,
+                product=product_data,
+                scenarios=await self._simulate_checkout_scenarios(product_data)
+            )
+
+        except Exception as e:
+            failure = as_failure(e)
+            logging.error(f"Error scraping Amazon product ({failure.kind}): {failure}")
+            return ScrapedResult(
+                store="amazon.com",
+                url=url,
+                product=ProductData(
+                    name="",
+                    price="",
+                    product_url=url,
+                    stock_status=StockStatus.OUT_OF_STOCK
+                ),
+                success=False,
+                error_message=str(failure),
+                failure_kind=failure.kind
+            )
+
+    async def _extract_product_data(self) -> ProductData:
+        await self.pause()
+        ready = await self.wait_for_ready(self.selectors.get('amazon', {}).get('product_name', []))
+        plan = self.build_plan(AMAZON_EXTRA_FIELDS)
+        structured = await self.extract_structured()
+        plan = remaining_plan(plan, structured, AMAZON_FIELD_ALIASES)
+        fields = await self.extract_fields(plan) if plan else {}
+        require_name(fields, structured, not ready and await self.page_blocked())
+        return build_product(fields, self.page.url, structured)
+
+    async def _simulate_checkout_scenarios(self, product_data: ProductData) -> Dict[str, CheckoutScenario]:
+        settings = get_checkout_settings()
+        if not settings.should_simulate(product_data.product_url, self.platform):
+            return {}
+        if settings.parallel_contexts and len(settings.tiers) > 1:
+            return await self._parallel_scenarios(settings.tiers)
+        return await self._cart_scenarios(settings.tiers)
+
+    async def _cart_scenarios(self, tiers: Dict[str, int]) -> Dict[str, CheckoutScenario]:
+        """Every tier from one cart, changing the quantity in place; each tier is retried on its own"""
+        scenarios = {}
+        tier_list = list(tiers.items())
+        self._cart_quantity = None
+
+        for position, (name, quantity) in enumerate(tier_list):
+            try:
+                scenarios[name] = await self.run_stage('checkout', self._checkout_tier, quantity)
+            except Exception as e:
+                failure = as_failure(e, 'checkout')
+                self.logger.error(f"Checkout scenario {name} failed ({failure.kind}): {failure}")
+                scenarios[name] = failed_scenario(quantity, str(failure))
+                if not failure.retryable or failure.kind == BLOCKED:
+                    # The remaining tiers would fail the same way
+                    for later, later_quantity in tier_list[position + 1:]:
+                        scenarios[later] = failed_scenario(later_quantity, str(failure))
+                    break
+
+        return scenarios
+
+    def _on_product_page(self) -> bool:
+        return bool(self._page_url) and (
+            product_key(self.page.url, self.platform) == product_key(self._page_url, self.platform)
+        )
+
+    async def _checkout_tier(self, quantity: int) -> CheckoutScenario:
+        """One tier's scenario, rebuilding the cart first if this page doesn't have it"""
+        if self._cart_quantity is None:
+            if not self._on_product_page():
+                await self.open_page(self._page_url)
+            if not await self._build_cart():
+                raise ScrapeFailure(CHECKOUT_FAILED, "Add to cart unavailable", 'checkout', retryable=False)
+        elif not self._at_cart:
+            await self._open_cart()
+        return await self._checkout_scenario(quantity)
+
+    async def _parallel_scenarios(self, tiers: Dict[str, int]) -> Dict[str, CheckoutScenario]:
+        """Each tier in its own isolated context, all at once"""
+        product_url = self.page.url
+
+        async def run_tier(name: str, quantity: int) -> Dict[str, CheckoutScenario]:
+            try:
+                async with self.isolated_copy() as scraper:
+                    await scraper.run_stage('navigate', scraper.open_page, product_url)
+                    await scraper.wait_for_ready(["#add-to-cart-button"])
+                    return await scraper._cart_scenarios({name: quantity})
+            except Exception as e:
+                self.logger.error(f"Error in checkout scenario {name}: {e}")
+                return {name: failed_scenario(quantity, str(e))}
+
+        scenarios = {}
+        for result in await asyncio.gather(*(run_tier(name, quantity) for name, quantity in tiers.items())):
+            scenarios.update(result)
+        return {name: scenarios[name] for name in tiers if name in scenarios}
+
+    async def _build_cart(self) -> bool:
+        """Add the product on the current page to the cart and open the cart"""
+        add_to_cart_btn = await self.page.query_selector("#add-to-cart-button")
+        if not add_to_cart_btn:
+            return False
+        await add_to_cart_btn.click()
+        await self.pause()
+        if not await self.wait_for_ready(ADDED_TO_CART_SELECTORS, timeout=10):
+            await self.wait_for_idle()
+        self._cart_quantity = 1
+        await self._open_cart()
+        return True
+
+    async def _open_cart(self):
+        await self.goto(CART_URL)
+        await self.pause()
+        await self.wait_for_ready(CART_SELECTORS)
+        self._at_cart = True
+
+    async def _set_quantity(self, quantity: int):
+        """Change the cart line's quantity without re-adding the item"""
+        if quantity == self._cart_quantity:
+            return
+        quantity_input = await self.page.query_selector(QUANTITY_SELECTOR)
+        if not quantity_input:
+            return
+        if await quantity_input.evaluate("el => el.tagName") == 'SELECT':
+            try:
+                await quantity_input.select_option(str(quantity))
+            except Exception:
+                await quantity_input.type(str(quantity))
+        else:
+            await quantity_input.fill(str(quantity))
+        await self.pause()
+        await self.wait_for_idle()
+        self._cart_quantity = quantity
+
+    async def _checkout_scenario(self, quantity: int = 1) -> CheckoutScenario:
+        """Delivery options for ``quantity`` items, starting from the cart page"""
+        await self._set_quantity(quantity)
+
+        checkout_btn = await self.page.query_selector("[name='proceedToRetailCheckout']")
+        if not checkout_btn:
+            if await self.page_blocked():
+                raise ScrapeFailure(BLOCKED, "Blocked or captcha page instead of the cart", 'checkout')
+            raise ScrapeFailure(CHECKOUT_FAILED, "Proceed to checkout button not found", 'checkout')
+        self._at_cart = False
+        await checkout_btn.click()
+        await self.pause()
+        await self.wait_for_ready(CHECKOUT_SELECTORS)
+
+        delivery_options = await self._extract_delivery_options()
+
+        screenshot_path = await self.capture_screenshot(f"{self.platform}_{quantity}_items")
+
+        return CheckoutScenario(
+            scenario_name=scenario_name(quantity),
+            delivery_options=delivery_options,
+            screenshot_path=screenshot_path
+        )
+
+    async def _extract_delivery_options(self) -> List[DeliveryOption]:
+        options = []
+        for text in await self.texts_of(".a-radio-label, .ship-option"):
+            option = parse_delivery_option(text)
+            if option:
+                options.append(option)
+        return options
+
+    async def simulate_checkout(self, product_data: ProductData, quantity: int = 1) -> Dict[str, Any]:
+        try:
+            if await self._build_cart():
+                scenario = await self._checkout_scenario(quantity=quantity)
+            else:
+                scenario = failed_scenario(quantity, "Add to cart unavailable")
+            return {
+                "scenario_name": scenario.scenario_name,
+                "delivery_options": [opt.__dict__ for opt in scenario.delivery_options],
+                "screenshot_path": scenario.screenshot_path,
+                "error_message": scenario.error_message,
+            }
+        except Exception as e:
+            self.logger.error(f"simulate_checkout failed: {e}")
+            return {
+                "scenario_name": f"{quantity}_items",
+                "delivery_options": [],
+                "error_message": str(e),
+            }
@@ -1,27 +1,36 @@
 from base_scraper import BaseScraper
+from amazon_common import (
+    AMAZON_EXTRA_FIELDS, AMAZON_FIELD_ALIASES, ADDED_TO_CART_SELECTORS, CART_SELECTORS, CART_URL,
+    CHECKOUT_SELECTORS, QUANTITY_SELECTOR, build_product, parse_delivery_option, require_name
+)
+from canonical import product_key
+from checkout_engine import failed_scenario, get_checkout_settings, scenario_name
+from failures import BLOCKED, CHECKOUT_FAILED, ScrapeFailure, as_failure
+from structured_data import remaining_plan
 from product_schema import ProductData, ScrapedResult, StockStatus, DeliveryOption, CheckoutScenario
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-import time
+from selenium.webdriver.support.select import Select
+from selenium.common.exceptions import NoSuchElementException
 import logging
 from typing import Dict, Any, List, Optional
-import re
 
 class AmazonScraper(BaseScraper):
-    def __init__(self, headless: bool = True):
-        super().__init__(headless)
+    def __init__(self, headless: bool = True, behavior: str = "stealth"):
+        super().__init__(headless, behavior=behavior)
         self.platform = "amazon"
+        self._cart_quantity: Optional[int] = None
+        self._at_cart = False
+    
+    def restart_driver(self):
+        # The new browser has an empty cart
+        self._cart_quantity = None
+        self._at_cart = False
+        super().restart_driver()
     
     def scrape_product(self, url: str) -> ScrapedResult:
         try:
-            self.driver.get(url)
-            time.sleep(self.get_random_delay())
-            
-            # Human-like behavior
-            self.human_like_scroll()
-            
-            product_data = self._extract_product_data()
+            self.run_stage('navigate', self.open_page, url)
+            product_data = self.run_stage('extract', self._extract_product_data)
             
             return ScrapedResult(
                 store="amazon.com",
@@ -31,7 +40,8 @@ class AmazonScraper(BaseScraper):
             )
             
         except Exception as e:
-            logging.error(f"Error scraping Amazon product: {e}")
+            failure = as_failure(e)
+            logging.error(f"Error scraping Amazon product ({failure.kind}): {failure}")
             return ScrapedResult(
                 store="amazon.com",
                 url=url,
@@ -42,202 +52,129 @@ class AmazonScraper(BaseScraper):
                     stock_status=StockStatus.OUT_OF_STOCK
                 ),
                 success=False,
-                error_message=str(e)
+                error_message=str(failure),
+                failure_kind=failure.kind
             )
     
     def _extract_product_data(self) -> ProductData:
-        selectors = self.selectors.get('amazon', {})
+        self.pause()
         
-        name = self._extract_with_selectors(selectors.get('product_name', []))
-        price = self._extract_with_selectors(selectors.get('price', []))
-        discount_price = self._extract_with_selectors(selectors.get('discount_price', []))
-        brand = self._extract_with_selectors(selectors.get('brand', []))
-        category = self._extract_category()
-        sku = self._extract_sku()
-        image_urls = self._extract_images()
-        stock_status = self._extract_stock_status()
-        rating = self._extract_rating()
-        reviews = self._extract_reviews()
-        seller = self._extract_seller()
+        # Human-like behavior
+        self.human_like_scroll()
         
-        return ProductData(
-            name=name or "Unknown",
-            price=price or "0",
-            discount_price=discount_price,
-            sku=sku,
-            brand=brand,
-            category=category,
-            product_url=self.driver.current_url,
-            image_urls=image_urls,
-            stock_status=stock_status,
-            rating=rating,
-            reviews=reviews,
-            seller=seller
-        )
+        plan = self.build_plan(AMAZON_EXTRA_FIELDS)
+        ready = self.wait_for_ready(plan.get('product_name', {}).get('selectors', []))
+        structured = self.extract_structured()
+        plan = remaining_plan(plan, structured, AMAZON_FIELD_ALIASES)
+        fields = self.extract_fields(plan) if plan else {}
+        require_name(fields, structured, not ready and self.page_blocked())
+        return build_product(fields, self.driver.current_url, structured)
     
-    def _extract_with_selectors(self, selector_list: List[str]) -> Optional[str]:
-        for selector in selector_list:
-            try:
-                element = self.find_element_safe(By.CSS_SELECTOR, selector, 5)
-                if element:
-                    return self.extract_text(element)
-            except:
-                continue
-        return None
-    
-    def _extract_category(self) -> Optional[str]:
-        try:
-            breadcrumb_elements = self.driver.find_elements(
-                By.CSS_SELECTOR, ".a-breadcrumb li:not(.a-breadcrumb-divider) a"
-            )
-            categories = [elem.text.strip() for elem in breadcrumb_elements if elem.text.strip()]
-            return " > ".join(categories) if categories else None
-        except:
-            return None
-    
-    def _extract_sku(self) -> Optional[str]:
-        # Try to extract SKU from various locations
-        try:
-            # Check product details table
-            details = self.driver.find_elements(By.CSS_SELECTOR, ".prodDetTable tr")
-            for row in details:
-                if "ASIN" in row.text or "SKU" in row.text or "Model" in row.text:
-                    return row.text.split(":")[-1].strip()
-        except:
-            pass
+    def _simulate_checkout_scenarios(self, product_data: ProductData) -> Dict[str, CheckoutScenario]:
+        settings = get_checkout_settings()
+        if not settings.should_simulate(product_data.product_url, self.platform):
+            return {}
+        scenarios = {}
+        tiers = list(settings.tiers.items())
+        self._cart_quantity = None
         
-        # Try to extract from URL
-        url = self.driver.current_url
-        asin_match = re.search(r'/dp/([A-Z0-9]{10})', url)
-        if asin_match:
-            return asin_match.group(1)
+        # Build the cart once; each tier only changes the quantity in place and
+        # is retried on its own without repeating the tiers that succeeded
+        for position, (name, quantity) in enumerate(tiers):
+            try:
+                scenarios[name] = self.run_stage('checkout', self._checkout_tier, quantity)
+            except Exception as e:
+                failure = as_failure(e, 'checkout')
+                self.logger.error(f"Checkout scenario {name} failed ({failure.kind}): {failure}")
+                scenarios[name] = failed_scenario(quantity, str(failure))
+                if not failure.retryable or failure.kind == BLOCKED:
+                    # The remaining tiers would fail the same way
+                    for later, later_quantity in tiers[position + 1:]:
+                        scenarios[later] = failed_scenario(later_quantity, str(failure))
+                    break
         
-        return None
+        return scenarios
     
-    def _extract_images(self) -> List[str]:
-        images = []
-        try:
-            img_elements = self.driver.find_elements(
-                By.CSS_SELECTOR, "img[data-old-hires], #landingImage, .a-dynamic-image"
-            )
-            for img in img_elements:
-                src = img.get_attribute('src') or img.get_attribute('data-src')
-                if src and 'http' in src:
-                    images.append(src)
-        except:
-            pass
-        return images
+    def _on_product_page(self) -> bool:
+        return bool(self._page_url) and (
+            product_key(self.driver.current_url, self.platform) == product_key(self._page_url, self.platform)
+        )
     
-    def _extract_stock_status(self) -> StockStatus:
-        try:
-            stock_elem = self.find_element_safe(
-                By.CSS_SELECTOR, "#availability .a-size-medium, #availability span"
-            )
-            if stock_elem:
-                text = stock_elem.text.lower()
-                if 'in stock' in text:
-                    return StockStatus.IN_STOCK
-                elif 'out of stock' in text:
-                    return StockStatus.OUT_OF_STOCK
-                elif 'limited' in text:
-                    return StockStatus.LIMITED_STOCK
-        except:
-            pass
-        return StockStatus.OUT_OF_STOCK
+    def _checkout_tier(self, quantity: int) -> CheckoutScenario:
+        """One tier's scenario, rebuilding the cart first if this browser doesn't have it"""
+        if self._cart_quantity is None:
+            if not self._on_product_page():
+                self.open_page(self._page_url)
+            if not self._build_cart():
+                raise ScrapeFailure(CHECKOUT_FAILED, "Add to cart unavailable", 'checkout', retryable=False)
+        elif not self._at_cart:
+            self._open_cart()
+        return self._checkout_scenario(quantity)
     
-    def _extract_rating(self) -> Optional[str]:
-        try:
-            rating_elem = self.find_element_safe(
-                By.CSS_SELECTOR, ".a-icon-alt, [data-hook='rating-out-of-text']"
-            )
-            if rating_elem:
-                text = rating_elem.get_attribute('textContent') or rating_elem.text
-                match = re.search(r'(\d+\.\d+)', text)
-                return match.group(1) if match else None
-        except:
-            return None
+    def _build_cart(self) -> bool:
+        """Add the product on the current page to the cart and open the cart"""
+        add_to_cart_btn = self.find_element_safe(By.ID, "add-to-cart-button", timeout=5)
+        if not add_to_cart_btn:
+            return False
+        add_to_cart_btn.click()
+        self.pause()
+        if not self.wait_for_ready(ADDED_TO_CART_SELECTORS, timeout=10):
+            self.wait_for_idle()
+        self._cart_quantity = 1
+        self._open_cart()
+        return True
     
-    def _extract_reviews(self) -> Optional[str]:
-        try:
-            reviews_elem = self.find_element_safe(
-                By.CSS_SELECTOR, "#acrCustomerReviewText, [data-hook='total-review-count']"
-            )
-            if reviews_elem:
-                text = reviews_elem.text
-                numbers = re.findall(r'\d+', text.replace(',', ''))
-                return numbers[0] if numbers else None
-        except:
-            return None
+    def _open_cart(self):
+        self.driver.get(CART_URL)
+        self.pause()
+        self.wait_for_ready(CART_SELECTORS)
+        self._at_cart = True
     
-    def _extract_seller(self) -> Optional[str]:
-        try:
-            seller_elem = self.find_element_safe(
-                By.CSS_SELECTOR, "#merchant-info, .a-link-normal.contributorNameID"
-            )
-            return self.extract_text(seller_elem) if seller_elem else None
-        except:
-            return None
+    def _set_quantity(self, quantity: int):
+        """Change the cart line's quantity without re-adding the item"""
+        if quantity == self._cart_quantity:
+            return
+        quantity_input = self.find_element_safe(By.CSS_SELECTOR, QUANTITY_SELECTOR, timeout=5)
+        if not quantity_input:
+            return
+        if quantity_input.tag_name == 'select':
+            try:
+                Select(quantity_input).select_by_value(str(quantity))
+            except NoSuchElementException:
+                quantity_input.send_keys(str(quantity))
+        else:
+            quantity_input.clear()
+            quantity_input.send_keys(str(quantity))
+        self.pause()
+        self.wait_for_idle()
+        self._cart_quantity = quantity
     
-    def _simulate_checkout_scenarios(self, product_data: ProductData) -> Dict[str, CheckoutScenario]:
-        scenarios = {}
+    def _checkout_scenario(self, quantity: int = 1) -> CheckoutScenario:
+        """Delivery options for ``quantity`` items, starting from the cart page"""
+        self._set_quantity(quantity)
         
-        try:
-            # Scenario 1: Single item (below free shipping threshold)
-            scenarios['below_threshold'] = self._checkout_scenario(quantity=1)
-            
-            # Scenario 2: Multiple items (above free shipping threshold)
-            scenarios['above_threshold'] = self._checkout_scenario(quantity=5)
-            
-        except Exception as e:
-            self.logger.error(f"Error during checkout simulation: {e}")
+        # Proceed to checkout
+        checkout_btn = self.find_element_safe(By.NAME, "proceedToRetailCheckout")
+        if not checkout_btn:
+            if self.page_blocked():
+                raise ScrapeFailure(BLOCKED, "Blocked or captcha page instead of the cart", 'checkout')
+            raise ScrapeFailure(CHECKOUT_FAILED, "Proceed to checkout button not found", 'checkout')
+        self._at_cart = False
+        checkout_btn.click()
+        self.pause()
+        self.wait_for_ready(CHECKOUT_SELECTORS)
         
-        return scenarios
-    
-    def _checkout_scenario(self, quantity: int = 1) -> CheckoutScenario:
-        try:
-            # Add to cart
-            add_to_cart_btn = self.find_element_safe(By.ID, "add-to-cart-button")
-            if add_to_cart_btn:
-                add_to_cart_btn.click()
-                time.sleep(self.get_random_delay())
-            
-            # Go to cart
-            self.driver.get("https://www.amazon.com/gp/cart/view.html")
-            time.sleep(self.get_random_delay())
-            
-            # Update quantity if needed
-            if quantity > 1:
-                quantity_dropdown = self.find_element_safe(By.NAME, "quantity")
-                if quantity_dropdown:
-                    quantity_dropdown.send_keys(str(quantity))
-                    time.sleep(self.get_random_delay())
-            
-            # Proceed to checkout
-            checkout_btn = self.find_element_safe(By.NAME, "proceedToRetailCheckout")
-            if checkout_btn:
-                checkout_btn.click()
-                time.sleep(self.get_random_delay())
-            
-            # Extract delivery options
-            delivery_options = self._extract_delivery_options()
-            
-            # Take screenshot
-            screenshot_path = f"data/screenshots/amazon_{quantity}_items_{int(time.time())}.png"
-            self.driver.save_screenshot(screenshot_path)
-            
-            return CheckoutScenario(
-                scenario_name=f"{quantity}_item{'s' if quantity > 1 else ''}",
-                delivery_options=delivery_options,
-                screenshot_path=screenshot_path
-            )
-            
-        except Exception as e:
-            self.logger.error(f"Error in checkout scenario: {e}")
-            return CheckoutScenario(
-                scenario_name=f"{quantity}_items",
-                delivery_options=[],
-                error_message=str(e)
-            )
+        # Extract delivery options
+        delivery_options = self._extract_delivery_options()
+        
+        # Take screenshot
+        screenshot_path = self.capture_screenshot(f"{self.platform}_{quantity}_items")
+        
+        return CheckoutScenario(
+            scenario_name=scenario_name(quantity),
+            delivery_options=delivery_options,
+            screenshot_path=screenshot_path
+        )
     
     def _extract_delivery_options(self) -> List[DeliveryOption]:
         options = []
@@ -248,30 +185,9 @@ class AmazonScraper(BaseScraper):
             )
             
             for elem in delivery_elems:
-                text = elem.text
-                if any(keyword in text.lower() for keyword in ['delivery', 'shipping', 'ship']):
-                    # Parse delivery option
-                    company = "Amazon"
-                    delivery_type = "Standard"
-                    price = "0.00"
-                    eta = "3-5 days"
-                    
-                    # Extract price
-                    price_match = re.search(r'\$(\d+\.\d+)', text)
-                    if price_match:
-                        price = price_match.group(0)
-                    
-                    # Extract ETA
-                    eta_match = re.search(r'(\d+[-–]\d+\s*(days|business days))', text, re.IGNORECASE)
-                    if eta_match:
-                        eta = eta_match.group(1)
-                    
-                    options.append(DeliveryOption(
-                        company=company,
-                        type=delivery_type,
-                        price=price,
-                        eta=eta
-                    ))
+                option = parse_delivery_option(elem.text)
+                if option:
+                    options.append(option)
         except Exception as e:
             self.logger.error(f"Error extracting delivery options: {e}")
         
@@ -283,8 +199,10 @@ class AmazonScraper(BaseScraper):
         Wraps the existing checkout scenario logic.
         """
         try:
-            # Use the same flow as _checkout_scenario
-            scenario = self._checkout_scenario(quantity=quantity)
+            if self._build_cart():
+                scenario = self._checkout_scenario(quantity=quantity)
+            else:
+                scenario = failed_scenario(quantity, "Add to cart unavailable")
             return {
                 "scenario_name": scenario.scenario_name,
                 "delivery_options": [opt.__dict__ for opt in scenario.delivery_options],
@@ -7,47 +7,106 @@ from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from undetected_chromedriver import Chrome, ChromeOptions
 import time
 import random
-import yaml
 import logging
 from typing import Optional, List, Dict, Any
-from fake_useragent import UserAgent
 from product_schema import ProductData, ScrapedResult, StockStatus
+from dom_extractor import build_plan, extract_with_driver, record_extraction, wait_until_idle, wait_until_ready
+from structured_data import collect_with_driver, parse_structured
+from network_policy import apply_to_driver, get_network_policies
+from screenshot_store import get_screenshot_store
+from proxy_pool import BLOCK_PAGE_FUNCTION, Proxy, get_proxy_pool
+from failures import BLOCKED, ScrapeFailure, get_retry_policy
+from listing import extract_listing_with_driver, get_listing_settings, listing_result
+from warm_start import get_warm_start, shared_selectors, shared_user_agent
+from utils import clean_price
+
+def _chrome_options(headless: bool, user_agent: Optional[str],
+                    page_load_strategy: Optional[str], proxy: Optional[Proxy] = None) -> ChromeOptions:
+    options = ChromeOptions()
+    if page_load_strategy:
+        # "eager" returns from get() once the DOM is parsed
+        options.page_load_strategy = page_load_strategy
+    if headless:
+        options.add_argument("--headless=new")  # modern flag
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    if user_agent:
+        options.add_argument(f"--user-agent={user_agent}")
+    if proxy:
+        if proxy.username:
+            # Chrome would answer every 407 without them; ProxyPool.acquire_session never hands these out
+            raise ValueError(f"Chrome can't authenticate to {proxy.server}")
+        options.add_argument(f"--proxy-server={proxy.server}")
+
+    # If you want to suppress "automation" banners:
+    options.add_argument("--disable-infobars")
+    return options
+
+def create_chrome_driver(headless: bool = True, user_agent: Optional[str] = None,
+                         page_load_strategy: Optional[str] = None,
+                         proxy: Optional[Proxy] = None) -> Chrome:
+    """Launch a configured undetected Chrome instance; ``driver.proxy`` is the session's proxy"""
+    warm_start = get_warm_start()
+    kwargs = warm_start.chrome_kwargs()
+
+    # create driver
+    try:
+        driver = Chrome(options=_chrome_options(headless, user_agent, page_load_strategy, proxy), **kwargs)
+    except Exception:
+        warm_start.discard(kwargs)
+        if 'driver_executable_path' not in kwargs:
+            raise
+        # The cached binary may no longer match the installed Chrome
+        logging.getLogger(__name__).warning("Cached chromedriver failed to start, re-patching")
+        warm_start.invalidate_driver()
+        kwargs = warm_start.chrome_kwargs()
+        try:
+            driver = Chrome(options=_chrome_options(headless, user_agent, page_load_strategy, proxy), **kwargs)
+        except Exception:
+            warm_start.discard(kwargs)
+            raise
+    warm_start.cleanup_with(driver, kwargs)
+    driver.proxy = proxy
+
+    # stealth JS trick
+    driver.execute_script(
+        "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
+    )
+    return driver
 
 class BaseScraper(ABC):
-    def __init__(self, headless: bool = True, timeout: int = 30):
+    def __init__(self, headless: bool = True, timeout: int = 30, behavior: str = "stealth"):
         self.headless = headless
         self.timeout = timeout
+        # "stealth" adds human-like pauses and scrolling; "throughput" only
+        # waits for page conditions and leaves pacing to the scheduler
+        self.behavior = behavior
         self.driver = None
+        self._owns_driver = False
+        self.platform: Optional[str] = None
+        # Last page opened with open_page, reopened after a browser crash
+        self._page_url: Optional[str] = None
         self.logger = logging.getLogger(__name__)
-        self.ua = UserAgent()
+        self.ua = shared_user_agent()
         self.selectors = self.load_selectors()
         
     def load_selectors(self) -> Dict[str, Any]:
-        try:
-            with open('config/selectors.yaml', 'r') as f:
-                return yaml.safe_load(f)
-        except FileNotFoundError:
-            self.logger.warning("Selectors config file not found")
-            return {}
+        return shared_selectors('config/selectors.yaml')
     def setup_driver(self):
-        options = ChromeOptions()
-        if self.headless:
-            options.add_argument("--headless=new")  # modern flag
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--disable-blink-features=AutomationControlled")
-        options.add_argument(f"--user-agent={self.ua.random}")
-
-        # If you want to suppress "automation" banners:
-        options.add_argument("--disable-infobars")
-
-        # create driver
-        self.driver = Chrome(options=options)
-
-        # stealth JS trick
-        self.driver.execute_script(
-            "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
+        proxies = get_proxy_pool()
+        self.driver = create_chrome_driver(
+            self.headless, self.ua.random, get_network_policies().page_load_strategy,
+            proxies.acquire_session() if proxies else None
         )
+        self._owns_driver = True
+        apply_to_driver(self.driver, self.platform)
+
+    def attach_driver(self, driver):
+        """Use a driver leased from a BrowserPool; the pool keeps ownership"""
+        self.driver = driver
+        self._owns_driver = False
+        apply_to_driver(self.driver, self.platform)
 
     # def setup_driver(self):
     #     options = ChromeOptions()
@@ -63,14 +122,41 @@ class BaseScraper(ABC):
     #     self.driver = Chrome(options=options)
     #     self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
     
+    def restart_driver(self):
+        """Replace a crashed browser and reopen the page it was on"""
+        self.logger.warning("Browser crashed, launching a new one")
+        # A pooled driver is only dropped here; the pool discards it when the lease ends
+        self.close()
+        self.setup_driver()
+        if self._page_url:
+            self.open_page(self._page_url)
+    
+    def run_stage(self, stage: str, func, *args, **kwargs):
+        """Run one scrape stage, retrying it on its own per the retry policy"""
+        return get_retry_policy().run(stage, func, *args, recover=self.restart_driver, **kwargs)
+    
+    def open_page(self, url: str):
+        """Navigate to ``url``; raises a ``blocked`` failure on a captcha or block page"""
+        self.driver.get(url)
+        self._page_url = url
+        if self.page_blocked():
+            raise ScrapeFailure(BLOCKED, f"Blocked or captcha page at {url}", 'navigate')
+    
     def get_random_delay(self, min_delay: float = 1.0, max_delay: float = 3.0) -> float:
         return random.uniform(min_delay, max_delay)
     
+    def pause(self, min_delay: float = 1.0, max_delay: float = 3.0):
+        """Random think time, skipped by the throughput profile"""
+        if self.behavior == "stealth":
+            time.sleep(self.get_random_delay(min_delay, max_delay))
+    
     def scroll_to_element(self, element):
         self.driver.execute_script("arguments[0].scrollIntoView(true);", element)
-        time.sleep(self.get_random_delay(0.5, 1.5))
+        self.pause(0.5, 1.5)
     
     def human_like_scroll(self):
+        if self.behavior != "stealth":
+            return
         scroll_height = self.driver.execute_script("return document.body.scrollHeight")
         scroll_increment = random.randint(200, 500)
         
@@ -97,19 +183,86 @@ class BaseScraper(ABC):
         except TimeoutException:
             return []
     
+    def wait_for_ready(self, anchor_selectors: List[str], timeout: Optional[float] = None) -> bool:
+        """Wait once for the DOM and one of ``anchor_selectors`` to be present"""
+        return wait_until_ready(self.driver, anchor_selectors, timeout or self.timeout)
+    
+    def wait_for_idle(self, idle_time: float = 0.5, timeout: Optional[float] = None) -> bool:
+        """Wait for in-page requests (XHR, fetch) to settle after an action"""
+        return wait_until_idle(self.driver, idle_time, timeout or self.timeout)
+    
+    def build_plan(self, extra_fields: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Dict[str, Any]]:
+        """Extraction plan for this platform, ordered by selector hit rate"""
+        return build_plan(self.selectors.get(self.platform, {}), extra_fields, self.platform)
+    
+    def extract_fields(self, plan: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Read every field in ``plan`` with a single execute_script round trip"""
+        fields = extract_with_driver(self.driver, plan)
+        record_extraction(self.platform, plan, fields)
+        return fields
+    
+    def extract_structured(self) -> Dict[str, Any]:
+        """Product fields from the page's JSON-LD / hydration state, if any"""
+        try:
+            return parse_structured(collect_with_driver(self.driver))
+        except Exception as e:
+            self.logger.debug(f"No structured data: {e}")
+            return {}
+    
+    def page_blocked(self) -> bool:
+        """Whether the current page is a captcha or block page"""
+        try:
+            return bool(self.driver.execute_script(f"return {BLOCK_PAGE_FUNCTION};"))
+        except Exception:
+            return False
+    
+    def capture_screenshot(self, name: str) -> Optional[str]:
+        """Grab the page as PNG and hand it to the background writer; returns its path"""
+        store = get_screenshot_store()
+        if not store:
+            return None
+        return store.submit(self.driver.get_screenshot_as_png(), name)
+    
     def extract_text(self, element) -> Optional[str]:
         if element:
             return element.text.strip()
         return None
     
     def extract_price(self, text: str) -> Optional[str]:
-        if text:
-            # Remove non-numeric characters except decimal point and currency symbols
-            import re
-            cleaned = re.sub(r'[^\d.,$€£¥₦]', '', text)
-            return cleaned
+        return clean_price(text)
+    
+    def listing_spec(self, url: str) -> Optional[Dict[str, Any]]:
+        """Card selectors when ``url`` is a search/category listing of this platform"""
+        spec = (self.selectors.get(self.platform) or {}).get('listing')
+        if spec and get_listing_settings().is_listing(url, self.platform):
+            return spec
         return None
     
+    def scrape(self, url: str) -> ScrapedResult:
+        """Scrape ``url`` as a listing page or as a single product page"""
+        if self.listing_spec(url):
+            return self.scrape_listing(url)
+        return self.scrape_product(url)
+    
+    def scrape_listing(self, url: str) -> ScrapedResult:
+        """Read every product card, following pagination up to ``listing.max_pages``"""
+        settings = get_listing_settings()
+        spec = self.listing_spec(url)
+        cards, title, page_url, pages = [], None, url, 0
+        while page_url and pages < settings.max_pages:
+            if pages:
+                time.sleep(settings.page_interval)
+            self.run_stage('navigate', self.open_page, page_url)
+            self.wait_for_ready(spec.get('card', []))
+            self.pause(0.5, 1.5)
+            page = extract_listing_with_driver(self.driver, spec)
+            title = title or page.get('title')
+            cards.extend(page.get('cards') or [])
+            page_url = page.get('next')
+            pages += 1
+        self.logger.info(f"Read {len(cards)} product cards from {pages} listing page(s): {url}")
+        return listing_result(url, self.platform, cards, title, pages)
+    
     @abstractmethod
     def scrape_product(self, url: str) -> ScrapedResult:
         pass
@@ -122,15 +275,17 @@ class BaseScraper(ABC):
     #     if self.driver:
     #         self.driver.quit()
     def close(self):
-        if self.driver:
+        if self.driver and self._owns_driver:
             try:
                 self.driver.quit()
             except Exception:
                 pass
+        self.driver = None
+        self._owns_driver = False
 
     
     def __enter__(self):
-        self.setup_driver()
+        get_retry_policy().run('launch', self.setup_driver)
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
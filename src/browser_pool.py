@@ -0,0 +1,197 @@
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Callable, List, Optional
+from urllib.parse import urlparse
+
+
+class PooledDriver:
+    """A warm driver plus the bookkeeping the pool needs to recycle it"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+
+
+class BrowserPool:
+    """
+    Keeps up to ``size`` Chrome drivers alive across URLs.
+
+    Drivers are handed out with ``lease()``, reset (cookies, storage, extra
+    tabs) when they come back and quit once they have served
+    ``max_pages_per_driver`` leases, so one Chrome boot is amortised over
+    many page loads instead of being paid for every URL.
+    """
+
+    def __init__(self, size: int = 1, max_pages_per_driver: int = 50,
+                 headless: bool = True,
+                 driver_factory: Optional[Callable[[], object]] = None):
+        self.size = max(1, size)
+        self.max_pages_per_driver = max(1, max_pages_per_driver)
+        self.headless = headless
+        self.driver_factory = driver_factory or self._default_driver_factory
+        self.logger = logging.getLogger(__name__)
+
+        self._idle: List[PooledDriver] = []
+        self._leased = {}
+        self._total = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def _default_driver_factory(self):
+        from base_scraper import create_chrome_driver
+        from network_policy import get_network_policies
+        from proxy_pool import get_proxy_pool
+        from warm_start import shared_user_agent
+
+        proxies = get_proxy_pool()
+        return create_chrome_driver(
+            self.headless, shared_user_agent().random, get_network_policies().page_load_strategy,
+            proxies.acquire_session() if proxies else None
+        )
+
+    @classmethod
+    def from_config(cls, config: dict, min_size: int = 1) -> "BrowserPool":
+        pool_config = config.get('browser_pool', {})
+        max_pages = pool_config.get('max_pages_per_driver', 50)
+        proxy_config = config.get('proxies', {})
+        if proxy_config.get('enabled', False) and proxy_config.get('list'):
+            # A browser keeps its proxy for life, so rotating means recycling it
+            max_pages = min(max_pages, proxy_config.get('rotation_interval', 10))
+        return cls(
+            size=max(pool_config.get('size', 1), min_size),
+            max_pages_per_driver=max_pages,
+            headless=config.get('scraper', {}).get('headless', True)
+        )
+
+    def warm(self, count: Optional[int] = None):
+        """Launch drivers up front so the first URLs don't pay for the boot"""
+        count = min(self.size, count or self.size)
+        while True:
+            with self._cond:
+                if self._closed or self._total >= count:
+                    return
+                self._total += 1
+            try:
+                slot = PooledDriver(self.driver_factory())
+            except Exception:
+                with self._cond:
+                    self._total -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._idle.append(slot)
+                self._cond.notify()
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None):
+        """Borrow a driver for one page; it is reset or recycled on return"""
+        slot = self._acquire(timeout)
+        try:
+            yield slot.driver
+        finally:
+            self._release(slot)
+
+    def _acquire(self, timeout: Optional[float]) -> PooledDriver:
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Browser pool is closed")
+                if self._idle:
+                    slot = self._idle.pop()
+                    self._leased[id(slot)] = slot
+                    return slot
+                if self._total < self.size:
+                    self._total += 1
+                    break
+                if not self._cond.wait(timeout):
+                    raise TimeoutError("Timed out waiting for a browser")
+
+        # Launch outside the lock so other workers can keep leasing
+        try:
+            slot = PooledDriver(self.driver_factory())
+        except Exception:
+            with self._cond:
+                self._total -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._leased[id(slot)] = slot
+        return slot
+
+    def _release(self, slot: PooledDriver):
+        slot.pages += 1
+        keep = (slot.pages < self.max_pages_per_driver and self._proxy_healthy(slot.driver)
+                and self._reset(slot.driver))
+        if not keep:
+            self._quit(slot.driver)
+
+        with self._cond:
+            self._leased.pop(id(slot), None)
+            if keep and not self._closed:
+                self._idle.append(slot)
+            else:
+                self._total -= 1
+                if keep:
+                    self._quit(slot.driver)
+            self._cond.notify()
+
+    @staticmethod
+    def _proxy_healthy(driver) -> bool:
+        """False once the driver's proxy was taken out of rotation"""
+        from proxy_pool import get_proxy_pool
+
+        proxy = getattr(driver, 'proxy', None)
+        proxies = get_proxy_pool()
+        return not (proxy and proxies) or proxies.healthy(proxy)
+
+    def _reset(self, driver) -> bool:
+        """Clear per-lease state; False means the driver is unusable"""
+        try:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+
+            origin = self._origin(driver.current_url)
+            if origin:
+                driver.execute_cdp_cmd(
+                    "Storage.clearDataForOrigin",
+                    {"origin": origin, "storageTypes": "all"}
+                )
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            driver.get("about:blank")
+            return True
+        except Exception as e:
+            self.logger.warning(f"Discarding browser after failed reset: {e}")
+            return False
+
+    @staticmethod
+    def _origin(url: str) -> Optional[str]:
+        parsed = urlparse(url or '')
+        if parsed.scheme in ('http', 'https') and parsed.netloc:
+            return f"{parsed.scheme}://{parsed.netloc}"
+        return None
+
+    def _quit(self, driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def close(self):
+        """Quit every idle driver; leased drivers are quit when returned"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._total -= len(idle)
+            self._cond.notify_all()
+        for slot in idle:
+            self._quit(slot.driver)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,107 @@
+"""
+Canonical product identity.
+
+Merchandiser input lists the same product under many URLs: tracking
+parameters, ``ref=`` suffixes, ``/gp/product/`` vs ``/dp/``, mobile or
+regional hosts. Each URL is mapped to a product key (e.g. every URL carrying
+ASIN ``B09XYZ1234`` on amazon.com becomes ``amazon:amazon.com:B09XYZ1234``)
+and to one canonical URL to scrape. Platforms without a known ID scheme fall
+back to host plus path with tracking parameters removed.
+"""
+
+import re
+from typing import Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+ASIN_PATTERN = re.compile(r'/(?:dp|gp/product|gp/aw/d|exec/obidos/asin)/([A-Z0-9]{10})(?=[/?#]|$)', re.I)
+
+# platform -> (product ID in the path, canonical path template)
+PRODUCT_ID_PATTERNS = {
+    'amazon': (ASIN_PATTERN, "/dp/{id}"),
+    'ebay': (re.compile(r'/itm/(?:[^/]+/)?(\d{9,})'), "/itm/{id}"),
+    'aliexpress': (re.compile(r'/item/(?:[^/]+/)?(\d+)\.html'), "/item/{id}.html"),
+    'etsy': (re.compile(r'/listing/(\d+)'), "/listing/{id}"),
+}
+
+# Host prefixes that serve the same catalogue as the main site
+HOST_ALIASES = ('www.', 'm.', 'smile.', 'mobile.')
+
+TRACKING_PARAMS = {
+    'ref', 'ref_', 'tag', 'psc', 'th', 'linkcode', 'linkid', 'camp', 'creative', 'creativeasin',
+    'gclid', 'fbclid', 'msclkid', 'spm', 'scm', 'pd_rd_r', 'pd_rd_w', 'pd_rd_wg', 'pd_rd_i',
+    'pf_rd_p', 'pf_rd_r', 'qid', 'sr', 'crid', 'sprefix', 'dib', 'dib_tag',
+    'hash', '_trkparms', '_trksid', 'mkevt', 'mkcid', 'mkrid', 'campid', 'toolid', 'customid',
+}
+
+# Search terms carried over onto product pages; on listings they are the query itself
+PRODUCT_PAGE_PARAMS = {'keywords'}
+PRODUCT_PATH = re.compile(r'/(?:dp|gp/product)/', re.I)
+
+_REF_SEGMENT = re.compile(r'/ref=[^/?#]*')
+
+
+def parse_asin(url: str) -> Optional[str]:
+    match = ASIN_PATTERN.search(url or '')
+    return match.group(1).upper() if match else None
+
+
+def _host(url: str) -> str:
+    host = (urlparse(url or '').hostname or '').lower()
+    for prefix in HOST_ALIASES:
+        if host.startswith(prefix):
+            return host[len(prefix):]
+    return host
+
+
+def store_of(url: str) -> str:
+    """Store name for ``url``: its host without ``www.``/mobile prefixes"""
+    return _host(url)
+
+
+def _product_id(url: str, platform: Optional[str]) -> Optional[Tuple[str, str]]:
+    if platform not in PRODUCT_ID_PATTERNS:
+        return None
+    pattern, template = PRODUCT_ID_PATTERNS[platform]
+    match = pattern.search(urlparse(url or '').path)
+    if not match:
+        return None
+    product_id = match.group(1).upper() if platform == 'amazon' else match.group(1)
+    return product_id, template.format(id=product_id)
+
+
+def _is_tracking(name: str, product_page: bool = False) -> bool:
+    name = name.lower()
+    if product_page and name in PRODUCT_PAGE_PARAMS:
+        return True
+    return name in TRACKING_PARAMS or name.startswith(('utm_', 'pd_rd_', 'pf_rd_', 'ref_'))
+
+
+def canonical_url(url: str, platform: Optional[str] = None) -> str:
+    """The URL to scrape for the product behind ``url``"""
+    parsed = urlparse((url or '').strip())
+    host = _host(url)
+    product = _product_id(url, platform)
+    if product:
+        return f"https://www.{host}{product[1]}"
+
+    path = _REF_SEGMENT.sub('', parsed.path).rstrip('/') or '/'
+    product_page = bool(PRODUCT_PATH.search(parsed.path))
+    query = sorted((name, value) for name, value in parse_qsl(parsed.query, keep_blank_values=True)
+                   if not _is_tracking(name, product_page))
+    netloc = parsed.netloc.lower()
+    for prefix in HOST_ALIASES[1:]:
+        if netloc.startswith(prefix):
+            netloc = 'www.' + netloc[len(prefix):]
+    return urlunparse((parsed.scheme.lower() or 'https', netloc, path, '', urlencode(query), ''))
+
+
+def product_key(url: str, platform: Optional[str] = None) -> str:
+    """Stable identity of the product behind ``url``"""
+    host = _host(url)
+    product = _product_id(url, platform)
+    if product:
+        return f"{platform}:{host}:{product[0]}"
+
+    canonical = urlparse(canonical_url(url, platform))
+    query = f"?{canonical.query}" if canonical.query else ''
+    return f"{platform or host}:{host}{canonical.path}{query}"
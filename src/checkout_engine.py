@@ -0,0 +1,75 @@
+"""
+Checkout scenario settings.
+
+Scenarios are quantity tiers (``below_threshold: 1``, ``above_threshold: 5``)
+read from one cart: the item is added once and each tier only changes the
+quantity in place before reading the checkout's delivery options. The
+Playwright backend can instead run every tier in its own isolated context
+at the same time. Simulation can be limited to a stable sample of products,
+chosen by hashing the canonical product key so the same products are
+simulated on every run.
+"""
+
+import hashlib
+from typing import Dict, Optional
+
+from canonical import product_key
+from product_schema import CheckoutScenario
+
+DEFAULT_TIERS = {'below_threshold': 1, 'above_threshold': 5}
+
+
+def scenario_name(quantity: int) -> str:
+    return f"{quantity}_item{'s' if quantity > 1 else ''}"
+
+
+def failed_scenario(quantity: int, error: str) -> CheckoutScenario:
+    return CheckoutScenario(
+        scenario_name=scenario_name(quantity),
+        delivery_options=[],
+        error_message=error
+    )
+
+
+class CheckoutSettings:
+    """Which products get checkout simulation and with which quantity tiers"""
+
+    def __init__(self, enabled: bool = True, sample_rate: float = 1.0,
+                 tiers: Optional[Dict[str, int]] = None, parallel_contexts: bool = False):
+        self.enabled = enabled
+        self.sample_rate = min(max(sample_rate, 0.0), 1.0)
+        self.tiers = dict(tiers or DEFAULT_TIERS)
+        self.parallel_contexts = parallel_contexts
+
+    @classmethod
+    def from_config(cls, config: dict) -> "CheckoutSettings":
+        checkout_config = config.get('checkout', {})
+        return cls(
+            enabled=checkout_config.get('enabled', True),
+            sample_rate=checkout_config.get('sample_rate', 1.0),
+            tiers=checkout_config.get('tiers'),
+            parallel_contexts=checkout_config.get('parallel_contexts', False)
+        )
+
+    def should_simulate(self, url: str, platform: Optional[str]) -> bool:
+        """Stable per product: the same products are sampled on every run"""
+        if not self.enabled or self.sample_rate <= 0:
+            return False
+        if self.sample_rate >= 1:
+            return True
+        digest = hashlib.sha1(product_key(url, platform).encode('utf-8')).hexdigest()
+        return int(digest[:8], 16) / 0xFFFFFFFF < self.sample_rate
+
+
+_settings = CheckoutSettings()
+
+
+def configure_checkout(config: dict) -> CheckoutSettings:
+    """Install the process-wide checkout settings used by every scraper"""
+    global _settings
+    _settings = CheckoutSettings.from_config(config)
+    return _settings
+
+
+def get_checkout_settings() -> CheckoutSettings:
+    return _settings
@@ -0,0 +1,285 @@
+"""
+Batched product-field extraction.
+
+A plan maps each field to its fallback selector list from selectors.yaml.
+The whole plan is evaluated in a single round trip (``execute_script`` for
+Selenium, ``page.evaluate`` for Playwright, lxml for raw HTML) and every
+field comes back as ``{"text", "attrs", "selector"}`` (or a list of those for
+``multiple`` fields), so a missing field costs nothing instead of a timeout.
+"""
+
+import re
+import time
+from typing import Any, Dict, List, Optional
+
+from product_schema import ProductData
+from selector_stats import get_selector_stats
+from utils import parse_stock_status, parse_rating, parse_reviews
+
+# Extra options for selectors.yaml fields that are not plain first-match text
+DEFAULT_FIELD_SPECS: Dict[str, Dict[str, Any]] = {
+    'category': {'multiple': True},
+    'image': {'multiple': True, 'attrs': ['src', 'data-src', 'data-old-hires']},
+    'rating': {'attrs': ['textContent']},
+}
+
+EXTRACT_FUNCTION = r"""
+(plan) => {
+    const clean = (s) => (s || '').replace(/\s+/g, ' ').trim();
+    const read = (el, attrs) => {
+        const out = {text: clean(el.innerText !== undefined ? el.innerText : el.textContent), attrs: {}};
+        for (const attr of attrs) {
+            out.attrs[attr] = attr === 'textContent' ? clean(el.textContent) : el.getAttribute(attr);
+        }
+        return out;
+    };
+    const hasValue = (r) => r.text || Object.values(r.attrs).some((v) => v);
+    const query = (selector) => {
+        try { return document.querySelectorAll(selector); } catch (e) { return []; }
+    };
+    const result = {};
+    for (const [field, spec] of Object.entries(plan)) {
+        const attrs = spec.attrs || [];
+        // Stale selectors are only evaluated when every hot selector misses
+        const tiers = [spec.selectors, spec.fallback || []];
+        if (spec.multiple) {
+            const seen = new Set();
+            const items = [];
+            for (const tier of tiers) {
+                for (const selector of tier) {
+                    for (const el of query(selector)) {
+                        if (seen.has(el)) continue;
+                        seen.add(el);
+                        const r = read(el, attrs);
+                        if (hasValue(r)) { r.selector = selector; items.push(r); }
+                    }
+                }
+                if (items.length) break;
+            }
+            result[field] = items;
+            continue;
+        }
+        result[field] = null;
+        for (const selector of tiers[0].concat(tiers[1])) {
+            for (const el of query(selector)) {
+                const r = read(el, attrs);
+                if (hasValue(r)) { r.selector = selector; result[field] = r; break; }
+            }
+            if (result[field]) break;
+        }
+    }
+    return result;
+}
+"""
+
+READY_FUNCTION = r"""
+(selectors) => document.readyState !== 'loading'
+    && (selectors.length === 0 || selectors.some((s) => {
+        try { return document.querySelector(s) !== null; } catch (e) { return false; }
+    }))
+"""
+
+# Number of resource requests the page has started; stable means network idle
+RESOURCE_COUNT_FUNCTION = "return performance.getEntriesByType('resource').length;"
+
+
+def build_plan(platform_selectors: Dict[str, List[str]],
+               extra_fields: Optional[Dict[str, Dict[str, Any]]] = None,
+               platform: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Turn a platform's selectors.yaml section into an extraction plan. When
+    selector stats are enabled, selectors are ordered by hit rate and stale
+    ones move to the ``fallback`` tier.
+    """
+    stats = get_selector_stats() if platform else None
+    plan = {}
+    for field, selectors in (platform_selectors or {}).items():
+        if not isinstance(selectors, list) or not selectors:
+            continue
+        spec = dict(DEFAULT_FIELD_SPECS.get(field, {}))
+        spec['selectors'] = list(selectors)
+        plan[field] = spec
+    for field, spec in (extra_fields or {}).items():
+        plan[field] = dict(spec)
+
+    if stats:
+        for field, spec in plan.items():
+            hot, stale = stats.order(platform, field, spec['selectors'])
+            spec['selectors'] = hot
+            if stale:
+                spec['fallback'] = stale
+    return plan
+
+
+def record_extraction(platform: Optional[str], plan: Dict[str, Dict[str, Any]],
+                      fields: Dict[str, Any]):
+    """Feed an extraction result back into the selector stats"""
+    stats = get_selector_stats()
+    if stats and platform:
+        stats.record(platform, plan, fields)
+
+
+def extract_with_driver(driver, plan: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Evaluate the plan in the page with one ``execute_script`` call"""
+    return driver.execute_script(f"return ({EXTRACT_FUNCTION})(arguments[0]);", plan) or {}
+
+
+def wait_until_ready(driver, anchor_selectors: List[str], timeout: float) -> bool:
+    """
+    Single readiness condition for the extraction: DOM parsed and one of
+    the anchor selectors present. Returns False on timeout.
+    """
+    from selenium.common.exceptions import TimeoutException
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    script = f"return ({READY_FUNCTION})(arguments[0]);"
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.2).until(
+            lambda d: d.execute_script(script, list(anchor_selectors))
+        )
+        return True
+    except TimeoutException:
+        return False
+
+
+def wait_until_idle(driver, idle_time: float, timeout: float) -> bool:
+    """
+    Wait until the page has started no new requests for ``idle_time``
+    seconds (XHR-driven updates such as cart changes). Returns False on
+    timeout.
+    """
+    deadline = time.monotonic() + timeout
+    count = driver.execute_script(RESOURCE_COUNT_FUNCTION)
+    quiet_since = time.monotonic()
+    while time.monotonic() < deadline:
+        time.sleep(0.1)
+        current = driver.execute_script(RESOURCE_COUNT_FUNCTION)
+        if current != count:
+            count, quiet_since = current, time.monotonic()
+        elif time.monotonic() - quiet_since >= idle_time:
+            return True
+    return False
+
+
+async def extract_with_page(page, plan: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Playwright equivalent of ``extract_with_driver``"""
+    return await page.evaluate(EXTRACT_FUNCTION, plan) or {}
+
+
+async def wait_until_ready_page(page, anchor_selectors: List[str], timeout: float) -> bool:
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+    try:
+        await page.wait_for_function(READY_FUNCTION, arg=list(anchor_selectors),
+                                     timeout=timeout * 1000)
+        return True
+    except PlaywrightTimeoutError:
+        return False
+
+
+def _clean(text: Optional[str]) -> str:
+    return re.sub(r'\s+', ' ', text or '').strip()
+
+
+def _read_element(element, attrs: List[str]) -> Dict[str, Any]:
+    text = _clean(element.text_content())
+    return {
+        'text': text,
+        'attrs': {attr: text if attr == 'textContent' else element.get(attr) for attr in attrs},
+    }
+
+
+def extract_from_tree(tree, plan: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Evaluate the plan against a parsed lxml tree (HTTP fast path)"""
+    def query(selector):
+        try:
+            return tree.cssselect(selector)
+        except Exception:
+            return []
+
+    def has_value(read):
+        return read['text'] or any(read['attrs'].values())
+
+    result: Dict[str, Any] = {}
+    for field, spec in plan.items():
+        attrs = spec.get('attrs', [])
+        tiers = [spec['selectors'], spec.get('fallback', [])]
+        if spec.get('multiple'):
+            seen = set()
+            items = []
+            for tier in tiers:
+                for selector in tier:
+                    for element in query(selector):
+                        if element in seen:
+                            continue
+                        seen.add(element)
+                        read = _read_element(element, attrs)
+                        if has_value(read):
+                            read['selector'] = selector
+                            items.append(read)
+                if items:
+                    break
+            result[field] = items
+            continue
+
+        result[field] = None
+        for selector in tiers[0] + tiers[1]:
+            for element in query(selector):
+                read = _read_element(element, attrs)
+                if has_value(read):
+                    read['selector'] = selector
+                    result[field] = read
+                    break
+            if result[field]:
+                break
+    return result
+
+
+def field_text(fields: Dict[str, Any], name: str, attr: Optional[str] = None) -> Optional[str]:
+    """Text (or ``attr``) of a single-valued field, None when it missed"""
+    value = fields.get(name)
+    if not value:
+        return None
+    if attr:
+        return value['attrs'].get(attr) or value['text'] or None
+    return value['text'] or None
+
+
+def field_texts(fields: Dict[str, Any], name: str) -> List[str]:
+    return [item['text'] for item in fields.get(name) or [] if item['text']]
+
+
+def field_image_urls(fields: Dict[str, Any], name: str = 'image') -> List[str]:
+    images = []
+    for item in fields.get(name) or []:
+        attrs = item['attrs']
+        src = attrs.get('src') or attrs.get('data-src') or attrs.get('data-old-hires')
+        if src and 'http' in src and src not in images:
+            images.append(src)
+    return images
+
+
+def product_from_fields(fields: Dict[str, Any], product_url: str,
+                        structured: Optional[Dict[str, Any]] = None, **overrides) -> ProductData:
+    """
+    Build ProductData from an extraction result using the generic parsers.
+    Values from the page's structured data take precedence over selectors.
+    """
+    categories = field_texts(fields, 'category')
+    data = dict(
+        name=field_text(fields, 'product_name') or "Unknown",
+        price=field_text(fields, 'price') or "0",
+        discount_price=field_text(fields, 'discount_price'),
+        sku=field_text(fields, 'sku'),
+        brand=field_text(fields, 'brand'),
+        category=" > ".join(categories) if categories else None,
+        product_url=product_url,
+        image_urls=field_image_urls(fields),
+        stock_status=parse_stock_status(field_text(fields, 'stock_status')),
+        rating=parse_rating(field_text(fields, 'rating', 'textContent')),
+        reviews=parse_reviews(field_text(fields, 'reviews')),
+        seller=field_text(fields, 'seller')
+    )
+    data.update(structured or {})
+    data.update(overrides)
+    return ProductData(**data)
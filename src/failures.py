@@ -0,0 +1,246 @@
+"""
+Failure taxonomy, stage retries and a per-domain circuit breaker.
+
+A product scrape runs in stages (navigate, extract, one stage per checkout
+tier). An error is classified into one of the kinds below and only the
+stage that raised it is retried, within that kind's attempt budget; stages
+that already succeeded are kept. A crashed browser is relaunched before
+the stage is retried. Block and captcha pages are not retried: they feed a
+per-domain circuit breaker that pauses the store for a cooldown after a
+burst of them, and gives up on the store after ``max_trips`` cooldowns.
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+from canonical import store_of
+
+NAVIGATION_TIMEOUT = 'navigation_timeout'
+BLOCKED = 'blocked'
+SELECTOR_MISS = 'selector_miss'
+CHECKOUT_FAILED = 'checkout_failed'
+DRIVER_CRASH = 'driver_crash'
+CIRCUIT_OPEN = 'circuit_open'
+UNKNOWN = 'unknown'
+
+# Kind of an unclassified error raised inside each stage
+STAGE_KINDS = {
+    'launch': DRIVER_CRASH,
+    'navigate': NAVIGATION_TIMEOUT,
+    'extract': SELECTOR_MISS,
+    'checkout': CHECKOUT_FAILED,
+}
+
+# Attempts per kind, counting the first one
+DEFAULT_ATTEMPTS = {
+    NAVIGATION_TIMEOUT: 3,
+    SELECTOR_MISS: 2,
+    CHECKOUT_FAILED: 2,
+    DRIVER_CRASH: 2,
+    BLOCKED: 1,
+    UNKNOWN: 1,
+}
+
+# Selenium and Playwright messages of a browser or tab that is gone
+CRASH_MARKERS = (
+    'invalid session id',
+    'no such window',
+    'chrome not reachable',
+    'session deleted',
+    'disconnected',
+    'target closed',
+    'has been closed',
+    'page crashed',
+    'connection refused',
+    'connection aborted',
+    'max retries exceeded',
+)
+
+
+class ScrapeFailure(Exception):
+    """A classified scrape error"""
+
+    def __init__(self, kind: str, message: str, stage: Optional[str] = None, retryable: bool = True):
+        super().__init__(message)
+        self.kind = kind
+        self.stage = stage
+        # False when retrying cannot help, e.g. a product without an add-to-cart button
+        self.retryable = retryable
+
+
+def classify(error: BaseException, stage: Optional[str] = None) -> str:
+    if isinstance(error, ScrapeFailure):
+        return error.kind
+    message = str(error).lower()
+    if any(marker in message for marker in CRASH_MARKERS):
+        return DRIVER_CRASH
+    return STAGE_KINDS.get(stage, UNKNOWN)
+
+
+def as_failure(error: BaseException, stage: Optional[str] = None) -> ScrapeFailure:
+    if isinstance(error, ScrapeFailure):
+        return error
+    return ScrapeFailure(classify(error, stage), str(error) or type(error).__name__, stage)
+
+
+class RetryPolicy:
+    """Attempt budget per failure kind for one stage, with exponential backoff"""
+
+    def __init__(self, attempts: Optional[Dict[str, int]] = None, delay: float = 1.0,
+                 max_delay: float = 30.0):
+        self.attempts = {**DEFAULT_ATTEMPTS, **(attempts or {})}
+        self.delay = delay
+        self.max_delay = max_delay
+        self.logger = logging.getLogger(__name__)
+
+    @classmethod
+    def from_config(cls, config: dict) -> "RetryPolicy":
+        retry_config = dict(config.get('retries', {}))
+        delay = retry_config.pop('delay', 1.0)
+        max_delay = retry_config.pop('max_delay', 30.0)
+        return cls(attempts=retry_config, delay=delay, max_delay=max_delay)
+
+    def _next_wait(self, stage: str, error: Exception, retries: Dict[str, int]) -> Tuple[ScrapeFailure, float]:
+        """Failure for ``error`` and how long to wait before retrying; raises it once out of attempts"""
+        failure = as_failure(error, stage)
+        used = retries.get(failure.kind, 0)
+        allowed = self.attempts.get(failure.kind, 1)
+        if not failure.retryable or used + 1 >= allowed:
+            if failure is not error:
+                raise failure from error
+            raise failure
+        retries[failure.kind] = used + 1
+        wait = min(self.delay * 2 ** used, self.max_delay) + random.uniform(0, self.delay)
+        self.logger.warning(f"{stage} failed ({failure.kind}): {failure}. "
+                            f"Retry {used + 1}/{allowed - 1} in {wait:.1f}s")
+        return failure, wait
+
+    def run(self, stage: str, func: Callable[..., Any], *args,
+            recover: Optional[Callable[[], None]] = None, **kwargs) -> Any:
+        """Call ``func`` until it succeeds or its failure kind runs out of attempts"""
+        retries: Dict[str, int] = {}
+        while True:
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                failure, wait = self._next_wait(stage, e, retries)
+            time.sleep(wait)
+            if failure.kind == DRIVER_CRASH and recover:
+                recover()
+
+    async def run_async(self, stage: str, func: Callable[..., Awaitable[Any]], *args,
+                        recover: Optional[Callable[[], Awaitable[None]]] = None, **kwargs) -> Any:
+        retries: Dict[str, int] = {}
+        while True:
+            try:
+                return await func(*args, **kwargs)
+            except Exception as e:
+                failure, wait = self._next_wait(stage, e, retries)
+            await asyncio.sleep(wait)
+            if failure.kind == DRIVER_CRASH and recover:
+                await recover()
+
+
+class _Circuit:
+    def __init__(self):
+        self.blocks: Deque[float] = deque()
+        self.open_until = 0.0
+        self.trips = 0
+
+
+class CircuitBreaker:
+    """
+    Opens a store's circuit after ``threshold`` blocked results within
+    ``window`` seconds. While open, the store's URLs wait for the cooldown,
+    which doubles on every consecutive trip. After a trip the first block
+    reopens the circuit and the first success resets it. After
+    ``max_trips`` consecutive trips the store's remaining URLs fail fast.
+    """
+
+    def __init__(self, threshold: int = 5, window: float = 120.0, cooldown: float = 300.0,
+                 max_cooldown: float = 1800.0, max_trips: int = 3):
+        self.threshold = max(1, threshold)
+        self.window = window
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.max_trips = max(1, max_trips)
+        self.logger = logging.getLogger(__name__)
+        self._circuits: Dict[str, _Circuit] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: dict) -> Optional["CircuitBreaker"]:
+        breaker_config = config.get('circuit_breaker', {})
+        if not breaker_config.get('enabled', True):
+            return None
+        return cls(
+            threshold=breaker_config.get('threshold', 5),
+            window=breaker_config.get('window', 120.0),
+            cooldown=breaker_config.get('cooldown', 300.0),
+            max_cooldown=breaker_config.get('max_cooldown', 1800.0),
+            max_trips=breaker_config.get('max_trips', 3)
+        )
+
+    def _circuit(self, url: str) -> _Circuit:
+        return self._circuits.setdefault(store_of(url), _Circuit())
+
+    def record(self, url: str, blocked: bool, success: bool = False):
+        """Count the outcome of a browser scrape of ``url``"""
+        with self._lock:
+            circuit = self._circuit(url)
+            now = time.monotonic()
+            if not blocked:
+                if success:
+                    circuit.trips = 0
+                return
+            circuit.blocks.append(now)
+            while circuit.blocks and circuit.blocks[0] <= now - self.window:
+                circuit.blocks.popleft()
+            if circuit.trips or len(circuit.blocks) >= self.threshold:
+                cooldown = min(self.cooldown * 2 ** circuit.trips, self.max_cooldown)
+                circuit.trips += 1
+                circuit.blocks.clear()
+                circuit.open_until = now + cooldown
+                if circuit.trips >= self.max_trips:
+                    self.logger.error(f"{store_of(url)} kept blocking after {circuit.trips} cooldowns, "
+                                      f"skipping its remaining URLs")
+                else:
+                    self.logger.warning(f"Circuit open for {store_of(url)}: pausing it for {cooldown:.0f}s")
+
+    def paused_for(self, url: str) -> float:
+        """Seconds until ``url``'s store may be scraped again"""
+        with self._lock:
+            circuit = self._circuit(url)
+            if circuit.trips >= self.max_trips:
+                return 0.0
+            return max(0.0, circuit.open_until - time.monotonic())
+
+    def abandoned(self, url: str) -> bool:
+        """Whether ``url``'s store tripped ``max_trips`` times in a row"""
+        with self._lock:
+            return self._circuit(url).trips >= self.max_trips
+
+
+_retry_policy = RetryPolicy()
+_breaker: Optional[CircuitBreaker] = None
+
+
+def configure_failures(config: dict) -> Tuple[RetryPolicy, Optional[CircuitBreaker]]:
+    """Install the process-wide retry policy and circuit breaker"""
+    global _retry_policy, _breaker
+    _retry_policy = RetryPolicy.from_config(config)
+    _breaker = CircuitBreaker.from_config(config)
+    return _retry_policy, _breaker
+
+
+def get_retry_policy() -> RetryPolicy:
+    return _retry_policy
+
+
+def get_circuit_breaker() -> Optional[CircuitBreaker]:
+    return _breaker
@@ -0,0 +1,215 @@
+"""
+Freshness cache for unchanged products.
+
+Results are cached by canonical product key with a per-platform TTL. Within
+the TTL a product is served from the cache without touching the site. After
+it expires, a cheap HTTP probe decides whether the full browser scrape and
+checkout simulation are needed: a conditional request (``ETag`` /
+``Last-Modified``) answered with 304, or an unchanged hash of the key page
+region (name, price, stock status), renews the entry instead.
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import requests
+from lxml import html as lxml_html
+
+from canonical import product_key
+from dom_extractor import build_plan, extract_from_tree, field_text
+from product_schema import ScrapedResult
+from structured_data import collect_from_tree, parse_structured
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    product_key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    result TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    fingerprint TEXT,
+    page_bytes INTEGER NOT NULL DEFAULT 0,
+    checked_at REAL NOT NULL
+);
+"""
+
+DEFAULT_FINGERPRINT_FIELDS = ['product_name', 'price', 'stock_status']
+
+
+class ProbeResult:
+    """Outcome of one HTTP probe"""
+
+    def __init__(self, unchanged: bool, etag: Optional[str] = None,
+                 last_modified: Optional[str] = None, fingerprint: Optional[str] = None,
+                 page_bytes: int = 0):
+        self.unchanged = unchanged
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fingerprint = fingerprint
+        self.page_bytes = page_bytes
+
+
+class FreshnessCache:
+    def __init__(self, path: str = "data/cache/freshness.sqlite3", default_ttl: float = 86400,
+                 ttls: Optional[Dict[str, float]] = None, fetcher=None,
+                 selectors: Optional[Dict[str, Any]] = None, probe: bool = True,
+                 fingerprint_fields: Optional[List[str]] = None):
+        self.path = path
+        self.default_ttl = default_ttl
+        self.ttls = ttls or {}
+        self.fetcher = fetcher
+        self.selectors = selectors or {}
+        self.probe_enabled = probe and fetcher is not None
+        self.fingerprint_fields = fingerprint_fields or DEFAULT_FINGERPRINT_FIELDS
+        self.logger = logging.getLogger(__name__)
+
+        self.lookups = 0
+        self.hits = 0
+        self.probe_hits = 0
+        self.bytes_saved = 0
+        self._served = set()
+        self._probes: Dict[str, ProbeResult] = {}
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    @classmethod
+    def from_config(cls, config: dict, fetcher=None,
+                    selectors: Optional[Dict[str, Any]] = None) -> Optional["FreshnessCache"]:
+        cache_config = config.get('freshness', {})
+        if not cache_config.get('enabled', False):
+            return None
+        ttls = {
+            name: platform_config['freshness_ttl_hours'] * 3600
+            for name, platform_config in (config.get('platforms') or {}).items()
+            if (platform_config or {}).get('freshness_ttl_hours') is not None
+        }
+        return cls(
+            path=cache_config.get('path', "data/cache/freshness.sqlite3"),
+            default_ttl=cache_config.get('ttl_hours', 24) * 3600,
+            ttls=ttls,
+            fetcher=fetcher,
+            selectors=selectors,
+            probe=cache_config.get('probe', True),
+            fingerprint_fields=cache_config.get('fingerprint_fields')
+        )
+
+    def ttl_for(self, platform: Optional[str]) -> float:
+        return self.ttls.get(platform, self.default_ttl)
+
+    def lookup(self, url: str, platform: Optional[str], probe: bool = True) -> Optional[ScrapedResult]:
+        """
+        The cached result for ``url`` if it is still fresh, else None.
+        ``probe=False`` skips revalidation (pages the fingerprint can't cover).
+        """
+        key = product_key(url, platform)
+        with self._lock:
+            self.lookups += 1
+            row = self._conn.execute(
+                "SELECT result, etag, last_modified, fingerprint, page_bytes, checked_at "
+                "FROM products WHERE product_key = ?", (key,)
+            ).fetchone()
+
+        if row and time.time() - row[5] < self.ttl_for(platform):
+            return self._serve(key, url, row[0], row[4])
+
+        # Nothing cached means nothing to revalidate: go straight to the real scrape
+        probe = self._probe(url, platform, row) if row and self.probe_enabled and probe else None
+        if probe and probe.unchanged:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "UPDATE products SET etag = ?, last_modified = ?, checked_at = ? "
+                    "WHERE product_key = ?",
+                    (probe.etag, probe.last_modified, time.time(), key)
+                )
+                self.probe_hits += 1
+            return self._serve(key, url, row[0], max(row[4] - probe.page_bytes, 0))
+
+        if probe:
+            with self._lock:
+                self._probes[key] = probe
+        return None
+
+    def _serve(self, key: str, url: str, result_json: str, saved: int) -> ScrapedResult:
+        with self._lock:
+            self.hits += 1
+            self.bytes_saved += saved
+            self._served.add(key)
+        return ScrapedResult.model_validate_json(result_json).model_copy(update={'url': url})
+
+    def store(self, url: str, platform: Optional[str], result: ScrapedResult):
+        """Cache a freshly scraped, successful result"""
+        key = product_key(url, platform)
+        with self._lock:
+            probe = self._probes.pop(key, None)
+            if not result.success or key in self._served:
+                return
+        probe = probe or ProbeResult(unchanged=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO products "
+                "(product_key, url, result, etag, last_modified, fingerprint, page_bytes, checked_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, result.model_dump_json(),
+                 probe.etag, probe.last_modified, probe.fingerprint, probe.page_bytes, time.time())
+            )
+
+    def _probe(self, url: str, platform: Optional[str], row) -> Optional[ProbeResult]:
+        headers = {}
+        if row and row[1]:
+            headers['If-None-Match'] = row[1]
+        if row and row[2]:
+            headers['If-Modified-Since'] = row[2]
+        try:
+            response = self.fetcher.get(url, headers=headers)
+        except requests.RequestException as e:
+            self.logger.debug(f"Freshness probe failed for {url}: {e}")
+            return None
+
+        page_bytes = len(response.content)
+        if response.status_code == 304 and row:
+            return ProbeResult(True, row[1], row[2], row[3], page_bytes)
+        if response.status_code >= 400 or not response.text:
+            return None
+        fingerprint = self.fingerprint(response.text, platform)
+        return ProbeResult(
+            unchanged=bool(row and fingerprint and fingerprint == row[3]),
+            etag=response.headers.get('ETag'),
+            last_modified=response.headers.get('Last-Modified'),
+            fingerprint=fingerprint,
+            page_bytes=page_bytes
+        )
+
+    def fingerprint(self, body: str, platform: Optional[str]) -> Optional[str]:
+        """Hash of the page's name, price and stock status; None if none were found"""
+        tree = lxml_html.fromstring(body)
+        structured = parse_structured(collect_from_tree(tree))
+        platform_selectors = self.selectors.get(platform, {}) or {}
+        plan = build_plan({field: platform_selectors[field] for field in self.fingerprint_fields
+                           if field in platform_selectors})
+        fields = extract_from_tree(tree, plan)
+        region = {field: field_text(fields, field) for field in plan}
+        region.update({f"structured.{field}": structured.get(field)
+                       for field in ('name', 'price', 'stock_status')})
+        if not any(region.values()):
+            return None
+        return hashlib.sha1(json.dumps(region, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+    def report(self) -> str:
+        ratio = self.hits / self.lookups if self.lookups else 0.0
+        return (f"Freshness cache: {self.hits}/{self.lookups} hits ({ratio:.0%}), "
+                f"{self.probe_hits} revalidated by probe, "
+                f"~{self.bytes_saved / 1024:.0f} KB of page downloads saved")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,174 @@
+"""
+HTTP-only fast path for pages whose product data is server-rendered.
+
+Pages are fetched over pooled keep-alive ``requests`` sessions and parsed with
+lxml using the same CSS selector lists as the browser scrapers. When a
+required field comes back empty the caller falls back to the browser.
+"""
+
+import logging
+import threading
+import time
+import requests
+from lxml import etree, html as lxml_html
+from requests.adapters import HTTPAdapter
+from typing import Any, Dict, List, Optional, Tuple
+from dom_extractor import build_plan, extract_from_tree, product_from_fields, record_extraction
+from proxy_pool import ProxyUnavailable, get_proxy_pool, looks_blocked
+from listing import extract_listing_from_tree, get_listing_settings, listing_result
+from product_schema import ScrapedResult
+from structured_data import collect_from_tree, parse_structured, remaining_plan
+from warm_start import shared_selectors, shared_user_agent
+
+
+class HttpFetcher:
+    """Thread-safe page fetcher backed by one pooled session per thread"""
+
+    def __init__(self, timeout: float = 10.0, pool_size: int = 20):
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.ua = shared_user_agent()
+        self._local = threading.local()
+
+    @property
+    def session(self) -> requests.Session:
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.headers.update({
+                'User-Agent': self.ua.random,
+                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+                'Accept-Encoding': 'gzip, deflate',
+                'Accept-Language': 'en-US,en;q=0.9',
+                'Connection': 'keep-alive',
+            })
+            self._local.session = session
+        return session
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        proxies = get_proxy_pool()
+        if not proxies:
+            return self.session.get(url, headers=headers, timeout=self.timeout)
+
+        proxy = proxies.acquire(url)
+        started = time.monotonic()
+        try:
+            response = self.session.get(url, headers=headers, timeout=self.timeout,
+                                        proxies=proxy.requests_proxies())
+        except requests.RequestException:
+            proxies.report(proxy, success=False)
+            raise
+        blocked = looks_blocked(response.status_code, response.text)
+        proxies.report(proxy, success=response.status_code < 500, latency=time.monotonic() - started,
+                       blocked=blocked)
+        return response
+
+    def fetch(self, url: str) -> Tuple[int, str, str]:
+        """Return (status code, body, final URL)"""
+        response = self.get(url)
+        return response.status_code, response.text, response.url
+
+
+class StaticScraper:
+    """Selector-driven product extraction from raw HTML"""
+
+    def __init__(self, fetcher: Optional[HttpFetcher] = None,
+                 required_fields: Optional[List[str]] = None):
+        self.fetcher = fetcher or HttpFetcher()
+        self.required_fields = required_fields or ['product_name', 'price']
+        self.logger = logging.getLogger(__name__)
+        self.selectors = self.load_selectors()
+
+    @classmethod
+    def from_config(cls, config: dict) -> "StaticScraper":
+        http_config = config.get('http', {})
+        return cls(
+            fetcher=HttpFetcher(
+                timeout=http_config.get('timeout', 10),
+                pool_size=http_config.get('pool_size', 20)
+            ),
+            required_fields=http_config.get('required_fields')
+        )
+
+    def load_selectors(self) -> Dict[str, Any]:
+        return shared_selectors('config/selectors.yaml')
+
+    def _fetch_tree(self, url: str):
+        """Parsed page with absolute links and its final URL, None if the fetch failed"""
+        try:
+            status, body, final_url = self.fetcher.fetch(url)
+        except (requests.RequestException, ProxyUnavailable) as e:
+            self.logger.info(f"HTTP fetch failed for {url}: {e}")
+            return None
+        if status >= 400 or not body:
+            self.logger.info(f"HTTP fetch of {url} returned {status}")
+            return None
+
+        try:
+            tree = lxml_html.fromstring(body)
+        except (etree.ParserError, ValueError) as e:
+            # e.g. a body of whitespace only
+            self.logger.info(f"Could not parse {url}: {e}")
+            return None
+        tree.make_links_absolute(final_url, resolve_base_href=True)
+        return tree, final_url
+
+    def scrape(self, url: str, platform: str, store: str) -> Tuple[Optional[ScrapedResult], List[str]]:
+        """
+        Fetch and parse ``url``. Returns the result (None if the page could
+        not be fetched) and the required selector fields that came back empty.
+        """
+        spec = (self.selectors.get(platform) or {}).get('listing')
+        if spec and get_listing_settings().is_listing(url, platform):
+            return self.scrape_listing(url, platform, spec)
+
+        page = self._fetch_tree(url)
+        if page is None:
+            return None, list(self.required_fields)
+        tree, final_url = page
+        structured = parse_structured(collect_from_tree(tree))
+        full_plan = build_plan(self.selectors.get(platform, {}) or {}, platform=platform)
+        plan = remaining_plan(full_plan, structured)
+        fields = extract_from_tree(tree, plan)
+        record_extraction(platform, plan, fields)
+        covered = set(full_plan) - set(plan)
+        missing = [field for field in self.required_fields
+                   if field not in covered and not fields.get(field)]
+        product = product_from_fields(fields, final_url, structured)
+
+        result = ScrapedResult(
+            store=store,
+            url=url,
+            product=product,
+            success=not missing,
+            error_message=f"Missing required fields: {', '.join(missing)}" if missing else None
+        )
+        return result, missing
+
+    def scrape_listing(self, url: str, platform: str,
+                       spec: Dict[str, Any]) -> Tuple[Optional[ScrapedResult], List[str]]:
+        """
+        Product cards of a server-rendered listing, following pagination up
+        to ``listing.max_pages``. Reports ``card`` as missing when no cards
+        were found so the caller can retry in a browser.
+        """
+        settings = get_listing_settings()
+        cards, title, page_url, pages = [], None, url, 0
+        while page_url and pages < settings.max_pages:
+            if pages:
+                time.sleep(settings.page_interval)
+            page = self._fetch_tree(page_url)
+            if page is None:
+                break
+            listing = extract_listing_from_tree(page[0], spec)
+            title = title or listing.get('title')
+            cards.extend(listing['cards'])
+            page_url = listing.get('next')
+            pages += 1
+        if not pages:
+            return None, ['card']
+        result = listing_result(url, platform, cards, title, pages)
+        return result, [] if result.success else ['card']
@@ -0,0 +1,218 @@
+"""
+Search and category listing pages.
+
+A listing URL (Amazon ``/s?k=``, eBay ``/sch/``, Jumia ``/catalog/``) shows
+dozens of product cards. Instead of scraping it as a product page, every
+card's name, price, rating, image and link is read in one pass per page
+(one ``execute_script`` / ``page.evaluate`` call, or one lxml walk over raw
+HTML), pagination is followed up to ``listing.max_pages`` and the cards come
+back as ``ScrapedResult.listing_items``.
+"""
+
+import re
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+from canonical import canonical_url, product_key, store_of
+from product_schema import ProductData, ScrapedResult, StockStatus
+from utils import parse_rating, parse_reviews
+
+# URL paths that are listings rather than product pages
+LISTING_PATTERNS: Dict[str, List[str]] = {
+    'amazon': [r'^/s(?:/|$)', r'^/b(?:/|$)', r'/zgbs/', r'^/gp/bestsellers', r'^/gp/browse\.html'],
+    'ebay': [r'^/sch/', r'^/b/'],
+    'jumia': [r'^/catalog/'],
+    'etsy': [r'^/search(?:/|$)', r'^/c/'],
+    'aliexpress': [r'^/w/wholesale', r'^/category/'],
+}
+
+# Card field -> what to read from the first matching element
+CARD_FIELDS = {
+    'name': 'text',
+    'price': 'text',
+    'rating': 'text',
+    'reviews': 'text',
+    'image': 'src',
+    'link': 'href',
+}
+
+LISTING_FUNCTION = r"""
+(spec) => {
+    const clean = (s) => (s || '').replace(/\s+/g, ' ').trim();
+    const query = (root, selector) => {
+        try { return Array.from(root.querySelectorAll(selector)); } catch (e) { return []; }
+    };
+    const read = (el, attr) => {
+        if (attr === 'href') return el.href || el.getAttribute('href');
+        if (attr === 'src') return el.getAttribute('data-src') || el.currentSrc || el.src;
+        return clean(el.textContent);
+    };
+    const first = (root, selectors, attr) => {
+        for (const selector of selectors || []) {
+            for (const el of query(root, selector)) {
+                const value = read(el, attr);
+                if (value) return value;
+            }
+        }
+        return null;
+    };
+    let cards = [];
+    for (const selector of spec.card || []) {
+        cards = query(document, selector);
+        if (cards.length) break;
+    }
+    return {
+        title: document.title,
+        next: first(document, spec.next_page, 'href'),
+        cards: cards.map((card) => {
+            const out = {};
+            for (const [field, attr] of Object.entries(spec.fields)) {
+                out[field] = first(card, spec[field], attr);
+            }
+            return out;
+        }),
+    };
+}
+"""
+
+
+class ListingSettings:
+    """Which URLs are listings and how far to follow their pagination"""
+
+    def __init__(self, enabled: bool = True, max_pages: int = 3, page_interval: float = 2.0,
+                 follow_products: bool = False,
+                 patterns: Optional[Dict[str, List[str]]] = None):
+        self.enabled = enabled
+        self.max_pages = max(1, max_pages)
+        self.page_interval = page_interval
+        self.follow_products = follow_products
+        self.patterns = {platform: [re.compile(pattern) for pattern in platform_patterns]
+                         for platform, platform_patterns in (patterns or LISTING_PATTERNS).items()}
+
+    @classmethod
+    def from_config(cls, config: dict) -> "ListingSettings":
+        listing_config = config.get('listing', {})
+        patterns = dict(LISTING_PATTERNS)
+        for name, platform_config in (config.get('platforms') or {}).items():
+            if (platform_config or {}).get('listing_patterns') is not None:
+                patterns[name] = platform_config['listing_patterns']
+        return cls(
+            enabled=listing_config.get('enabled', True),
+            max_pages=listing_config.get('max_pages', 3),
+            page_interval=listing_config.get('page_interval', 2.0),
+            follow_products=listing_config.get('follow_products', False),
+            patterns=patterns
+        )
+
+    def is_listing(self, url: str, platform: Optional[str]) -> bool:
+        if not self.enabled:
+            return False
+        path = urlparse(url or '').path or '/'
+        return any(pattern.search(path) for pattern in self.patterns.get(platform, []))
+
+
+_settings = ListingSettings()
+
+
+def configure_listing(config: dict) -> ListingSettings:
+    """Install the process-wide listing settings used by every scraper"""
+    global _settings
+    _settings = ListingSettings.from_config(config)
+    return _settings
+
+
+def get_listing_settings() -> ListingSettings:
+    return _settings
+
+
+def _script_spec(spec: Dict[str, Any]) -> Dict[str, Any]:
+    return {**spec, 'fields': CARD_FIELDS}
+
+
+def extract_listing_with_driver(driver, spec: Dict[str, Any]) -> Dict[str, Any]:
+    """Every card on the current page with one ``execute_script`` call"""
+    return driver.execute_script(f"return ({LISTING_FUNCTION})(arguments[0]);",
+                                 _script_spec(spec)) or {}
+
+
+async def extract_listing_with_page(page, spec: Dict[str, Any]) -> Dict[str, Any]:
+    """Playwright equivalent of ``extract_listing_with_driver``"""
+    return await page.evaluate(LISTING_FUNCTION, _script_spec(spec)) or {}
+
+
+def _query(root, selector: str):
+    try:
+        return root.cssselect(selector)
+    except Exception:
+        return []
+
+
+def _read(element, attr: str) -> Optional[str]:
+    if attr == 'href':
+        return element.get('href')
+    if attr == 'src':
+        return element.get('data-src') or element.get('src')
+    return re.sub(r'\s+', ' ', element.text_content() or '').strip()
+
+
+def _first(root, selectors: Optional[List[str]], attr: str = 'text') -> Optional[str]:
+    for selector in selectors or []:
+        for element in _query(root, selector):
+            value = _read(element, attr)
+            if value:
+                return value
+    return None
+
+
+def extract_listing_from_tree(tree, spec: Dict[str, Any]) -> Dict[str, Any]:
+    """lxml equivalent for server-rendered listings; links must already be absolute"""
+    cards = []
+    for selector in spec.get('card', []):
+        cards = _query(tree, selector)
+        if cards:
+            break
+    title = tree.find('.//title')
+    return {
+        'title': title.text_content().strip() if title is not None else None,
+        'next': _first(tree, spec.get('next_page'), 'href'),
+        'cards': [{field: _first(card, spec.get(field), attr) for field, attr in CARD_FIELDS.items()}
+                  for card in cards],
+    }
+
+
+def card_product(card: Dict[str, Any], platform: Optional[str]) -> ProductData:
+    image = card.get('image')
+    return ProductData(
+        name=card.get('name') or "Unknown",
+        price=card.get('price') or "0",
+        product_url=canonical_url(card['link'], platform),
+        image_urls=[image] if image and image.startswith('http') else [],
+        # Listings only show a price for products that can be bought
+        stock_status=StockStatus.IN_STOCK if card.get('price') else StockStatus.OUT_OF_STOCK,
+        rating=parse_rating(card.get('rating')),
+        reviews=parse_reviews(card.get('reviews'))
+    )
+
+
+def listing_result(url: str, platform: Optional[str], cards: List[Dict[str, Any]],
+                   title: Optional[str] = None, pages: int = 1) -> ScrapedResult:
+    """One result for the listing URL carrying a product per distinct card"""
+    items: Dict[str, ProductData] = {}
+    for card in cards:
+        if not card.get('link'):
+            continue
+        # Sponsored cards repeat across pages
+        items.setdefault(product_key(card['link'], platform), card_product(card, platform))
+    return ScrapedResult(
+        store=store_of(url),
+        url=url,
+        product=ProductData(
+            name=title or url,
+            price="",
+            product_url=url,
+            stock_status=StockStatus.IN_STOCK if items else StockStatus.OUT_OF_STOCK
+        ),
+        listing_items=list(items.values()),
+        success=bool(items),
+        error_message=None if items else f"No product cards found on {pages} listing page(s)"
+    )
@@ -4,23 +4,72 @@ Main orchestrator for multi-platform e-commerce scraper
 """
 
 import argparse
+import json
 import logging
-from typing import List
+import multiprocessing
+import os
+import socket
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
 from scraper_factory import ScraperFactory
+from platform_registry import configure_platforms
 from output_writer import OutputWriter
-from utils import setup_logging, read_urls_from_file, retry_on_failure
+from browser_pool import BrowserPool
+from scheduler import DomainScheduler
+from http_scraper import HttpFetcher, StaticScraper
+from freshness_cache import FreshnessCache
+from canonical import canonical_url, product_key
+from listing import configure_listing
+from checkout_engine import configure_checkout
+from screenshot_store import close_screenshots, configure_screenshots
+from proxy_pool import configure_proxies
+from failures import BLOCKED, CIRCUIT_OPEN, as_failure, configure_failures
+from selector_stats import configure_selector_stats
+from network_policy import configure_network_policies
+from warm_start import configure_warm_start, get_warm_start, shared_selectors, shared_user_agent
+from utils import setup_logging, read_urls_from_file
 from product_schema import ScrapedResult
+from result_sink import NdjsonSink, input_order, new_run_id
+from run_journal import RunJournal, DONE, FAILED
+from work_queue import DONE as JOB_DONE, FAILED as JOB_FAILED, LEASED, QUEUED, LeaseKeeper, open_work_queue
 import yaml
-import time
 
 class ECommerceScraper:
-    def __init__(self, config_path: str = "config/settings.yaml"):
+    def __init__(self, config_path: str = "config/settings.yaml", workers: Optional[int] = None):
         self.config = self.load_config(config_path)
-        self.output_writer = OutputWriter(
-            json_path=self.config['output']['json_path'],
-            csv_path=self.config['output']['csv_path'],
-            excel_path=self.config['output']['excel_path']
+        self.platforms = configure_platforms(self.config)
+        self.workers = workers or self.config.get('scheduler', {}).get('workers', 1)
+        self.behavior = self.config.get('scraper', {}).get('behavior', 'stealth')
+        if self.behavior not in ('stealth', 'throughput'):
+            logging.warning(f"Unknown behavior '{self.behavior}', using stealth")
+            self.behavior = 'stealth'
+        self.retry_policy, self.breaker = configure_failures(self.config)
+        self.scheduler = DomainScheduler.from_config(
+            self.config, hold=self.breaker.paused_for if self.breaker else None
         )
+        self.output_writer = OutputWriter.from_config(self.config)
+        # Built by the ``browser_pool`` property once a URL needs Selenium
+        self._browser_pool = None
+        self._lazy_lock = threading.Lock()
+        self.selector_stats = configure_selector_stats(self.config)
+        configure_network_policies(self.config)
+        configure_warm_start(self.config)
+        self.listing = configure_listing(self.config)
+        configure_checkout(self.config)
+        configure_screenshots(self.config)
+        self.proxies = configure_proxies(self.config)
+        self.journal = RunJournal.from_config(self.config)
+        # Opened by the ``history`` property on first use
+        self._history = None
+        self._history_opened = False
+        self.static_scraper = None
+        if self.config.get('http', {}).get('enabled', False):
+            self.static_scraper = StaticScraper.from_config(self.config)
+        # Opened by the ``freshness`` property on first lookup
+        self._freshness = None
+        self._freshness_opened = False
         setup_logging()
     
     def load_config(self, config_path: str) -> dict:
@@ -40,87 +89,574 @@ class ECommerceScraper:
                 }
             }
     
-    @retry_on_failure(max_retries=3, delay=2.0)
+    @property
+    def browser_pool(self) -> Optional[BrowserPool]:
+        """The Selenium driver pool, created on first use; None when it is disabled"""
+        if not self.config.get('browser_pool', {}).get('enabled', False):
+            return None
+        with self._lazy_lock:
+            if self._browser_pool is None:
+                self._browser_pool = BrowserPool.from_config(self.config, min_size=self.workers)
+            return self._browser_pool
+    
+    @property
+    def freshness(self) -> Optional[FreshnessCache]:
+        """The freshness cache, opened on first use; None when it is disabled"""
+        if not self._freshness_opened:
+            with self._lazy_lock:
+                if not self._freshness_opened:
+                    if self.config.get('freshness', {}).get('enabled', False):
+                        self._freshness = FreshnessCache.from_config(
+                            self.config,
+                            fetcher=self.static_scraper.fetcher if self.static_scraper else HttpFetcher(),
+                            selectors=shared_selectors()
+                        )
+                    self._freshness_opened = True
+        return self._freshness
+    
+    @property
+    def history(self):
+        """The price history store, opened on first use; None when it is disabled"""
+        if not self._history_opened:
+            from price_history import PriceHistory
+            self._history = PriceHistory.from_config(self.config)
+            self._history_opened = True
+        return self._history
+    
+    def platform_of(self, url: str) -> Optional[str]:
+        return ScraperFactory.platform_for(url, self.config.get('platforms', {}))
+    
+    def lookup_fresh(self, url: str) -> Optional[ScrapedResult]:
+        """Cached result for a product that hasn't changed since it was last scraped"""
+        if not self.freshness:
+            return None
+        platform = self.platform_of(url)
+        # Listing pages change too often for the product fingerprint to vouch for them
+        cached = self.freshness.lookup(url, platform, probe=not self.listing.is_listing(url, platform))
+        if cached:
+            logging.info(f"Unchanged since last scrape, served from cache: {url}")
+        return cached
+    
+    def prefetch(self, url: str) -> Optional[ScrapedResult]:
+        """Result obtainable without a browser: a fresh cached copy or the HTTP fast path"""
+        return self.lookup_fresh(url) or self.scrape_static(url)
+    
+    def scrape_static(self, url: str) -> Optional[ScrapedResult]:
+        """
+        HTTP fast path for platforms with ``requires_js: false``. Returns None
+        when the page has to go through a browser; a result with
+        ``success=False`` means required fields were missing.
+        """
+        if not self.static_scraper:
+            return None
+        platforms = self.config.get('platforms', {})
+        platform = ScraperFactory.platform_for(url, platforms)
+        if not platform or platforms[platform].get('requires_js', True):
+            return None
+        
+        result, missing = self.static_scraper.scrape(
+            url, platform, ScraperFactory._extract_domain(url)
+        )
+        if missing:
+            logging.info(f"HTTP fast path missed {', '.join(missing)} for {url}")
+        return result
+    
     def scrape_url(self, url: str) -> ScrapedResult:
-        """Scrape a single URL"""
+        """Scrape a single URL; scrapers retry their own stages (see failures.py)"""
+        try:
+            static_result = self.scrape_static(url)
+        except Exception as e:
+            # Same as the Playwright prefetch: the browser gets its turn regardless
+            logging.info(f"HTTP fast path failed for {url}: {e}")
+            static_result = None
+        if static_result and static_result.success:
+            logging.info(f"Successfully scraped over HTTP: {url}")
+            return static_result
+        
         scraper = ScraperFactory.create_scraper(
             url, 
-            headless=self.config['scraper'].get('headless', True)
+            headless=self.config['scraper'].get('headless', True),
+            behavior=self.behavior
         )
         
+        if not scraper and static_result:
+            return static_result
+        
+        if scraper and self.breaker and self.breaker.abandoned(url):
+            return self._failed_result(url, scraper.platform, "Store is blocking requests, skipped",
+                                       CIRCUIT_OPEN)
+        
         if not scraper:
             logging.warning(f"No scraper found for URL: {url}")
-            return ScrapedResult(
-                store="unknown",
-                url=url,
-                product={
-                    "name": "",
-                    "price": "",
-                    "product_url": url,
-                    "stock_status": "Out of Stock"
-                },
-                success=False,
-                error_message="Unsupported platform"
-            )
+            return self._failed_result(url, "unknown", "Unsupported platform")
         
         try:
-            with scraper:
-                result = scraper.scrape_product(url)
+            if self.browser_pool:
+                with self.browser_pool.lease() as driver:
+                    scraper.attach_driver(driver)
+                    try:
+                        result = self._scrape_through_proxy(scraper, url)
+                    finally:
+                        scraper.close()
+            else:
+                with scraper:
+                    result = self._scrape_through_proxy(scraper, url)
+            if result.success:
                 logging.info(f"Successfully scraped: {url}")
-                return result
+            else:
+                logging.warning(f"Failed to scrape {url}: {result.error_message}")
         except Exception as e:
-            logging.error(f"Error scraping {url}: {e}")
-            return ScrapedResult(
-                store=scraper.platform,
-                url=url,
-                product={
-                    "name": "",
-                    "price": "",
-                    "product_url": url,
-                    "stock_status": "Out of Stock"
-                },
-                success=False,
-                error_message=str(e)
-            )
+            failure = as_failure(e)
+            logging.error(f"Error scraping {url} ({failure.kind}): {failure}")
+            result = self._failed_result(url, scraper.platform, str(failure), failure.kind)
+        if self.breaker:
+            self.breaker.record(url, result.failure_kind == BLOCKED, result.success)
+        return result
     
-    def scrape_urls(self, urls: List[str]) -> List[ScrapedResult]:
-        """Scrape multiple URLs"""
-        results = []
+    @staticmethod
+    def _failed_result(url: str, store: str, error: str, failure_kind: Optional[str] = None) -> ScrapedResult:
+        return ScrapedResult(
+            store=store,
+            url=url,
+            product={
+                "name": "",
+                "price": "",
+                "product_url": url,
+                "stock_status": "Out of Stock"
+            },
+            success=False,
+            error_message=error,
+            failure_kind=failure_kind
+        )
+    
+    def _scrape_through_proxy(self, scraper, url: str) -> ScrapedResult:
+        """Scrape with the driver's proxy charged against its budget and scored on the outcome"""
+        proxy = getattr(scraper.driver, 'proxy', None)
+        if not (self.proxies and proxy):
+            return scraper.scrape(url)
+        self.proxies.charge(proxy, url)
+        started = time.monotonic()
+        try:
+            result = scraper.scrape(url)
+        except Exception:
+            self.proxies.report(proxy, success=False)
+            raise
+        self.proxies.report(proxy, result.success, time.monotonic() - started, scraper.page_blocked())
+        return result
+    
+    def _scrape_url_safe(self, url: str) -> ScrapedResult:
+        """Scrape a URL, turning an unexpected error into a failed result"""
+        try:
+            return self.lookup_fresh(url) or self.scrape_url(url)
+        except Exception as e:
+            failure = as_failure(e)
+            logging.error(f"Giving up on {url}: {failure}")
+            return self._failed_result(url, ScraperFactory._extract_domain(url) or "unknown",
+                                       str(failure), failure.kind)
+    
+    def backend_for(self, url: str) -> str:
+        """Scraping backend configured for the URL's platform"""
+        platforms = self.config.get('platforms', {})
+        platform = ScraperFactory.platform_for(url, platforms)
+        backend = platforms[platform].get('backend', 'selenium') if platform else 'selenium'
+        if backend not in ('selenium', 'playwright'):
+            logging.warning(f"Unknown backend '{backend}' for {platform}, using selenium")
+            backend = 'selenium'
+        return backend
+    
+    def scrape_urls(self, urls: List[str],
+                    emit: Optional[Callable[[int, ScrapedResult], None]] = None,
+                    on_start: Optional[Callable[[int], None]] = None) -> List[ScrapedResult]:
+        """
+        Scrape multiple URLs, pacing each domain per the scheduler limits.
+        With ``emit`` each result is handed to it as soon as it completes
+        and nothing is kept in memory (an empty list is returned).
+        """
+        total = len(urls)
+        done = [0]
+        lock = threading.Lock()
+        completed = set()
+        results: List[Optional[ScrapedResult]] = [] if emit else [None] * total
+        
+        def on_result(index: int, result: ScrapedResult):
+            if self.freshness:
+                self.freshness.store(urls[index], self.platform_of(urls[index]), result)
+            if emit:
+                emit(index, result)
+            with lock:
+                if not emit:
+                    results[index] = result
+                completed.add(index)
+                done[0] += 1
+                logging.info(f"Finished URL {done[0]}/{total} (#{index + 1}): {result.url}")
         
-        for i, url in enumerate(urls):
-            logging.info(f"Scraping URL {i+1}/{len(urls)}: {url}")
+        groups = {'selenium': [], 'playwright': []}
+        for index, url in enumerate(urls):
+            groups[self.backend_for(url)].append(index)
+        
+        # Playwright URLs run on their own event loop alongside the Selenium workers
+        playwright_thread = None
+        playwright_errors = []
+        if groups['playwright']:
+            from playwright_backend import PlaywrightRunner
+            
+            playwright_indexes = groups['playwright']
+            runner = PlaywrightRunner.from_config(
+                self.config,
+                lambda url, page: ScraperFactory.create_async_scraper(url, page, self.behavior),
+                self.scheduler,
+                prefetch=self.prefetch
+            )
             
-            result = self.scrape_url(url)
-            results.append(result)
+            def run_playwright():
+                try:
+                    runner.scrape_urls(
+                        [urls[i] for i in playwright_indexes],
+                        on_result=lambda j, result: on_result(playwright_indexes[j], result),
+                        keep_results=False,
+                        on_start=(lambda j: on_start(playwright_indexes[j])) if on_start else None
+                    )
+                except Exception as e:
+                    playwright_errors.append(e)
             
-            # Add delay between requests
-            if i < len(urls) - 1:
-                delay = self.config['scraper'].get('delay_between_requests', 2.0)
-                time.sleep(delay)
+            playwright_thread = threading.Thread(target=run_playwright, name="playwright-backend")
+            playwright_thread.start()
+        
+        if groups['selenium']:
+            selenium_indexes = groups['selenium']
+            self.scheduler.run(
+                [urls[i] for i in selenium_indexes],
+                self._scrape_url_safe,
+                workers=self.workers,
+                on_result=lambda j, result: on_result(selenium_indexes[j], result),
+                keep_results=False,
+                on_start=(lambda j: on_start(selenium_indexes[j])) if on_start else None
+            )
+        
+        if playwright_thread:
+            playwright_thread.join()
+            if playwright_errors:
+                logging.error(f"Playwright backend failed: {playwright_errors[0]}")
+                for index in groups['playwright']:
+                    if index not in completed:
+                        on_result(index, PlaywrightRunner._failed_result(
+                            urls[index], "unknown", str(playwright_errors[0])
+                        ))
         
         return results
     
-    def run(self, urls: List[str]):
-        """Main execution method"""
-        logging.info(f"Starting scraping of {len(urls)} URLs")
+    def collapse_duplicates(self, urls: List[str]) -> Tuple[List[str], List[List[int]]]:
+        """
+        Map URLs to product keys and keep one canonical URL per product.
+        Returns the URLs to scrape and, for each, the positions in ``urls``
+        it stands for.
+        """
+        positions: Dict[str, List[int]] = {}
+        targets: List[str] = []
+        for position, url in enumerate(urls):
+            platform = self.platform_of(url)
+            key = product_key(url, platform)
+            if key not in positions:
+                positions[key] = []
+                targets.append(canonical_url(url, platform))
+            positions[key].append(position)
+        return targets, list(positions.values())
+    
+    def warm_up(self, urls: List[str]):
+        """Load shared state and launch browsers before the first URL is scraped"""
+        shared_user_agent()
+        shared_selectors()
+        if any(self.backend_for(url) == 'selenium' for url in urls):
+            get_warm_start().driver_path()
+            if self.browser_pool and self.config.get('warm_start', {}).get('warm_pool', True):
+                self.browser_pool.warm(min(self.workers, len(urls)))
+    
+    def run(self, urls: List[str], run_id: Optional[str] = None, resume: bool = False):
+        """
+        Main execution method. With ``resume`` the URLs of journaled run
+        ``run_id`` that have not finished are scraped instead of ``urls``.
+        """
+        journal = self.journal
+        if resume:
+            if not journal or not journal.has_run(run_id):
+                logging.error(f"Run {run_id} not found in the run journal")
+                return
+            todo = journal.unfinished(run_id)
+        else:
+            run_id = run_id or new_run_id()
+            if journal:
+                journal.start_run(run_id, urls)
+            todo = list(enumerate(urls))
+        
+        # Positions in ``todo`` -> input positions of the journaled run
+        indexes = [index for index, _ in todo]
+        todo_urls = [url for _, url in todo]
+        targets, members = self.collapse_duplicates(todo_urls)
+        logging.info(f"{'Resuming' if resume else 'Starting'} scraping of {len(todo_urls)} URLs "
+                     f"({len(targets)} distinct products, run {run_id})")
+        started = time.perf_counter()
         
-        results = self.scrape_urls(urls)
+        on_durable = None
+        if journal:
+            on_durable = lambda entries: journal.mark_written(run_id, entries)
         
-        # Write results
-        self.output_writer.write_results(results)
+        def on_start(target: int):
+            if journal:
+                for position in members[target]:
+                    journal.mark_in_flight(run_id, indexes[position])
+        
+        # Product pages found on listing pages, for the follow-up detail pass
+        discovered: Dict[str, str] = {}
+        discovered_lock = threading.Lock()
+        
+        def emit(target: int, result: ScrapedResult):
+            if self.listing.follow_products and result.listing_items:
+                with discovered_lock:
+                    for item in result.listing_items:
+                        product_url = item.product_url
+                        discovered.setdefault(product_key(product_url, self.platform_of(product_url)),
+                                              product_url)
+            # Fan the product's result out to every input URL that named it
+            for position in members[target]:
+                url = todo_urls[position]
+                sink.write(indexes[position],
+                           result if result.url == url else result.model_copy(update={'url': url}))
+        
+        sink = NdjsonSink.for_run(self.config, run_id, on_durable)
+        try:
+            self.scrape_urls(targets, emit=emit, on_start=on_start)
+        finally:
+            sink.close()
+            if self.selector_stats:
+                self.selector_stats.save()
+        logging.info(f"Results streamed to {sink.path}")
+        
+        # Derive the regular outputs from the stream, in input order
+        offsets = journal.result_offsets(run_id) if journal else input_order(sink.path)
+        self.output_writer.write_from_stream(sink.path, run_id, offsets)
+        if self.history:
+            self.history.ingest_stream(sink.path, offsets, self.platform_of)
         
         # Print summary
-        successful = sum(1 for r in results if r.success)
-        logging.info(f"Scraping completed. Successful: {successful}/{len(urls)}")
+        if journal:
+            states = journal.summary(run_id)
+            logging.info(f"Run {run_id}: {states.get(DONE, 0)}/{sum(states.values())} URLs done, "
+                         f"{states.get(FAILED, 0)} failed")
+        logging.info(f"Scraping completed. Successful: {sink.successful}/{len(todo_urls)}")
+        if self._freshness:
+            logging.info(self._freshness.report())
+        if self.proxies:
+            logging.info(self.proxies.report_text())
+        logging.info(f"Scrape time: {time.perf_counter() - started:.1f}s")
+        
+        if discovered:
+            self.follow_products(discovered, targets, run_id)
+    
+    def follow_products(self, discovered: Dict[str, str], scraped: List[str], run_id: str):
+        """Scrape the product pages found on listings as their own run"""
+        scraped_keys = {product_key(url, self.platform_of(url)) for url in scraped}
+        urls = [url for key, url in discovered.items() if key not in scraped_keys
+                and not self.listing.is_listing(url, self.platform_of(url))]
+        if not urls:
+            return
+        logging.info(f"Following {len(urls)} products found on listing pages")
+        products_run = f"{run_id}-products"
+        if self.journal and self.journal.has_run(products_run):
+            # A resumed or repeated run: finish the earlier pass and add what it didn't list
+            self.journal.add_urls(products_run, urls)
+            self.run(urls, run_id=products_run, resume=True)
+        else:
+            self.run(urls, run_id=products_run)
+    
+    def close(self):
+        """Quit pooled browsers and finish pending screenshots once every run is finished"""
+        if self._browser_pool:
+            self._browser_pool.close()
+        close_screenshots()
+        if self._history:
+            self._history.close()
+
+    def enqueue(self, urls: List[str], batch: Optional[str] = None) -> str:
+        """Load URLs into the work queue as one batch for ``--worker`` processes"""
+        batch = batch or new_run_id()
+        queue = open_work_queue(self.config)
+        try:
+            added = queue.enqueue(batch, urls, self.platform_of)
+        finally:
+            queue.close()
+        logging.info(f"Queued {added} products from {len(urls)} URLs as batch {batch}")
+        return batch
+    
+    def work(self):
+        """Lease jobs from the work queue and scrape them until it is drained"""
+        queue_config = self.config.get('queue', {})
+        queue = open_work_queue(self.config)
+        worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        keeper = LeaseKeeper(queue, worker_id,
+                             queue_config.get('heartbeat_interval', queue.visibility_timeout / 3))
+        poll_interval = queue_config.get('poll_interval', 5.0)
+        exit_when_empty = queue_config.get('exit_when_empty', True)
+        finished = 0
+        logging.info(f"Worker {worker_id} started")
+        
+        try:
+            while True:
+                jobs = queue.lease(worker_id, limit=self.workers)
+                if not jobs:
+                    counts = queue.counts()
+                    # Leased jobs may still come back if their worker fails
+                    if exit_when_empty and not counts.get(QUEUED) and not counts.get(LEASED):
+                        break
+                    time.sleep(poll_interval)
+                    continue
+                
+                for job in jobs:
+                    keeper.hold(job)
+                
+                def emit(index: int, result: ScrapedResult):
+                    job = jobs[index]
+                    keeper.release(job)
+                    write_back = queue.complete if result.success else queue.fail
+                    if not write_back(job, worker_id, result):
+                        logging.warning(f"Job {job.id} was taken over by another worker: {job.url}")
+                
+                self.scrape_urls([job.url for job in jobs], emit=emit)
+                finished += len(jobs)
+        finally:
+            keeper.stop()
+            queue.close()
+            if self.selector_stats:
+                self.selector_stats.save()
+        logging.info(f"Worker {worker_id} finished {finished} jobs")
+    
+    def collect(self, batch: str):
+        """Write the regular outputs for a work-queue batch from its stored results"""
+        queue = open_work_queue(self.config)
+        try:
+            counts = queue.counts(batch)
+            if not counts:
+                logging.error(f"Batch {batch} not found in the work queue")
+                return
+            sink_path = NdjsonSink.path_for(self.config, batch)
+            if os.path.exists(sink_path):
+                # Derived from the queue, so an earlier collect is simply rebuilt
+                os.remove(sink_path)
+            with NdjsonSink.for_run(self.config, batch) as sink:
+                for index, result in enumerate(queue.results(batch)):
+                    sink.write(index, result)
+        finally:
+            queue.close()
+        self.output_writer.write_from_stream(sink_path, batch)
+        if self.history:
+            self.history.ingest_stream(sink_path, platform_of=self.platform_of)
+        logging.info(f"Batch {batch}: {counts.get(JOB_DONE, 0)} done, {counts.get(JOB_FAILED, 0)} failed, "
+                     f"{counts.get(QUEUED, 0) + counts.get(LEASED, 0)} still pending")
+    
+    def export_excel(self, run_id: str):
+        """Build the Excel report for a finished run from its result stream"""
+        sink_path = NdjsonSink.path_for(self.config, run_id)
+        if not os.path.exists(sink_path):
+            logging.error(f"No results found for run {run_id} at {sink_path}")
+            return
+        offsets = self.journal.result_offsets(run_id) if self.journal else input_order(sink_path)
+        self.output_writer.export_excel(sink_path, offsets=offsets)
+
+    def print_history(self, url: str, since: Optional[str] = None, until: Optional[str] = None):
+        """Print the recorded changes of the product behind ``url`` as NDJSON"""
+        if not self.history:
+            logging.error("Price history is disabled (history.enabled in the config)")
+            return
+        key = product_key(url, self.platform_of(url))
+        start = datetime.fromisoformat(since) if since else None
+        end = datetime.fromisoformat(until) if until else None
+        for change in self.history.history(key, start, end):
+            print(json.dumps(change.to_dict(), ensure_ascii=False))
+
+    def print_changes(self, consumer: str):
+        """Print every change ``consumer`` has not read yet as NDJSON and move its cursor"""
+        if not self.history:
+            logging.error("Price history is disabled (history.enabled in the config)")
+            return
+        for page in self.history.feed(consumer):
+            for change in page:
+                print(json.dumps(change.to_dict(), ensure_ascii=False))
+
+def run_worker(config_path: str, workers: Optional[int] = None):
+    """Entry point of one ``--worker`` process"""
+    scraper = ECommerceScraper(config_path=config_path, workers=workers)
+    try:
+        scraper.work()
+    finally:
+        scraper.close()
 
 def main():
     parser = argparse.ArgumentParser(description="Multi-platform E-commerce Scraper")
     parser.add_argument("--urls", nargs="+", help="List of URLs to scrape")
     parser.add_argument("--file", help="File containing URLs (one per line)")
     parser.add_argument("--config", default="config/settings.yaml", help="Config file path")
+    parser.add_argument("--workers", type=int, help="Number of URLs scraped in parallel")
+    parser.add_argument("--export-excel", metavar="RUN_ID", help="Write the Excel report for a finished run and exit")
+    parser.add_argument("--resume", metavar="RUN_ID", help="Resume an interrupted run, scraping only unfinished URLs")
+    parser.add_argument("--enqueue", action="store_true", help="Load the URLs into the work queue instead of scraping them")
+    parser.add_argument("--batch", help="Batch name for --enqueue (default: a new run id)")
+    parser.add_argument("--worker", action="store_true", help="Scrape jobs from the work queue until it is drained")
+    parser.add_argument("--processes", type=int, default=1, help="Worker processes started by --worker")
+    parser.add_argument("--collect", metavar="BATCH", help="Write the outputs of a work-queue batch and exit")
+    parser.add_argument("--history", metavar="URL", help="Print the price, stock and delivery changes of a product and exit")
+    parser.add_argument("--since", help="Start of the --history range (ISO date or time)")
+    parser.add_argument("--until", help="End of the --history range, exclusive (ISO date or time)")
+    parser.add_argument("--changes", metavar="CONSUMER", help="Print the changes CONSUMER has not read yet and exit")
     
     args = parser.parse_args()
     
+    if args.export_excel:
+        ECommerceScraper(config_path=args.config).export_excel(args.export_excel)
+        return
+    
+    if args.collect:
+        ECommerceScraper(config_path=args.config).collect(args.collect)
+        return
+    
+    if args.history:
+        ECommerceScraper(config_path=args.config).print_history(args.history, args.since, args.until)
+        return
+    
+    if args.changes:
+        ECommerceScraper(config_path=args.config).print_changes(args.changes)
+        return
+    
+    if args.worker:
+        if args.processes <= 1:
+            run_worker(args.config, args.workers)
+            return
+        processes = [
+            multiprocessing.Process(target=run_worker, args=(args.config, args.workers), name=f"worker-{i}")
+            for i in range(args.processes)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        return
+    
+    if args.resume:
+        started = time.perf_counter()
+        scraper = ECommerceScraper(config_path=args.config, workers=args.workers)
+        try:
+            if not scraper.journal or not scraper.journal.has_run(args.resume):
+                print(f"Run {args.resume} not found in the run journal.")
+                return
+            urls = [url for _, url in scraper.journal.unfinished(args.resume)]
+            try:
+                scraper.warm_up(urls)
+            except Exception as e:
+                logging.warning(f"Warm-up failed, continuing cold: {e}")
+            logging.info(f"Startup time: {time.perf_counter() - started:.1f}s")
+            scraper.run(urls, run_id=args.resume, resume=True)
+        finally:
+            scraper.close()
+        return
+    
     # Get URLs from arguments or file
     urls = []
     if args.urls:
@@ -139,9 +675,23 @@ def main():
         print("No valid URLs provided. Use --urls or --file arguments.")
         return
     
+    if args.enqueue:
+        batch = ECommerceScraper(config_path=args.config).enqueue(urls, args.batch)
+        print(f"Queued batch {batch}. Start workers with --worker, then write outputs with --collect {batch}.")
+        return
+    
     # Run scraper
-    scraper = ECommerceScraper(config_path=args.config)
-    scraper.run(urls)
+    started = time.perf_counter()
+    scraper = ECommerceScraper(config_path=args.config, workers=args.workers)
+    try:
+        scraper.warm_up(urls)
+    except Exception as e:
+        logging.warning(f"Warm-up failed, continuing cold: {e}")
+    logging.info(f"Startup time: {time.perf_counter() - started:.1f}s")
+    try:
+        scraper.run(urls)
+    finally:
+        scraper.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
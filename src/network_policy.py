@@ -0,0 +1,170 @@
+"""
+Network resource blocking and page-load strategy.
+
+Scrapers only need DOM text and image URLs, so images, fonts, media and
+ad/analytics requests are blocked by default. Policies are configured
+globally with per-platform allow/deny lists:
+
+* Selenium: ``Network.setBlockedURLs`` over CDP. Chrome matches URL
+  patterns itself and never tells us the resource type, so types are
+  approximated by file-extension patterns (``TYPE_PATTERNS``): an image
+  served without an extension is not blocked. The deny list has no
+  exceptions, so an allow pattern only works here when it is identical to a
+  deny entry, which it then removes (``allow: ["*.svg*"]`` keeps SVGs).
+  Other allow patterns are logged once per platform and ignored.
+* Playwright: a context route handler that checks each request's real
+  resource type and URL, so allow patterns take precedence per request.
+"""
+
+import logging
+from fnmatch import fnmatch
+from typing import Dict, List, Optional
+
+# URL patterns standing in for resource types where only URLs can be matched
+TYPE_PATTERNS: Dict[str, List[str]] = {
+    'image': ['*.png*', '*.jpg*', '*.jpeg*', '*.gif*', '*.webp*', '*.avif*', '*.svg*', '*.ico*'],
+    'font': ['*.woff*', '*.woff2*', '*.ttf*', '*.otf*', '*.eot*'],
+    'media': ['*.mp4*', '*.webm*', '*.m3u8*', '*.mp3*', '*.ogg*'],
+    'stylesheet': ['*.css*'],
+}
+
+DEFAULT_BLOCK_TYPES = ['image', 'font', 'media']
+
+DEFAULT_DENY_PATTERNS = [
+    '*google-analytics.com*',
+    '*googletagmanager.com*',
+    '*doubleclick.net*',
+    '*googlesyndication.com*',
+    '*amazon-adsystem.com*',
+    '*facebook.net*',
+    '*scorecardresearch.com*',
+    '*hotjar.com*',
+]
+
+
+class ResourcePolicy:
+    """Which requests a page may make"""
+
+    def __init__(self, block_types: Optional[List[str]] = None,
+                 deny_patterns: Optional[List[str]] = None,
+                 allow_patterns: Optional[List[str]] = None):
+        self.block_types = list(block_types or [])
+        self.deny_patterns = list(deny_patterns or [])
+        self.allow_patterns = list(allow_patterns or [])
+
+    def blocks(self, url: str, resource_type: Optional[str] = None) -> bool:
+        """Per-request decision (Playwright route handler)"""
+        if any(fnmatch(url, pattern) for pattern in self.allow_patterns):
+            return False
+        if resource_type and resource_type in self.block_types:
+            return True
+        return any(fnmatch(url, pattern) for pattern in self.deny_patterns)
+
+    def _url_patterns(self) -> List[str]:
+        patterns = list(self.deny_patterns)
+        for resource_type in self.block_types:
+            patterns.extend(TYPE_PATTERNS.get(resource_type, []))
+        return list(dict.fromkeys(patterns))
+
+    def blocked_url_patterns(self) -> List[str]:
+        """Deny list for Network.setBlockedURLs, without the entries allowed verbatim"""
+        allowed = set(self.allow_patterns)
+        return [pattern for pattern in self._url_patterns() if pattern not in allowed]
+
+    def unenforced_allow_patterns(self) -> List[str]:
+        """Allow patterns a plain deny list cannot honor: those not identical to one of its entries"""
+        patterns = set(self._url_patterns())
+        return [pattern for pattern in self.allow_patterns if pattern not in patterns]
+
+
+class NetworkPolicies:
+    """Global resource policy, per-platform overrides and page-load strategy"""
+
+    def __init__(self, enabled: bool = True, page_load_strategy: str = "normal",
+                 default: Optional[ResourcePolicy] = None,
+                 platforms: Optional[Dict[str, ResourcePolicy]] = None):
+        self.enabled = enabled
+        self.page_load_strategy = page_load_strategy
+        self.default = default or ResourcePolicy(DEFAULT_BLOCK_TYPES, DEFAULT_DENY_PATTERNS)
+        self.platforms = platforms or {}
+
+    @classmethod
+    def from_config(cls, config: dict) -> "NetworkPolicies":
+        browser_config = config.get('browser', {})
+        block_config = browser_config.get('block_resources', {})
+        block_types = block_config.get('types', DEFAULT_BLOCK_TYPES)
+        deny = block_config.get('deny', DEFAULT_DENY_PATTERNS)
+        allow = block_config.get('allow', [])
+
+        platforms = {}
+        for name, platform_config in (config.get('platforms') or {}).items():
+            override = (platform_config or {}).get('block_resources')
+            if override is None:
+                continue
+            platforms[name] = ResourcePolicy(
+                block_types=override.get('types', block_types),
+                deny_patterns=list(deny) + list(override.get('deny', [])),
+                allow_patterns=list(allow) + list(override.get('allow', []))
+            )
+
+        return cls(
+            enabled=block_config.get('enabled', True),
+            page_load_strategy=browser_config.get('page_load_strategy', 'normal'),
+            default=ResourcePolicy(block_types, deny, allow),
+            platforms=platforms
+        )
+
+    def for_platform(self, platform: Optional[str]) -> Optional[ResourcePolicy]:
+        if not self.enabled:
+            return None
+        return self.platforms.get(platform, self.default)
+
+
+_policies = NetworkPolicies(enabled=False)
+# Platforms whose unenforced allow patterns have been logged
+_warned_platforms = set()
+
+
+def configure_network_policies(config: dict) -> NetworkPolicies:
+    """Install the process-wide policies used by every driver and context"""
+    global _policies
+    _policies = NetworkPolicies.from_config(config)
+    return _policies
+
+
+def get_network_policies() -> NetworkPolicies:
+    return _policies
+
+
+def apply_to_driver(driver, platform: Optional[str]):
+    """Install the platform's deny list on a Selenium driver through CDP"""
+    policy = _policies.for_platform(platform)
+    patterns = policy.blocked_url_patterns() if policy else []
+    unenforced = policy.unenforced_allow_patterns() if policy else []
+    if unenforced and platform not in _warned_platforms:
+        _warned_platforms.add(platform)
+        logging.getLogger(__name__).warning(
+            f"Allow patterns {unenforced} for {platform or 'the default policy'} can't be applied with "
+            f"Selenium, which only drops deny entries they match exactly; they apply to Playwright only"
+        )
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"Could not apply resource blocking: {e}")
+
+
+async def apply_to_context(context, platform: Optional[str]):
+    """Route a Playwright context's requests through the platform's policy"""
+    policy = _policies.for_platform(platform)
+    if not policy:
+        return
+
+    async def handle(route):
+        request = route.request
+        if policy.blocks(request.url, request.resource_type):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    await context.route("**/*", handle)
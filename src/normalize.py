@@ -0,0 +1,316 @@
+"""
+Vectorized price, currency, rating and review normalization.
+
+Scraped values are free-form strings ("$1,299.99", "₦ 45,000", "from
+12,50 €", "$10 - $20", "4.5 out of 5", "1.2K ratings"). Each function here
+parses a whole column at once: pattern matching runs in Arrow's compute
+kernels (RE2) and the separator and scale arithmetic in NumPy, so a result
+set is normalized without a Python call per value.
+
+Amounts: the number's last separator is its decimal point when the other
+separator also appears, when a lone comma is followed by other than three
+digits, or when a lone dot is, except for currencies written with dot
+grouping ("1.299 €" is 1299). A range gives ``amount`` and ``amount_max``;
+"from"/"ab"/"desde" prices set ``is_from``.
+
+Currencies resolve to ISO 4217 codes: a code written in the text, then the
+scraped ``currency`` field, then an unambiguous symbol, then the store's
+country (amazon.ca), then the usual meaning of "$" and "¥". A price without
+an amount has no currency.
+
+Scrapers parse one product at a time with the scalar ``utils.parse_rating``
+and ``utils.parse_reviews``, which follow the same rules; this module is
+for whole result sets (exports, Parquet batches, price history).
+"""
+
+from typing import Any, Dict, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+Values = Union[Sequence, pd.Series, pa.Array, pa.ChunkedArray]
+
+# Thousands separators besides "," and "."
+NUMBER_SPACES = [" ", "\u00a0", "\u202f", "\u2009", "'"]
+_NUMBER = r"\d(?:[\d.,' \x{a0}\x{202f}\x{2009}]*\d)?"
+PRICE_PATTERN = (
+    rf"(?P<low>{_NUMBER})"
+    rf"(?:[^\d]{{0,6}}?(?:-|–|—|~|\bto\b|\bbis\b|\bhasta\b)[^\d]{{0,6}}?(?P<high>{_NUMBER}))?"
+)
+FROM_PATTERN = r"(?i)(?:^|[^\pL])(?:from|starting at|starts at|ab|desde|dès|à partir de|a partir de)(?:[^\pL]|$)"
+FREE_PATTERN = r"(?i)free|gratis|gratuit|kostenlos|gratuita"
+RATING_PATTERN = r"(?P<value>\d+(?:[.,]\d+)?)(?:\s*(?:out of|of|/|von|sur|de|su)\s*(?P<scale>\d+(?:[.,]\d+)?))?"
+REVIEWS_PATTERN = rf"(?P<number>{_NUMBER})\s*(?P<suffix>[kKmM])?(?:[^\pL]|$)"
+CODE_PATTERN = r"(?:^|[^A-Za-z])(?P<code>[A-Z]{3})(?:[^A-Za-z]|$)"
+HOST_PATTERN = r"^(?:[a-z][a-z0-9+.-]*://)?(?:[^/@]*@)?(?P<host>[^/:?#]+)"
+
+# Longest first: RE2 takes the first alternative that matches
+SYMBOL_CURRENCIES = {
+    'US$': 'USD', 'CDN$': 'CAD', 'CA$': 'CAD', 'C$': 'CAD', 'AU$': 'AUD', 'A$': 'AUD',
+    'NZ$': 'NZD', 'HK$': 'HKD', 'S$': 'SGD', 'R$': 'BRL', 'MX$': 'MXN', 'KShs': 'KES', 'KSh': 'KES',
+    'Ksh': 'KES', 'KSH': 'KES', 'GH₵': 'GHS', 'GH¢': 'GHS', 'USh': 'UGX', 'TSh': 'TZS',
+    'E£': 'EGP', 'zł': 'PLN', 'Kč': 'CZK', 'Rs.': 'INR', 'FCFA': 'XOF', 'CFA': 'XOF',
+    'د.إ': 'AED', 'ر.س': 'SAR', 'ج.م': 'EGP', '₦': 'NGN', '€': 'EUR', '£': 'GBP',
+    '₹': 'INR', '₩': 'KRW', '₺': 'TRY', '₱': 'PHP', '₫': 'VND', '₽': 'RUB', '₴': 'UAH',
+    '₵': 'GHS', '$': 'USD', '¥': 'JPY',
+}
+
+
+def _escape(symbol: str) -> str:
+    return "".join(f"\\{char}" if char in r".$^*+?()[]{}|\\" else char for char in symbol)
+
+
+SYMBOL_PATTERN = "(?P<symbol>" + "|".join(_escape(symbol) for symbol in SYMBOL_CURRENCIES) + ")"
+
+# Symbols shared by several currencies; the store's country decides first
+AMBIGUOUS_SYMBOLS = ['$', '¥']
+
+# Host suffix -> currency, most specific first
+DOMAIN_CURRENCIES = {
+    'com.au': 'AUD', 'com.mx': 'MXN', 'com.br': 'BRL', 'co.uk': 'GBP', 'com.tr': 'TRY',
+    'co.jp': 'JPY', 'com.ng': 'NGN', 'com.gh': 'GHS', 'com.eg': 'EGP', 'co.ke': 'KES',
+    'co.tz': 'TZS', 'com.tn': 'TND', 'ca': 'CAD', 'de': 'EUR', 'fr': 'EUR', 'it': 'EUR',
+    'es': 'EUR', 'nl': 'EUR', 'se': 'SEK', 'pl': 'PLN', 'ae': 'AED', 'sa': 'SAR', 'eg': 'EGP',
+    'in': 'INR', 'sg': 'SGD', 'ng': 'NGN', 'ug': 'UGX', 'ma': 'MAD', 'ci': 'XOF', 'sn': 'XOF',
+    'dz': 'DZD', 'ru': 'RUB', 'uk': 'GBP',
+}
+
+ISO_CODES = sorted(set(SYMBOL_CURRENCIES.values()) | set(DOMAIN_CURRENCIES.values()) | {
+    'CHF', 'CNY', 'ZAR', 'NOK', 'DKK', 'IDR', 'CLP', 'COP', 'ARS', 'XAF', 'RWF', 'ETB', 'ZMW',
+})
+
+# A lone dot followed by three digits groups thousands in these currencies
+DOT_GROUPING_CURRENCIES = [
+    'EUR', 'BRL', 'TRY', 'IDR', 'DKK', 'NOK', 'SEK', 'PLN', 'CZK', 'RUB', 'UAH', 'VND',
+    'CLP', 'COP', 'ARS', 'JPY', 'KRW', 'UGX', 'XOF', 'XAF', 'RWF',
+]
+
+
+def _strings(values: Values) -> pa.Array:
+    if isinstance(values, pa.ChunkedArray):
+        values = values.combine_chunks()
+    if not isinstance(values, pa.Array):
+        values = pa.array(values, from_pandas=True)
+    return values if values.type == pa.string() else pc.cast(values, pa.string())
+
+
+def _distinct(values: Values) -> Tuple[pa.Array, pa.Array]:
+    """
+    Distinct strings of ``values`` and each row's index into them (null
+    for null rows). Scraped columns repeat heavily (a product's price on
+    every delivery-option row, "FREE" on most), so parsing runs once per
+    distinct string and rows are filled with ``take``.
+    """
+    encoded = pc.dictionary_encode(_strings(values))
+    return encoded.dictionary, encoded.indices
+
+
+def _take(values: Union[np.ndarray, pa.Array], rows: pa.Array) -> pa.Array:
+    return pc.take(values if isinstance(values, pa.Array) else pa.array(values), rows)
+
+
+def _nonempty(strings: pa.Array) -> pa.Array:
+    return pc.if_else(pc.greater(pc.utf8_length(strings), 0), strings, pa.scalar(None, pa.string()))
+
+
+def _numpy(array: pa.Array, fill) -> np.ndarray:
+    return pc.fill_null(array, fill).to_numpy(zero_copy_only=False)
+
+
+def _floats(strings: pa.Array) -> np.ndarray:
+    """Digit strings matched by the patterns ("1299", "4.5") to floats, NaN where null or empty"""
+    return _numpy(pc.cast(_nonempty(strings), pa.float64()), np.nan)
+
+
+def _member(values: pa.Array, value_set: Sequence[str]) -> np.ndarray:
+    return _numpy(pc.is_in(values, value_set=pa.array(value_set, pa.string())), False)
+
+
+def _lookup(keys: pa.Array, table: Mapping[str, str]) -> pa.Array:
+    positions = pc.index_in(keys, value_set=pa.array(list(table), pa.string()))
+    return pc.take(pa.array(list(table.values()), pa.string()), positions)
+
+
+def _iso(codes: pa.Array) -> pa.Array:
+    """Upper-cased ``codes`` that are known ISO codes, null elsewhere"""
+    codes = pc.utf8_upper(pc.utf8_trim_whitespace(codes))
+    return pc.if_else(_member(codes, ISO_CODES), codes, pa.scalar(None, pa.string()))
+
+
+def domain_currencies(urls: Values) -> pa.Array:
+    """Currency of each URL's store, from its host suffix"""
+    urls, rows = _distinct(urls)
+    hosts = pc.struct_field(pc.extract_regex(pc.utf8_lower(urls), HOST_PATTERN), 'host')
+    currencies = pa.nulls(len(hosts), pa.string())
+    for suffix, currency in DOMAIN_CURRENCIES.items():
+        match = pc.fill_null(pc.ends_with(hosts, f".{suffix}"), False)
+        currencies = pc.if_else(pc.and_(match, pc.is_null(currencies)), currency, currencies)
+    return pc.take(currencies, rows)
+
+
+def _written_currencies(texts: pa.Array) -> Tuple[pa.Array, pa.Array, pa.Array]:
+    """ISO code written in each text, its currency symbol, and the symbol's currency"""
+    written = _iso(pc.struct_field(pc.extract_regex(texts, CODE_PATTERN), 'code'))
+    symbols = pc.struct_field(pc.extract_regex(texts, SYMBOL_PATTERN), 'symbol')
+    return written, symbols, _lookup(symbols, SYMBOL_CURRENCIES)
+
+
+def _resolve(written: pa.Array, symbols: pa.Array, by_symbol: pa.Array,
+             currencies: Optional[Values], urls: Optional[Values]) -> pa.Array:
+    ambiguous = _member(symbols, AMBIGUOUS_SYMBOLS)
+    candidates = [written]
+    if currencies is not None:
+        hints, rows = _distinct(currencies)
+        candidates.append(pc.take(_iso(hints), rows))
+    candidates.append(pc.if_else(ambiguous, pa.scalar(None, pa.string()), by_symbol))
+    if urls is not None:
+        candidates.append(pc.if_else(pc.or_(ambiguous, pc.is_null(symbols)),
+                                     domain_currencies(urls), pa.scalar(None, pa.string())))
+    candidates.append(by_symbol)
+    return pc.coalesce(*candidates)
+
+
+def resolve_currencies(texts: Values, currencies: Optional[Values] = None,
+                       urls: Optional[Values] = None) -> pa.Array:
+    """ISO code per price text; see the module docstring for the order of sources"""
+    texts, rows = _distinct(texts)
+    written, symbols, by_symbol = (pc.take(array, rows) for array in _written_currencies(texts))
+    return _resolve(written, symbols, by_symbol, currencies, urls)
+
+
+def _amounts(numbers: pa.Array) -> Tuple[np.ndarray, np.ndarray]:
+    """Amounts of number strings, read without and with dot grouping ("1.299" -> 1.299 / 1299)"""
+    cleaned = numbers
+    for separator in NUMBER_SPACES:
+        cleaned = pc.replace_substring(cleaned, separator, "")
+    reversed_numbers = pc.utf8_reverse(cleaned)
+    # Digits after the last comma / dot, -1 without one
+    comma = _numpy(pc.find_substring(reversed_numbers, ","), -1)
+    dot = _numpy(pc.find_substring(reversed_numbers, "."), -1)
+    commas = _numpy(pc.count_substring(cleaned, ","), 0)
+    dots = _numpy(pc.count_substring(cleaned, "."), 0)
+
+    has_comma, has_dot = comma >= 0, dot >= 0
+    fraction = np.where(has_comma & has_dot, np.minimum(comma, dot), 0)
+    fraction = np.where(has_comma & ~has_dot & (commas == 1) & (comma != 3), comma, fraction)
+    lone_dot = has_dot & ~has_comma & (dots == 1)
+    fraction = np.where(lone_dot, dot, fraction)
+
+    digits = _floats(pc.replace_substring(pc.replace_substring(cleaned, ",", ""), ".", ""))
+    amounts = digits / np.power(10.0, fraction)
+    return amounts, np.where(lone_dot & (dot == 3), digits, amounts)
+
+
+def parse_amounts(numbers: Values, currencies: Optional[Values] = None) -> np.ndarray:
+    """Amounts of extracted number strings such as "1,299.99", "1.299,99" or "45 000" """
+    amounts, grouped = _amounts(_strings(numbers))
+    if currencies is None:
+        return amounts
+    return np.where(_member(_strings(currencies), DOT_GROUPING_CURRENCIES), grouped, amounts)
+
+
+def _prices(texts: Values, currencies: Optional[Values], urls: Optional[Values]) -> Dict[str, Any]:
+    texts, rows = _distinct(texts)
+    parts = pc.extract_regex(texts, PRICE_PATTERN)
+    low, low_grouped = _amounts(pc.struct_field(parts, 'low'))
+    high, high_grouped = _amounts(_nonempty(pc.struct_field(parts, 'high')))
+
+    written, symbols, by_symbol = (pc.take(array, rows) for array in _written_currencies(texts))
+    resolved = _resolve(written, symbols, by_symbol, currencies, urls)
+    grouping = _member(resolved, DOT_GROUPING_CURRENCIES)
+    low = np.where(grouping, _numpy(_take(low_grouped, rows), np.nan), _numpy(_take(low, rows), np.nan))
+    high = np.where(grouping, _numpy(_take(high_grouped, rows), np.nan), _numpy(_take(high, rows), np.nan))
+    with np.errstate(invalid='ignore'):
+        high = np.where(high > low, high, np.nan)
+    # No amount, no currency: an empty price would otherwise get the store's
+    resolved = pc.if_else(np.isnan(low), pa.scalar(None, pa.string()), resolved)
+    return {
+        'amount': low,
+        'amount_max': high,
+        'currency': resolved,
+        'is_from': _numpy(pc.take(pc.match_substring_regex(texts, FROM_PATTERN), rows), False),
+    }
+
+
+def normalize_prices(texts: Values, currencies: Optional[Values] = None,
+                     urls: Optional[Values] = None) -> pd.DataFrame:
+    """
+    ``amount``, ``amount_max`` (upper end of a range), ``currency`` (ISO
+    code) and ``is_from`` for each price text. ``currencies`` are scraped
+    currency fields and ``urls`` the product URLs, both optional hints.
+    """
+    prices = _prices(texts, currencies, urls)
+    prices['currency'] = prices['currency'].to_numpy(zero_copy_only=False)
+    return pd.DataFrame(prices)
+
+
+def normalize_delivery_prices(texts: Values, currencies: Optional[Values] = None,
+                              urls: Optional[Values] = None) -> np.ndarray:
+    """Delivery price amounts; "FREE" (and translations) is 0"""
+    amounts = _prices(texts, currencies, urls)['amount']
+    distinct, rows = _distinct(texts)
+    free = _numpy(pc.take(pc.match_substring_regex(distinct, FREE_PATTERN), rows), False)
+    return np.where(free, 0.0, amounts)
+
+
+def normalize_ratings(texts: Values, scale: float = 5.0) -> np.ndarray:
+    """Ratings on a 0-``scale`` scale: "4.5 out of 5", "4,5 von 5", "9/10" -> 4.5"""
+    texts, rows = _distinct(texts)
+    parts = pc.extract_regex(texts, RATING_PATTERN)
+    value = _floats(pc.replace_substring(pc.struct_field(parts, 'value'), ",", "."))
+    of = _floats(pc.replace_substring(pc.struct_field(parts, 'scale'), ",", "."))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ratings = np.where(of > 0, value * scale / of, value)
+    return _numpy(_take(ratings, rows), np.nan)
+
+
+def normalize_reviews(texts: Values) -> np.ndarray:
+    """Review counts as floats (NaN when absent): "1,234 ratings" -> 1234, "1.2K" -> 1200"""
+    texts, rows = _distinct(texts)
+    parts = pc.extract_regex(texts, REVIEWS_PATTERN)
+    numbers = pc.struct_field(parts, 'number')
+    for separator in NUMBER_SPACES:
+        numbers = pc.replace_substring(numbers, separator, "")
+    suffix = pc.utf8_lower(pc.struct_field(parts, 'suffix'))
+    scale = np.select([_numpy(pc.equal(suffix, 'k'), False), _numpy(pc.equal(suffix, 'm'), False)],
+                      [1e3, 1e6], 1.0)
+    whole = _floats(pc.replace_substring(pc.replace_substring(numbers, ",", ""), ".", ""))
+    # "1.2K" / "1,2K"; a number with several separators is read as a whole one
+    single = (_numpy(pc.count_substring(numbers, ","), 0) + _numpy(pc.count_substring(numbers, "."), 0)) <= 1
+    decimal = _floats(pc.if_else(single, pc.replace_substring(numbers, ",", "."),
+                                 pa.scalar(None, pa.string())))
+    counts = np.round(np.where((scale > 1) & single, decimal * scale, whole))
+    return _numpy(_take(counts, rows), np.nan)
+
+
+def normalize_columns(columns: Mapping[str, Values]) -> Dict[str, np.ndarray]:
+    """
+    Numeric columns for a flattened result set with the CSV/Parquet layout
+    (``price``, ``discount_price``, ``delivery_price``, ``rating``,
+    ``reviews``, and optionally ``currency`` and ``product_url``)
+    """
+    urls = columns.get('product_url')
+    price = _prices(columns['price'], columns.get('currency'), urls)
+    currency = price['currency']
+    return {
+        'price_value': price['amount'],
+        'price_max': price['amount_max'],
+        'price_from': price['is_from'],
+        'currency_code': currency.to_numpy(zero_copy_only=False),
+        'discount_price_value': _prices(columns['discount_price'], currency, urls)['amount'],
+        'delivery_price_value': normalize_delivery_prices(columns['delivery_price'], currency, urls),
+        'rating_value': normalize_ratings(columns['rating']),
+        'review_count': normalize_reviews(columns['reviews']),
+    }
+
+
+def normalize_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    """``frame`` (e.g. a loaded output.csv) with the ``normalize_columns`` columns added"""
+    columns = {name: frame[name] for name in frame.columns}
+    for name in ('price', 'discount_price', 'delivery_price', 'rating', 'reviews'):
+        columns.setdefault(name, pd.Series([None] * len(frame), index=frame.index, dtype=object))
+    normalized = normalize_columns(columns)
+    normalized['review_count'] = pd.array(normalized['review_count'], dtype='Int64')
+    return frame.assign(**normalized)
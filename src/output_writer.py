@@ -1,110 +1,116 @@
-import json
-import pandas as pd
-from typing import List, Dict, Any
-from pathlib import Path
-from product_schema import ScrapedResult
+import csv
 import logging
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from records import COLUMNS, RecordBatch, dump_record, read_batches
+
+DEFAULT_FORMATS = ['json', 'csv', 'parquet']
 
 class OutputWriter:
     def __init__(self, json_path: str = "data/output.json", 
                  csv_path: str = "data/output.csv",
-                 excel_path: str = "data/output.xlsx"):
+                 excel_path: str = "data/output.xlsx",
+                 parquet_dir: str = "data/parquet",
+                 formats: Optional[List[str]] = None):
         self.json_path = json_path
         self.csv_path = csv_path
         self.excel_path = excel_path
+        self.parquet_dir = parquet_dir
+        # Excel is opt-in: it is slow and can't be appended to
+        self.formats = formats or DEFAULT_FORMATS
         
         # Ensure directories exist
         Path(self.json_path).parent.mkdir(parents=True, exist_ok=True)
         Path(self.csv_path).parent.mkdir(parents=True, exist_ok=True)
         Path(self.excel_path).parent.mkdir(parents=True, exist_ok=True)
     
-    def write_results(self, results: List[ScrapedResult]):
-        """Write results to all output formats"""
-        self.write_json(results)
-        self.write_csv_excel(results)
+    @classmethod
+    def from_config(cls, config: dict) -> "OutputWriter":
+        output_config = config.get('output', {})
+        return cls(
+            json_path=output_config.get('json_path', "data/output.json"),
+            csv_path=output_config.get('csv_path', "data/output.csv"),
+            excel_path=output_config.get('excel_path', "data/output.xlsx"),
+            parquet_dir=output_config.get('parquet_dir', "data/parquet"),
+            formats=output_config.get('formats')
+        )
     
-    def write_json(self, results: List[ScrapedResult]):
-        """Write results to JSON file"""
+    def write_from_stream(self, ndjson_path: str, run_id: str = "run",
+                          offsets: Optional[List[int]] = None, chunk_size: int = 500):
+        """
+        Derive the configured outputs from a run's NDJSON stream in one pass,
+        holding at most ``chunk_size`` results in memory. ``offsets`` selects
+        the lines to use (the journal's latest result per URL, in input order).
+        """
+        parquet = None
         try:
-            serializable_results = [result.dict() for result in results]
-            with open(self.json_path, 'w', encoding='utf-8') as f:
-                json.dump(serializable_results, f, indent=2, ensure_ascii=False, default=str)
-            logging.info(f"JSON output written to {self.json_path}")
+            with ExitStack() as stack:
+                json_file = csv_rows = None
+                if 'json' in self.formats:
+                    json_file = stack.enter_context(open(self.json_path, 'wb'))
+                if 'csv' in self.formats:
+                    csv_rows = self._csv_writer(stack.enter_context(
+                        open(self.csv_path, 'w', newline='', encoding='utf-8')
+                    ))
+                if 'parquet' in self.formats:
+                    from parquet_writer import ParquetWriter
+                    parquet = stack.enter_context(ParquetWriter(self.parquet_dir, run_id))
+
+                separator = b"["
+                for batch in read_batches(ndjson_path, offsets, chunk_size):
+                    if json_file:
+                        separator = self._write_json_elements(json_file, batch, separator)
+                    if csv_rows:
+                        csv_rows.writerows(batch.rows())
+                    if parquet:
+                        parquet.write_batch(batch)
+                if json_file:
+                    json_file.write(b"\n]" if separator == b"," else b"[]")
+            if json_file:
+                logging.info(f"JSON output written to {self.json_path}")
+            if csv_rows:
+                logging.info(f"CSV output written to {self.csv_path}")
         except Exception as e:
-            logging.error(f"Error writing JSON: {e}")
+            logging.error(f"Error writing JSON/CSV/Parquet: {e}")
+        
+        if 'excel' in self.formats:
+            self.export_excel(ndjson_path, offsets, chunk_size)
+    
+    @staticmethod
+    def _csv_writer(f):
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(COLUMNS)
+        return writer
+    
+    @staticmethod
+    def _write_json_elements(f, batch: RecordBatch, separator: bytes) -> bytes:
+        """Append the batch's results to a JSON array open in binary mode; returns the next separator"""
+        for record in batch.records:
+            f.write(separator + b"\n  " + dump_record(record, indent=2).replace(b"\n", b"\n  "))
+            separator = b","
+        return separator
     
-    def write_csv_excel(self, results: List[ScrapedResult]):
-        """Write results to CSV and Excel files"""
+    def export_excel(self, ndjson_path: str, offsets: Optional[List[int]] = None,
+                     chunk_size: int = 500):
+        """
+        Excel export as a post-processing step; streams the run's results
+        into a write-only workbook
+        """
+        self._write_excel(read_batches(ndjson_path, offsets, chunk_size))
+    
+    def _write_excel(self, batches: Iterable[RecordBatch]):
         try:
-            flattened_data = self._flatten_results(results)
-            
-            df = pd.DataFrame(flattened_data)
+            from openpyxl import Workbook
             
-            # Write CSV
-            df.to_csv(self.csv_path, index=False, encoding='utf-8')
-            logging.info(f"CSV output written to {self.csv_path}")
-            
-            # Write Excel
-            df.to_excel(self.excel_path, index=False, engine='openpyxl')
+            workbook = Workbook(write_only=True)
+            sheet = workbook.create_sheet()
+            sheet.append(COLUMNS)
+            for batch in batches:
+                for row in batch.rows():
+                    sheet.append(row)
+            workbook.save(self.excel_path)
             logging.info(f"Excel output written to {self.excel_path}")
-            
         except Exception as e:
-            logging.error(f"Error writing CSV/Excel: {e}")
-    
-    def _flatten_results(self, results: List[ScrapedResult]) -> List[Dict[str, Any]]:
-        """Flatten the nested structure for CSV/Excel output"""
-        flattened = []
-        
-        for result in results:
-            base_data = {
-                'store': result.store,
-                'url': result.url,
-                'name': result.product.name,
-                'price': result.product.price,
-                'discount_price': result.product.discount_price,
-                'sku': result.product.sku,
-                'brand': result.product.brand,
-                'category': result.product.category,
-                'product_url': result.product.product_url,
-                'image_url': result.product.image_urls[0] if result.product.image_urls else '',
-                'stock_status': result.product.stock_status,
-                'rating': result.product.rating,
-                'reviews': result.product.reviews,
-                'seller': result.product.seller,
-                'success': result.success,
-                'error_message': result.error_message,
-                'timestamp': result.timestamp
-            }
-            
-            # If no scenarios, add base data
-            if not result.scenarios:
-                flattened.append(base_data)
-            else:
-                # Add each scenario as a separate row
-                for scenario_name, scenario in result.scenarios.items():
-                    if scenario.delivery_options:
-                        for delivery_option in scenario.delivery_options:
-                            row = base_data.copy()
-                            row.update({
-                                'scenario': scenario_name,
-                                'delivery_company': delivery_option.company,
-                                'delivery_type': delivery_option.type,
-                                'delivery_price': delivery_option.price,
-                                'eta': delivery_option.eta,
-                                'screenshot': scenario.screenshot_path
-                            })
-                            flattened.append(row)
-                    else:
-                        # If no delivery options, still add scenario info
-                        row = base_data.copy()
-                        row.update({
-                            'scenario': scenario_name,
-                            'delivery_company': '',
-                            'delivery_type': '',
-                            'delivery_price': '',
-                            'eta': '',
-                            'screenshot': scenario.screenshot_path
-                        })
-                        flattened.append(row)
-        
-        return flattened
\ No newline at end of file
+            logging.error(f"Error writing Excel: {e}")
@@ -0,0 +1,137 @@
+"""
+Columnar Parquet output.
+
+The flattened rows of a ``RecordBatch`` are written with typed columns
+(prices, ratings and review counts normalized per batch by ``normalize``,
+ISO currency codes, a dictionary-encoded stock status, real timestamps)
+into Hive-style partitions ``store=<store>/date=<YYYY-MM-DD>/``. Each
+partition keeps one open file per run and every batch becomes a new row
+group, so output grows incrementally and analytics jobs can read only the
+columns and partitions they need.
+"""
+
+import logging
+import os
+import re
+from typing import Any, Dict, List, Sequence, Tuple
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from normalize import normalize_columns
+from records import RecordBatch
+
+SCHEMA = pa.schema([
+    ('url', pa.string()),
+    ('name', pa.string()),
+    ('price', pa.float64()),
+    # Upper end of a price range; ``price`` is the lower end
+    ('price_max', pa.float64()),
+    # "from $10" prices
+    ('price_from', pa.bool_()),
+    ('price_text', pa.string()),
+    ('currency', pa.string()),
+    ('discount_price', pa.float64()),
+    ('sku', pa.string()),
+    ('brand', pa.string()),
+    ('category', pa.string()),
+    ('product_url', pa.string()),
+    ('image_url', pa.string()),
+    ('stock_status', pa.dictionary(pa.int8(), pa.string())),
+    ('rating', pa.float32()),
+    ('reviews', pa.int64()),
+    ('seller', pa.string()),
+    ('success', pa.bool_()),
+    ('error_message', pa.string()),
+    ('failure_kind', pa.dictionary(pa.int8(), pa.string())),
+    ('timestamp', pa.timestamp('us')),
+    ('scenario', pa.string()),
+    ('delivery_company', pa.string()),
+    ('delivery_type', pa.string()),
+    ('delivery_price', pa.float64()),
+    ('eta', pa.string()),
+    ('screenshot', pa.string()),
+])
+
+
+def _partition_value(value: str) -> str:
+    return re.sub(r'[^\w.\-]', '_', value or 'unknown')
+
+
+def _or_none(values: Sequence[Any]) -> List[Any]:
+    return [value or None for value in values]
+
+
+def typed_table(batch: RecordBatch) -> pa.Table:
+    """The batch's flattened rows as one Arrow table in ``SCHEMA``"""
+    column = batch.column
+    normalized = normalize_columns(batch.columns)
+    arrays = {
+        'price': normalized['price_value'],
+        'price_max': normalized['price_max'],
+        'price_from': normalized['price_from'],
+        'price_text': column('price'),
+        'currency': normalized['currency_code'],
+        'discount_price': normalized['discount_price_value'],
+        'image_url': _or_none(column('image_url')),
+        'rating': normalized['rating_value'],
+        'reviews': normalized['review_count'],
+        'delivery_company': _or_none(column('delivery_company')),
+        'delivery_type': _or_none(column('delivery_type')),
+        'delivery_price': normalized['delivery_price_value'],
+        'eta': _or_none(column('eta')),
+    }
+    return pa.Table.from_arrays(
+        [pa.array(arrays[field.name] if field.name in arrays else column(field.name), field.type,
+                  from_pandas=True)
+         for field in SCHEMA],
+        schema=SCHEMA
+    )
+
+
+class ParquetWriter:
+    """Partitioned, incrementally written Parquet dataset for one run"""
+
+    def __init__(self, root: str = "data/parquet", run_id: str = "run",
+                 compression: str = "zstd"):
+        self.root = root
+        self.run_id = run_id
+        self.compression = compression
+        self.logger = logging.getLogger(__name__)
+        self._writers: Dict[Tuple[str, str], pq.ParquetWriter] = {}
+        self.rows = 0
+
+    def _writer(self, store: str, date: str) -> pq.ParquetWriter:
+        key = (store, date)
+        if key not in self._writers:
+            directory = os.path.join(self.root, f"store={_partition_value(store)}", f"date={date}")
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"part-{self.run_id}.parquet")
+            self._writers[key] = pq.ParquetWriter(path, SCHEMA, compression=self.compression)
+        return self._writers[key]
+
+    def write_batch(self, batch: RecordBatch):
+        """Append one row group per partition touched by ``batch``"""
+        if not len(batch):
+            return
+        partitions: Dict[Tuple[str, str], List[int]] = {}
+        for index, (store, timestamp) in enumerate(zip(batch.column('store'), batch.column('timestamp'))):
+            partitions.setdefault((store, timestamp.strftime('%Y-%m-%d')), []).append(index)
+
+        table = typed_table(batch)
+        for (store, date), indices in partitions.items():
+            part = table if len(partitions) == 1 else table.take(indices)
+            self._writer(store, date).write_table(part)
+            self.rows += len(indices)
+
+    def close(self):
+        for writer in self._writers.values():
+            writer.close()
+        self._writers = {}
+        self.logger.info(f"Parquet output ({self.rows} rows) written under {self.root}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,181 @@
+"""
+Platform registry: hostname -> platform name -> scraper classes.
+
+Hosts resolve through tables built once: the exact host, then its parent
+domains (``smile.amazon.co.uk`` -> ``amazon.co.uk``), then a platform name
+directly followed by a suffix that a registered domain ends in
+(``amazon.com.ng`` -> ``amazon``, but not ``amazon.evil.com``). Scraper classes are given
+as ``"module:Class"`` strings and imported on first use, so Selenium,
+Playwright and the platform modules only load once a URL needs them.
+
+Other packages add platforms through the ``ecommerce_scraper.platforms``
+entry point group; each entry point loads to a ``Platform`` or a callable
+returning one. ``platforms.<name>`` in settings.yaml can add ``domains`` and
+override ``scraper`` / ``async_scraper``.
+"""
+
+import importlib
+import logging
+import threading
+from importlib.metadata import entry_points
+from typing import Dict, Iterable, List, Optional, Set, Union
+from urllib.parse import urlparse
+
+ENTRY_POINT_GROUP = 'ecommerce_scraper.platforms'
+
+ScraperRef = Union[str, type, None]
+
+
+def _bare_host(host: str) -> str:
+    host = host.strip().lower().lstrip('.')
+    return host[4:] if host.startswith('www.') else host
+
+
+def host_of(url: str) -> str:
+    url = url or ''
+    return (urlparse(url if '://' in url else f"//{url}").hostname or '').lower()
+
+
+class Platform:
+    """A store: the hosts it serves and its Selenium / Playwright scrapers"""
+
+    def __init__(self, name: str, domains: Iterable[str] = (), scraper: ScraperRef = None,
+                 async_scraper: ScraperRef = None):
+        self.name = name
+        self.domains = [_bare_host(domain) for domain in domains if domain]
+        self.scraper = scraper
+        self.async_scraper = async_scraper
+
+    def __repr__(self):
+        return f"Platform({self.name})"
+
+
+BUILTIN_PLATFORMS = [
+    Platform(
+        'amazon',
+        ['amazon.com', 'amazon.ca', 'amazon.com.mx', 'amazon.com.br', 'amazon.co.uk', 'amazon.de',
+         'amazon.fr', 'amazon.it', 'amazon.es', 'amazon.nl', 'amazon.se', 'amazon.pl',
+         'amazon.com.tr', 'amazon.ae', 'amazon.sa', 'amazon.eg', 'amazon.in', 'amazon.co.jp',
+         'amazon.sg', 'amazon.com.au'],
+        scraper='amazon_scraper:AmazonScraper',
+        async_scraper='amazon_playwright_scraper:AmazonPlaywrightScraper'
+    ),
+    Platform('aliexpress', ['aliexpress.com', 'aliexpress.us', 'aliexpress.ru']),
+    Platform('ebay', ['ebay.com', 'ebay.co.uk', 'ebay.de', 'ebay.fr', 'ebay.it', 'ebay.es',
+                      'ebay.ca', 'ebay.com.au']),
+    Platform('etsy', ['etsy.com']),
+    Platform('jumia', ['jumia.com.ng', 'jumia.co.ke', 'jumia.com.gh', 'jumia.com.eg', 'jumia.ma',
+                       'jumia.ug', 'jumia.ci', 'jumia.sn', 'jumia.dz', 'jumia.com.tn']),
+    Platform('kilimall', ['kilimall.co.ke', 'kilimall.com']),
+    Platform('jiji', ['jiji.ng', 'jiji.co.ke', 'jiji.com.gh', 'jiji.ug', 'jiji.co.tz']),
+]
+
+
+class PlatformRegistry:
+    def __init__(self, platforms: Iterable[Platform] = ()):
+        self.logger = logging.getLogger(__name__)
+        self._platforms: Dict[str, Platform] = {}
+        self._hosts: Dict[str, str] = {}
+        # Public suffixes of the registered domains (``com``, ``co.uk``, ...)
+        self._suffixes: Set[str] = set()
+        self._classes: Dict[str, type] = {}
+        self._lock = threading.Lock()
+        for platform in platforms:
+            self.register(platform)
+
+    def register(self, platform: Platform):
+        """Add a platform, or extend one with the same name"""
+        existing = self._platforms.get(platform.name)
+        if existing:
+            existing.domains.extend(d for d in platform.domains if d not in existing.domains)
+            existing.scraper = platform.scraper or existing.scraper
+            existing.async_scraper = platform.async_scraper or existing.async_scraper
+        else:
+            self._platforms[platform.name] = existing = Platform(
+                platform.name, platform.domains, platform.scraper, platform.async_scraper
+            )
+        for domain in existing.domains:
+            self._hosts[domain] = existing.name
+            if '.' in domain:
+                self._suffixes.add(domain.split('.', 1)[1])
+
+    def load_entry_points(self):
+        for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+            try:
+                platform = entry_point.load()
+                if not isinstance(platform, Platform):
+                    platform = platform()
+                self.register(platform)
+            except Exception as e:
+                self.logger.warning(f"Could not load platform entry point {entry_point.name}: {e}")
+
+    def load_config(self, config: dict):
+        for name, platform_config in (config.get('platforms') or {}).items():
+            platform_config = platform_config or {}
+            domains = list(platform_config.get('domains') or [])
+            if platform_config.get('base_url'):
+                domains.append(host_of(platform_config['base_url']))
+            self.register(Platform(name, domains, platform_config.get('scraper'),
+                                   platform_config.get('async_scraper')))
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._platforms)
+
+    def platform_of(self, url: str) -> Optional[str]:
+        """Name of the platform serving ``url``'s host"""
+        labels = host_of(url).split('.')
+        # The host itself, then each parent domain down to two labels
+        for start in range(len(labels) - 1):
+            name = self._hosts.get('.'.join(labels[start:]))
+            if name:
+                return name
+        for start, label in enumerate(labels[:-1]):
+            if label in self._platforms and '.'.join(labels[start + 1:]) in self._suffixes:
+                return label
+        return None
+
+    def scraper_class(self, name: Optional[str], asynchronous: bool = False) -> Optional[type]:
+        """The platform's scraper class for a backend, importing its module on first use"""
+        platform = self._platforms.get(name)
+        if not platform:
+            return None
+        ref = platform.async_scraper if asynchronous else platform.scraper
+        if ref is None or isinstance(ref, type):
+            return ref
+        with self._lock:
+            if ref not in self._classes:
+                module_name, _, class_name = ref.partition(':')
+                self._classes[ref] = getattr(importlib.import_module(module_name), class_name)
+            return self._classes[ref]
+
+    def scraper_for(self, url: str, asynchronous: bool = False) -> Optional[type]:
+        return self.scraper_class(self.platform_of(url), asynchronous)
+
+
+_registry: Optional[PlatformRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def _default_registry() -> PlatformRegistry:
+    registry = PlatformRegistry(BUILTIN_PLATFORMS)
+    registry.load_entry_points()
+    return registry
+
+
+def configure_platforms(config: dict) -> PlatformRegistry:
+    """Install the process-wide registry: built-ins, then entry points, then settings.yaml"""
+    global _registry
+    registry = _default_registry()
+    registry.load_config(config)
+    with _registry_lock:
+        _registry = registry
+    return registry
+
+
+def get_registry() -> PlatformRegistry:
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = _default_registry()
+        return _registry
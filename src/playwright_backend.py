@@ -0,0 +1,357 @@
+"""
+Asyncio/Playwright scraping backend.
+
+One Chromium process serves every URL; each URL gets its own lightweight,
+isolated browser context instead of a separate Chrome process, so dozens of
+pages can be in flight at once.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from playwright.async_api import async_playwright, Page
+from dom_extractor import build_plan, extract_with_page, record_extraction, wait_until_ready_page
+from product_schema import ProductData, ScrapedResult, StockStatus
+from structured_data import collect_with_page, parse_structured
+from network_policy import apply_to_context
+from scheduler import DomainState
+from screenshot_store import get_screenshot_store
+from proxy_pool import BLOCK_PAGE_FUNCTION, Proxy, get_proxy_pool
+from failures import (
+    BLOCKED, CIRCUIT_OPEN, ScrapeFailure, as_failure, get_circuit_breaker, get_retry_policy
+)
+from listing import extract_listing_with_page, get_listing_settings, listing_result
+from warm_start import shared_selectors, shared_user_agent
+from utils import clean_price
+
+
+class AsyncBaseScraper(ABC):
+    """Playwright counterpart of BaseScraper working on a single page"""
+
+    def __init__(self, page: Page, timeout: int = 30, behavior: str = "stealth"):
+        self.page = page
+        self.timeout = timeout
+        self.behavior = behavior
+        self.platform: Optional[str] = None
+        # Proxy of the page's context, reused by isolated copies
+        self.proxy: Optional[Proxy] = None
+        # Last page opened with open_page, reopened after a page crash
+        self._page_url: Optional[str] = None
+        self.logger = logging.getLogger(__name__)
+        self.selectors = self.load_selectors()
+
+    def load_selectors(self) -> Dict[str, Any]:
+        return shared_selectors('config/selectors.yaml')
+
+    async def goto(self, url: str):
+        await self.page.goto(url, wait_until="domcontentloaded", timeout=self.timeout * 1000)
+
+    async def open_page(self, url: str):
+        """Navigate to ``url``; raises a ``blocked`` failure on a captcha or block page"""
+        await self.goto(url)
+        self._page_url = url
+        if await self.page_blocked():
+            raise ScrapeFailure(BLOCKED, f"Blocked or captcha page at {url}", 'navigate')
+
+    async def restart_page(self):
+        """Replace a crashed page with a new one in the same context and reopen its URL"""
+        self.logger.warning("Page crashed, opening a new one")
+        self.page = await self.page.context.new_page()
+        if self._page_url:
+            await self.open_page(self._page_url)
+
+    async def run_stage(self, stage: str, func, *args, **kwargs):
+        """Run one scrape stage, retrying it on its own per the retry policy"""
+        return await get_retry_policy().run_async(stage, func, *args, recover=self.restart_page, **kwargs)
+
+    async def pause(self, min_delay: float = 1.0, max_delay: float = 3.0):
+        """Random think time, skipped by the throughput profile"""
+        if self.behavior == "stealth":
+            await asyncio.sleep(random.uniform(min_delay, max_delay))
+
+    async def wait_for_ready(self, anchor_selectors: List[str], timeout: Optional[float] = None) -> bool:
+        """Wait once for the DOM and one of ``anchor_selectors`` to be present"""
+        return await wait_until_ready_page(self.page, anchor_selectors, timeout or self.timeout)
+
+    async def wait_for_idle(self, timeout: Optional[float] = None) -> bool:
+        """Wait for in-page requests (XHR, fetch) to settle after an action"""
+        try:
+            await self.page.wait_for_load_state("networkidle", timeout=(timeout or self.timeout) * 1000)
+            return True
+        except Exception:
+            return False
+
+    @asynccontextmanager
+    async def isolated_copy(self):
+        """The same scraper on a fresh context (own cookies and cart) of the same browser"""
+        context = await self.page.context.browser.new_context(
+            user_agent=shared_user_agent().random,
+            proxy=self.proxy.playwright_config() if self.proxy else None
+        )
+        try:
+            await apply_to_context(context, self.platform)
+            copy = type(self)(await context.new_page(), self.timeout, self.behavior)
+            copy.proxy = self.proxy
+            yield copy
+        finally:
+            await context.close()
+
+    def build_plan(self, extra_fields: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Dict[str, Any]]:
+        """Extraction plan for this platform, ordered by selector hit rate"""
+        return build_plan(self.selectors.get(self.platform, {}), extra_fields, self.platform)
+
+    async def extract_fields(self, plan: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Read every field in ``plan`` with a single page.evaluate round trip"""
+        fields = await extract_with_page(self.page, plan)
+        record_extraction(self.platform, plan, fields)
+        return fields
+
+    async def extract_structured(self) -> Dict[str, Any]:
+        """Product fields from the page's JSON-LD / hydration state, if any"""
+        try:
+            return parse_structured(await collect_with_page(self.page))
+        except Exception as e:
+            self.logger.debug(f"No structured data: {e}")
+            return {}
+
+    async def page_blocked(self) -> bool:
+        """Whether the current page is a captcha or block page"""
+        try:
+            return bool(await self.page.evaluate(BLOCK_PAGE_FUNCTION))
+        except Exception:
+            return False
+
+    async def capture_screenshot(self, name: str) -> Optional[str]:
+        """Grab the page as PNG and hand it to the background writer; returns its path"""
+        # Starting the writer lists its objects and submit() blocks while the
+        # writer's queue is full, so neither runs on the event loop
+        store = await asyncio.to_thread(get_screenshot_store)
+        if not store:
+            return None
+        return await asyncio.to_thread(store.submit, await self.page.screenshot(), name)
+
+    async def texts_of(self, selector: str) -> List[str]:
+        try:
+            texts = await self.page.eval_on_selector_all(
+                selector, "els => els.map(e => (e.innerText || '').trim())"
+            )
+            return [text for text in texts if text]
+        except Exception:
+            return []
+
+    def extract_price(self, text: str) -> Optional[str]:
+        return clean_price(text)
+
+    def listing_spec(self, url: str) -> Optional[Dict[str, Any]]:
+        """Card selectors when ``url`` is a search/category listing of this platform"""
+        spec = (self.selectors.get(self.platform) or {}).get('listing')
+        if spec and get_listing_settings().is_listing(url, self.platform):
+            return spec
+        return None
+
+    async def scrape(self, url: str) -> ScrapedResult:
+        """Scrape ``url`` as a listing page or as a single product page"""
+        if self.listing_spec(url):
+            return await self.scrape_listing(url)
+        return await self.scrape_product(url)
+
+    async def scrape_listing(self, url: str) -> ScrapedResult:
+        """Read every product card, following pagination up to ``listing.max_pages``"""
+        settings = get_listing_settings()
+        spec = self.listing_spec(url)
+        cards, title, page_url, pages = [], None, url, 0
+        while page_url and pages < settings.max_pages:
+            if pages:
+                await asyncio.sleep(settings.page_interval)
+            await self.run_stage('navigate', self.open_page, page_url)
+            await self.wait_for_ready(spec.get('card', []))
+            await self.pause(0.5, 1.5)
+            page = await extract_listing_with_page(self.page, spec)
+            title = title or page.get('title')
+            cards.extend(page.get('cards') or [])
+            page_url = page.get('next')
+            pages += 1
+        self.logger.info(f"Read {len(cards)} product cards from {pages} listing page(s): {url}")
+        return listing_result(url, self.platform, cards, title, pages)
+
+    @abstractmethod
+    async def scrape_product(self, url: str) -> ScrapedResult:
+        pass
+
+    @abstractmethod
+    async def simulate_checkout(self, product_data: ProductData, quantity: int = 1) -> Dict[str, Any]:
+        pass
+
+
+class PlaywrightRunner:
+    """
+    Scrapes a batch of URLs with one Chromium instance and a context per URL.
+
+    ``max_contexts`` workers share the batch, so that many pages are open at
+    once at most; they pick URLs the way DomainScheduler does, with the same
+    per-domain concurrency, pacing and circuit-breaker hold.
+    ``prefetch`` (e.g. the HTTP fast path) runs first in a worker thread; a
+    successful result from it skips the browser.
+    """
+
+    def __init__(self, scraper_factory: Callable[[str, Page], Optional[AsyncBaseScraper]],
+                 scheduler, headless: bool = True, max_contexts: int = 10,
+                 prefetch: Optional[Callable[[str], Optional[ScrapedResult]]] = None):
+        self.scraper_factory = scraper_factory
+        self.scheduler = scheduler
+        self.prefetch = prefetch
+        self.headless = headless
+        self.max_contexts = max(1, max_contexts)
+        self.logger = logging.getLogger(__name__)
+        self.ua = shared_user_agent()
+
+    @classmethod
+    def from_config(cls, config: dict, scraper_factory, scheduler, prefetch=None) -> "PlaywrightRunner":
+        return cls(
+            scraper_factory,
+            scheduler,
+            headless=config.get('scraper', {}).get('headless', True),
+            max_contexts=config.get('playwright', {}).get('max_contexts', 10),
+            prefetch=prefetch
+        )
+
+    def scrape_urls(self, urls: List[str],
+                    on_result: Optional[Callable[[int, ScrapedResult], None]] = None,
+                    keep_results: bool = True,
+                    on_start: Optional[Callable[[int], None]] = None) -> List[ScrapedResult]:
+        """
+        Blocking entry point; runs the batch on a private event loop. With
+        ``keep_results=False`` results only go to ``on_result``.
+        """
+        return asyncio.run(self._scrape_all(urls, on_result, keep_results, on_start))
+
+    async def _scrape_all(self, urls, on_result, keep_results=True, on_start=None) -> List[ScrapedResult]:
+        results: List[Optional[ScrapedResult]] = [None] * len(urls)
+        if not urls:
+            return results
+
+        # URLs wait in per-domain queues rather than as one coroutine each;
+        # ``max_contexts`` workers pick the earliest URL whose domain is free
+        domains = self.scheduler.queues(urls)
+        cond = asyncio.Condition()
+
+        async def next_job() -> Optional[Tuple[DomainState, int, str]]:
+            async with cond:
+                while True:
+                    if not any(state.pending for state in domains.values()):
+                        return None
+                    now = time.monotonic()
+                    best, wake_at = self.scheduler.pick(domains, now)
+                    if best is not None:
+                        index, url = best.pending.popleft()
+                        best.active += 1
+                        best.last_start = now
+                        return best, index, url
+                    try:
+                        await asyncio.wait_for(cond.wait(), None if wake_at is None else wake_at - now)
+                    except asyncio.TimeoutError:
+                        pass
+
+        async with async_playwright() as playwright:
+            # Proxies are set per context; Chromium needs a placeholder at launch for that
+            browser = await playwright.chromium.launch(
+                headless=self.headless,
+                proxy={'server': 'http://per-context'} if get_proxy_pool() else None
+            )
+            try:
+                async def worker():
+                    while True:
+                        job = await next_job()
+                        if job is None:
+                            return
+                        state, index, url = job
+                        try:
+                            # Journal and sink writes block, so they run off the event loop
+                            if on_start:
+                                await asyncio.to_thread(on_start, index)
+                            result = await self._scrape_one(browser, url)
+                            if keep_results:
+                                results[index] = result
+                            if on_result:
+                                await asyncio.to_thread(on_result, index, result)
+                        finally:
+                            async with cond:
+                                state.active -= 1
+                                cond.notify_all()
+
+                workers = min(self.max_contexts, len(urls))
+                await asyncio.gather(*(worker() for _ in range(workers)))
+            finally:
+                await browser.close()
+
+        return results
+
+    async def _scrape_one(self, browser, url: str) -> ScrapedResult:
+        prefetched = None
+        if self.prefetch:
+            try:
+                prefetched = await asyncio.to_thread(self.prefetch, url)
+                if prefetched and prefetched.success:
+                    return prefetched
+            except Exception as e:
+                self.logger.info(f"Prefetch failed for {url}: {e}")
+
+        breaker = get_circuit_breaker()
+        if breaker and breaker.abandoned(url):
+            return self._failed_result(url, "unknown", "Store is blocking requests, skipped", CIRCUIT_OPEN)
+
+        proxies = get_proxy_pool()
+        proxy = await asyncio.to_thread(proxies.acquire, url) if proxies else None
+        context = await browser.new_context(
+            user_agent=self.ua.random,
+            proxy=proxy.playwright_config() if proxy else None
+        )
+        started = time.monotonic()
+        try:
+            page = await context.new_page()
+            scraper = self.scraper_factory(url, page)
+            if not scraper:
+                return prefetched or self._failed_result(url, "unknown", "Unsupported platform")
+            scraper.proxy = proxy
+            await apply_to_context(context, scraper.platform)
+            result = await scraper.scrape(url)
+            if proxy:
+                blocked = await scraper.page_blocked()
+                proxies.report(proxy, result.success, time.monotonic() - started, blocked)
+            if breaker:
+                breaker.record(url, result.failure_kind == BLOCKED, result.success)
+            if result.success:
+                logging.info(f"Successfully scraped: {url}")
+            else:
+                logging.warning(f"Failed to scrape {url}: {result.error_message}")
+            return result
+        except Exception as e:
+            failure = as_failure(e)
+            logging.error(f"Error scraping {url} ({failure.kind}): {failure}")
+            if proxy:
+                proxies.report(proxy, success=False)
+            if breaker:
+                breaker.record(url, failure.kind == BLOCKED)
+            return self._failed_result(url, "unknown", str(failure), failure.kind)
+        finally:
+            await context.close()
+
+    @staticmethod
+    def _failed_result(url: str, store: str, error: str, failure_kind: Optional[str] = None) -> ScrapedResult:
+        return ScrapedResult(
+            store=store,
+            url=url,
+            product=ProductData(
+                name="",
+                price="",
+                product_url=url,
+                stock_status=StockStatus.OUT_OF_STOCK
+            ),
+            success=False,
+            error_message=error,
+            failure_kind=failure_kind
+        )
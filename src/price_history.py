@@ -0,0 +1,393 @@
+"""
+Price history with change detection.
+
+Every snapshot of a product (a successful ``ScrapedResult``) is compared
+against the last known values of its tracked fields: price, discount price,
+stock status, and the price of each delivery option per checkout scenario.
+Prices are compared by amount and ISO currency as parsed by ``normalize``,
+so a change of formatting alone ("$1,299.99" -> "$1299.99") is not a
+change. Only differences are stored, so an unchanged product costs one
+timestamp update per run however often it is scraped.
+
+Products are keyed by canonical product key (see ``canonical``) and store.
+Each tracked field of a product is a *series* holding its current value, and
+each change row points at its series by integer id, so the large table stays
+narrow and a product's history is one index range scan per series. Changes
+are numbered in ingest order, which gives consumers a cursor-based feed of
+everything that changed since they last read it.
+"""
+
+import logging
+import math
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
+
+from canonical import product_key
+from product_schema import ScrapedResult
+from records import ResultRecord, read_batches
+from sqlite_store import immediate_transaction
+
+PRICE = 'price'
+DISCOUNT_PRICE = 'discount_price'
+STOCK_STATUS = 'stock_status'
+DELIVERY = 'delivery'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    id INTEGER PRIMARY KEY,
+    product_key TEXT NOT NULL UNIQUE,
+    platform TEXT,
+    store TEXT NOT NULL,
+    url TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS series (
+    id INTEGER PRIMARY KEY,
+    product_id INTEGER NOT NULL,
+    field TEXT NOT NULL,
+    scenario TEXT NOT NULL DEFAULT '',
+    company TEXT NOT NULL DEFAULT '',
+    delivery_type TEXT NOT NULL DEFAULT '',
+    value TEXT,
+    amount REAL,
+    currency TEXT,
+    UNIQUE (product_id, field, scenario, company, delivery_type)
+);
+CREATE TABLE IF NOT EXISTS changes (
+    seq INTEGER PRIMARY KEY,
+    series_id INTEGER NOT NULL,
+    observed_at REAL NOT NULL,
+    old_value TEXT,
+    new_value TEXT,
+    amount REAL,
+    currency TEXT
+);
+CREATE INDEX IF NOT EXISTS changes_series ON changes (series_id, observed_at);
+CREATE TABLE IF NOT EXISTS cursors (
+    consumer TEXT PRIMARY KEY,
+    seq INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+_CHANGE_COLUMNS = (
+    "c.seq, p.product_key, p.store, c.observed_at, s.field, s.scenario, s.company, "
+    "s.delivery_type, c.old_value, c.new_value, c.amount, c.currency"
+)
+
+# Keeps ``IN (...)`` lists under SQLite's bound-parameter limit
+_IN_CHUNK = 500
+
+# (field, scenario, company, delivery type); the last three are '' outside delivery options
+SeriesKey = Tuple[str, str, str, str]
+# (text, amount, ISO currency); amount and currency are None for stock status and unparsed prices
+Value = Tuple[str, Optional[float], Optional[str]]
+Timestamp = Union[datetime, float, None]
+
+
+class Change:
+    """
+    One changed value. ``old_value`` is None for a value seen for the first
+    time and ``new_value`` for a delivery option that is no longer offered.
+    """
+
+    __slots__ = ('seq', 'product_key', 'store', 'observed_at', 'field', 'scenario', 'company',
+                 'delivery_type', 'old_value', 'new_value', 'amount', 'currency')
+
+    def __init__(self, seq: int, product_key: str, store: str, observed_at: float, field: str,
+                 scenario: str, company: str, delivery_type: str, old_value: Optional[str],
+                 new_value: Optional[str], amount: Optional[float], currency: Optional[str]):
+        self.seq = seq
+        self.product_key = product_key
+        self.store = store
+        self.observed_at = datetime.fromtimestamp(observed_at)
+        self.field = field
+        self.scenario = scenario or None
+        self.company = company or None
+        self.delivery_type = delivery_type or None
+        self.old_value = old_value
+        self.new_value = new_value
+        self.amount = amount
+        self.currency = currency
+
+    def to_dict(self) -> Dict[str, Any]:
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values['observed_at'] = self.observed_at.isoformat()
+        return values
+
+
+def _epoch(value: Timestamp, default: float) -> float:
+    if value is None:
+        return default
+    return value.timestamp() if isinstance(value, datetime) else float(value)
+
+
+def _chunks(values: Sequence[Any]) -> Iterator[Sequence[Any]]:
+    for start in range(0, len(values), _IN_CHUNK):
+        yield values[start:start + _IN_CHUNK]
+
+
+def tracked_values(record: ResultRecord) -> Tuple[Dict[SeriesKey, str], Set[str]]:
+    """
+    Tracked values of one result and the checkout scenarios that completed.
+    Only a completed scenario can show that a delivery option went away;
+    a failed or missing one says nothing about its options.
+    """
+    product = record['product']
+    values: Dict[SeriesKey, str] = {}
+    for field in (PRICE, DISCOUNT_PRICE, STOCK_STATUS):
+        value = product.get(field)
+        if value:
+            values[(field, '', '', '')] = value
+    completed = set()
+    for name, scenario in (record.get('scenarios') or {}).items():
+        options = scenario['delivery_options']
+        if scenario.get('error_message') or not options:
+            continue
+        completed.add(name)
+        for option in options:
+            values[(DELIVERY, name, option['company'], option['type'])] = option['price']
+    return values, completed
+
+
+def _with_amounts(snapshots: List[list]) -> None:
+    """
+    Turn the tracked texts of every snapshot into ``Value`` tuples, parsing
+    all prices of the batch in one pass
+    """
+    from normalize import normalize_delivery_prices, resolve_currencies
+
+    for snapshot in snapshots:
+        snapshot[6] = {series_key: (text, None, None) for series_key, text in snapshot[6].items()}
+    priced = [(snapshot, series_key) for snapshot in snapshots
+              for series_key in snapshot[6] if series_key[0] != STOCK_STATUS]
+    if not priced:
+        return
+    texts = [snapshot[6][series_key][0] for snapshot, series_key in priced]
+    hints = [snapshot[5] for snapshot, _ in priced]
+    urls = [snapshot[3] for snapshot, _ in priced]
+    amounts = normalize_delivery_prices(texts, hints, urls).tolist()
+    currencies = resolve_currencies(texts, hints, urls).to_pylist()
+    for (snapshot, series_key), text, amount, currency in zip(priced, texts, amounts, currencies):
+        if not math.isnan(amount):
+            snapshot[6][series_key] = (text, amount, currency)
+
+
+def _unchanged(entry: list, value: Value) -> bool:
+    """Whether ``value`` repeats the series' last value; parsed prices compare by amount and currency"""
+    if value[1] is not None and entry[2] is not None:
+        return (entry[2], entry[3]) == value[1:]
+    return entry[1] == value[0]
+
+
+class PriceHistory:
+    def __init__(self, path: str = "data/history/history.sqlite3"):
+        self.path = path
+        self.logger = logging.getLogger(__name__)
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Autocommit; ingest opens its transaction with BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    @classmethod
+    def from_config(cls, config: dict) -> Optional["PriceHistory"]:
+        history_config = config.get('history', {})
+        if not history_config.get('enabled', False):
+            return None
+        return cls(history_config.get('path', "data/history/history.sqlite3"))
+
+    def ingest_stream(self, path: str, offsets: Optional[List[int]] = None,
+                      platform_of: Optional[Callable[[str], Optional[str]]] = None) -> int:
+        """Ingest a run's NDJSON result stream batch by batch; returns the number of changes"""
+        snapshots = changes = 0
+        for batch in read_batches(path, offsets):
+            snapshots += len(batch.records)
+            changes += self.ingest(batch.records, platform_of)
+        self.logger.info(f"Price history: {changes} changes in {snapshots} results from {path}")
+        return changes
+
+    def ingest(self, results: Iterable[Union[ScrapedResult, ResultRecord]],
+               platform_of: Optional[Callable[[str], Optional[str]]] = None) -> int:
+        """
+        Record the changes shown by ``results`` and return how many there
+        were. Failed results and listing pages are not snapshots of a
+        product and are skipped, as is any snapshot no newer than the last
+        one ingested for its product, so ingesting a stream twice is harmless.
+        """
+        snapshots = []
+        for result in results:
+            record = result.model_dump() if isinstance(result, ScrapedResult) else result
+            if not record.get('success', True) or record.get('listing_items'):
+                continue
+            url = record['url']
+            platform = platform_of(url) if platform_of else None
+            values, completed = tracked_values(record)
+            snapshots.append([product_key(url, platform), platform, record['store'], url,
+                              record['timestamp'].timestamp(), record['product'].get('currency'),
+                              values, completed])
+        if not snapshots:
+            return 0
+        _with_amounts(snapshots)
+        with self._lock, immediate_transaction(self._conn) as conn:
+            return self._ingest(conn, snapshots)
+
+    def _ingest(self, conn: sqlite3.Connection, snapshots: List[list]) -> int:
+        keys = list(dict.fromkeys(snapshot[0] for snapshot in snapshots))
+        # product key -> [id, last_seen]
+        products: Dict[str, list] = {}
+        for chunk in _chunks(keys):
+            for key, product_id, last_seen in conn.execute(
+                f"SELECT product_key, id, last_seen FROM products "
+                f"WHERE product_key IN ({','.join('?' * len(chunk))})", chunk
+            ):
+                products[key] = [product_id, last_seen]
+
+        # product id -> series key -> [series id, text, amount, currency]
+        state: Dict[int, Dict[SeriesKey, list]] = {}
+        for chunk in _chunks([product[0] for product in products.values()]):
+            for series_id, product_id, field, scenario, company, delivery_type, *value in conn.execute(
+                f"SELECT id, product_id, field, scenario, company, delivery_type, value, amount, currency "
+                f"FROM series WHERE product_id IN ({','.join('?' * len(chunk))})", chunk
+            ):
+                state.setdefault(product_id, {})[(field, scenario, company, delivery_type)] = [series_id, *value]
+
+        next_product = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM products").fetchone()[0]
+        next_series = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM series").fetchone()[0]
+        new_products, new_series, updated = [], [], {}
+        # (series id, observed_at, old text, new text, amount, currency)
+        changes = []
+        for key, platform, store, url, observed_at, _, values, completed in snapshots:
+            product = products.get(key)
+            if product is None:
+                product = products[key] = [next_product, None]
+                new_products.append((next_product, key, platform, store, url, observed_at))
+                next_product += 1
+            elif product[1] is not None and observed_at <= product[1]:
+                continue
+            product[1] = observed_at
+            current = state.setdefault(product[0], {})
+
+            for series_key, value in values.items():
+                entry = current.get(series_key)
+                if entry is None:
+                    entry = current[series_key] = [next_series, None, None, None]
+                    new_series.append((next_series, product[0], series_key))
+                    next_series += 1
+                if not _unchanged(entry, value):
+                    changes.append((entry[0], observed_at, entry[1]) + value)
+                    entry[1:] = value
+                    updated[entry[0]] = entry
+            for series_key, entry in current.items():
+                if (series_key[0] == DELIVERY and series_key[1] in completed
+                        and entry[1] is not None and series_key not in values):
+                    changes.append((entry[0], observed_at, entry[1], None, None, None))
+                    entry[1:] = (None, None, None)
+                    updated[entry[0]] = entry
+
+        conn.executemany(
+            "INSERT INTO products (id, product_key, platform, store, url, first_seen, last_seen) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (row + (row[-1],) for row in new_products)
+        )
+        conn.executemany(
+            "UPDATE products SET last_seen = ? WHERE id = ?",
+            ((last_seen, product_id) for product_id, last_seen in products.values() if last_seen is not None)
+        )
+        created = {series_id for series_id, _, _ in new_series}
+        conn.executemany(
+            "INSERT INTO series (id, product_id, field, scenario, company, delivery_type, value, amount, currency) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            ((series_id, product_id) + series_key + tuple(updated[series_id][1:])
+             for series_id, product_id, series_key in new_series)
+        )
+        conn.executemany(
+            "UPDATE series SET value = ?, amount = ?, currency = ? WHERE id = ?",
+            (tuple(entry[1:]) + (series_id,) for series_id, entry in updated.items() if series_id not in created)
+        )
+        conn.executemany(
+            "INSERT INTO changes (series_id, observed_at, old_value, new_value, amount, currency) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            changes
+        )
+        return len(changes)
+
+    def history(self, key: str, start: Timestamp = None, end: Timestamp = None,
+                fields: Optional[Sequence[str]] = None) -> List[Change]:
+        """Changes of product ``key`` observed in [``start``, ``end``), oldest first"""
+        query = (
+            f"SELECT {_CHANGE_COLUMNS} FROM products p JOIN series s ON s.product_id = p.id "
+            "JOIN changes c ON c.series_id = s.id "
+            "WHERE p.product_key = ? AND c.observed_at >= ? AND c.observed_at < ?"
+        )
+        params: list = [key, _epoch(start, 0.0), _epoch(end, math.inf)]
+        if fields:
+            query += f" AND s.field IN ({','.join('?' * len(fields))})"
+            params.extend(fields)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY c.observed_at, c.seq", params).fetchall()
+        return [Change(*row) for row in rows]
+
+    def state_at(self, key: str, at: Timestamp = None) -> List[Change]:
+        """The change that set each current value of product ``key`` as of ``at`` (default: now)"""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_CHANGE_COLUMNS} FROM products p JOIN series s ON s.product_id = p.id "
+                "JOIN changes c ON c.seq = ("
+                "  SELECT seq FROM changes WHERE series_id = s.id AND observed_at <= ? "
+                "  ORDER BY observed_at DESC, seq DESC LIMIT 1"
+                ") WHERE p.product_key = ? AND c.new_value IS NOT NULL ORDER BY s.id",
+                (_epoch(at, math.inf), key)
+            ).fetchall()
+        return [Change(*row) for row in rows]
+
+    def changes(self, after: int = 0, limit: int = 10000) -> List[Change]:
+        """Changes numbered after ``after``, in ingest order; pass the last ``seq`` to continue"""
+        with self._lock:
+            # CROSS JOIN keeps the scan on the changes rowid
+            rows = self._conn.execute(
+                f"SELECT {_CHANGE_COLUMNS} FROM changes c CROSS JOIN series s ON s.id = c.series_id "
+                "CROSS JOIN products p ON p.id = s.product_id WHERE c.seq > ? ORDER BY c.seq LIMIT ?",
+                (after, limit)
+            ).fetchall()
+        return [Change(*row) for row in rows]
+
+    def cursor(self, consumer: str) -> int:
+        """Last change ``consumer`` has read"""
+        with self._lock:
+            row = self._conn.execute("SELECT seq FROM cursors WHERE consumer = ?", (consumer,)).fetchone()
+        return row[0] if row else 0
+
+    def advance(self, consumer: str, seq: int):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO cursors (consumer, seq, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (consumer) DO UPDATE SET seq = excluded.seq, updated_at = excluded.updated_at",
+                (consumer, seq, time.time())
+            )
+
+    def feed(self, consumer: str, limit: int = 10000) -> Iterator[List[Change]]:
+        """
+        Pages of changes ``consumer`` has not read yet. Its cursor moves past
+        each page once the next one is requested, so a consumer that stops
+        early sees the unfinished page again next time.
+        """
+        after = self.cursor(consumer)
+        while True:
+            page = self.changes(after, limit)
+            if not page:
+                return
+            yield page
+            after = page[-1].seq
+            self.advance(consumer, after)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from enum import Enum
@@ -20,11 +20,15 @@ class CheckoutScenario(BaseModel):
     scenario_name: str
     delivery_options: List[DeliveryOption]
     screenshot_path: Optional[str] = None
+    error_message: Optional[str] = None
     timestamp: datetime = Field(default_factory=datetime.now)
 
 class ProductData(BaseModel):
+    model_config = ConfigDict(use_enum_values=True)
+
     name: str
     price: str
+    currency: Optional[str] = None
     discount_price: Optional[str] = None
     sku: Optional[str] = None
     brand: Optional[str] = None
@@ -37,20 +41,24 @@ class ProductData(BaseModel):
     seller: Optional[str] = None
     shipping_info: Optional[str] = None
 
-    @validator('image_urls', pre=True)
+    @field_validator('image_urls', mode='before')
+    @classmethod
     def validate_image_urls(cls, v):
         if isinstance(v, str):
             return [v]
         return v
 
 class ScrapedResult(BaseModel):
+    model_config = ConfigDict(use_enum_values=True)
+
     store: str
     url: str
     product: ProductData
     scenarios: Dict[str, CheckoutScenario] = {}
+    # Product cards of a search/category listing page
+    listing_items: List[ProductData] = []
     timestamp: datetime = Field(default_factory=datetime.now)
     success: bool = True
     error_message: Optional[str] = None
-
-    class Config:
-        use_enum_values = True
\ No newline at end of file
+    # Kind of failure from failures.py (navigation_timeout, blocked, ...)
+    failure_kind: Optional[str] = None
\ No newline at end of file
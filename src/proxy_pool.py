@@ -0,0 +1,278 @@
+"""
+Proxy pool with health scoring and request budgets.
+
+Every HTTP fetch takes a proxy from the pool; browsers keep one proxy for
+their whole session (Chrome only accepts it at launch) and are recycled
+after ``rotation_interval`` pages. Each proxy tracks its success rate,
+latency and block/captcha responses. Failing or blocked proxies leave the
+rotation for an exponentially growing cooldown. Budgets cap the requests a
+proxy sends per minute overall and per store, so the pool spreads load
+instead of hitting each store's per-IP rate limits.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional
+from urllib.parse import urlparse
+
+# Status codes stores answer with when they throttle or block an IP
+BLOCK_STATUS_CODES = {403, 429, 503}
+
+BODY_BLOCK_MARKERS = (
+    '/errors/validatecaptcha',
+    'enter the characters you see below',
+    'robot check',
+    'px-captcha',
+    'cf-chl-',
+    'unusual traffic from your computer',
+)
+
+# Evaluated in the browser after a page load
+BLOCK_PAGE_FUNCTION = r"""
+(() => {
+    const title = (document.title || '').toLowerCase();
+    if (['robot check', 'access denied', 'attention required', 'are you a robot'].some((m) => title.includes(m))) {
+        return true;
+    }
+    return ["form[action*='validateCaptcha']", '#captchacharacters', '#px-captcha',
+            '#challenge-form', "iframe[src*='captcha']"].some((s) => document.querySelector(s) !== null);
+})()
+"""
+
+
+class ProxyUnavailable(RuntimeError):
+    """No proxy had budget left within the wait timeout"""
+
+
+def looks_blocked(status_code: int, body: Optional[str]) -> bool:
+    """Whether an HTTP response is a block or captcha page"""
+    if status_code in BLOCK_STATUS_CODES:
+        return True
+    head = (body or '')[:20000].lower()
+    return any(marker in head for marker in BODY_BLOCK_MARKERS)
+
+
+class Proxy:
+    """One proxy endpoint and its health"""
+
+    def __init__(self, url: str):
+        parsed = urlparse(url if '://' in url else f"http://{url}")
+        self.url = parsed.geturl()
+        self.server = f"{parsed.scheme}://{parsed.hostname}:{parsed.port}" if parsed.port \
+            else f"{parsed.scheme}://{parsed.hostname}"
+        self.username = parsed.username
+        self.password = parsed.password
+
+        self.successes = 0
+        self.failures = 0
+        self.blocks = 0
+        self.latency: Optional[float] = None
+        self.consecutive_failures = 0
+        self.strikes = 0
+        self.cooldown_until = 0.0
+        self.last_used = 0.0
+        self.requests: Deque[float] = deque()
+        self.domain_requests: Dict[str, Deque[float]] = {}
+
+    def score(self) -> float:
+        """Smoothed success rate divided by latency; unused proxies start optimistic"""
+        success_rate = (self.successes + 1) / (self.successes + self.failures + 2)
+        return success_rate / (1.0 + (self.latency if self.latency is not None else 1.0))
+
+    def requests_proxies(self) -> Dict[str, str]:
+        return {'http': self.url, 'https': self.url}
+
+    def playwright_config(self) -> Dict[str, str]:
+        config = {'server': self.server}
+        if self.username:
+            config.update(username=self.username, password=self.password or '')
+        return config
+
+    def __repr__(self):
+        return f"Proxy({self.server})"
+
+
+class ProxyPool:
+    WINDOW = 60.0
+
+    def __init__(self, proxies: List[str], max_requests_per_minute: Optional[float] = None,
+                 domain_requests_per_minute: Optional[float] = None,
+                 domain_budgets: Optional[Dict[str, float]] = None,
+                 backoff: float = 30.0, max_backoff: float = 900.0,
+                 failures_before_backoff: int = 2, wait_timeout: float = 60.0,
+                 rotation_interval: int = 10):
+        if not proxies:
+            raise ValueError("A proxy pool needs at least one proxy")
+        self.proxies = [Proxy(url) for url in proxies]
+        # Chrome can't authenticate to a proxy, so Selenium sessions only get these
+        self.session_proxies = [proxy for proxy in self.proxies if not proxy.username]
+        self.max_requests_per_minute = max_requests_per_minute
+        self.domain_requests_per_minute = domain_requests_per_minute
+        self.domain_budgets = domain_budgets or {}
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.failures_before_backoff = max(1, failures_before_backoff)
+        self.wait_timeout = wait_timeout
+        self.rotation_interval = max(1, rotation_interval)
+        self.logger = logging.getLogger(__name__)
+        self._cond = threading.Condition()
+
+    @classmethod
+    def from_config(cls, config: dict) -> Optional["ProxyPool"]:
+        proxy_config = config.get('proxies', {})
+        if not proxy_config.get('enabled', False) or not proxy_config.get('list'):
+            return None
+        pool = cls(
+            proxy_config['list'],
+            max_requests_per_minute=proxy_config.get('max_requests_per_minute'),
+            domain_requests_per_minute=proxy_config.get('domain_requests_per_minute'),
+            domain_budgets=proxy_config.get('domains'),
+            backoff=proxy_config.get('backoff', 30.0),
+            max_backoff=proxy_config.get('max_backoff', 900.0),
+            failures_before_backoff=proxy_config.get('failures_before_backoff', 2),
+            wait_timeout=proxy_config.get('wait_timeout', 60.0),
+            rotation_interval=proxy_config.get('rotation_interval', 10)
+        )
+        authenticated = [proxy for proxy in pool.proxies if proxy.username]
+        if authenticated:
+            pool.logger.warning(
+                f"Proxies with credentials are only used by HTTP fetches and Playwright, "
+                f"never by Selenium drivers: {', '.join(proxy.server for proxy in authenticated)}"
+            )
+        return pool
+
+    def domain_key(self, url: str) -> str:
+        host = (urlparse(url or '').hostname or '').lower()
+        for key in self.domain_budgets:
+            if key in host:
+                return key
+        return host[4:] if host.startswith('www.') else host
+
+    def _domain_limit(self, domain: str) -> Optional[float]:
+        return self.domain_budgets.get(domain, self.domain_requests_per_minute)
+
+    def _prune(self, window: Deque[float], now: float):
+        while window and window[0] <= now - self.WINDOW:
+            window.popleft()
+
+    def _budget_wait(self, proxy: Proxy, domain: str, now: float) -> float:
+        """Seconds until ``proxy`` may send one more request to ``domain``"""
+        wait = 0.0
+        if self.max_requests_per_minute:
+            self._prune(proxy.requests, now)
+            if len(proxy.requests) >= self.max_requests_per_minute:
+                wait = proxy.requests[0] + self.WINDOW - now
+        limit = self._domain_limit(domain)
+        if limit:
+            window = proxy.domain_requests.setdefault(domain, deque())
+            self._prune(window, now)
+            if len(window) >= limit:
+                wait = max(wait, window[0] + self.WINDOW - now)
+        return wait
+
+    def _charge(self, proxy: Proxy, domain: str, now: float):
+        proxy.requests.append(now)
+        proxy.domain_requests.setdefault(domain, deque()).append(now)
+        proxy.last_used = now
+
+    def _wait(self, wait: float, deadline: float, domain: str):
+        if time.monotonic() + wait > deadline:
+            raise ProxyUnavailable(f"No proxy with budget for {domain} within {self.wait_timeout:.0f}s")
+        self._cond.wait(wait)
+
+    def acquire(self, url: str) -> Proxy:
+        """Best healthy proxy with budget for ``url``'s store, charged one request"""
+        domain = self.domain_key(url)
+        deadline = time.monotonic() + self.wait_timeout
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                waits = [(max(proxy.cooldown_until - now, self._budget_wait(proxy, domain, now)), proxy)
+                         for proxy in self.proxies]
+                ready = [proxy for wait, proxy in waits if wait <= 0]
+                if ready:
+                    proxy = max(ready, key=lambda p: (p.score(), -p.last_used))
+                    self._charge(proxy, domain, now)
+                    return proxy
+                self._wait(min(wait for wait, _ in waits), deadline, domain)
+
+    def acquire_session(self) -> Proxy:
+        """
+        Proxy for a new Chrome session, never one with credentials; budgets
+        are charged per page with ``charge``
+        """
+        if not self.session_proxies:
+            raise ProxyUnavailable("Every proxy needs credentials, which Chrome can't send; "
+                                   "use the Playwright backend or add proxies without credentials")
+        with self._cond:
+            now = time.monotonic()
+            healthy = [proxy for proxy in self.session_proxies if proxy.cooldown_until <= now]
+            if healthy:
+                return max(healthy, key=lambda p: (p.score(), -p.last_used))
+            return min(self.session_proxies, key=lambda p: p.cooldown_until)
+
+    def charge(self, proxy: Proxy, url: str):
+        """Wait until ``proxy`` has budget for one request to ``url``'s store and record it"""
+        domain = self.domain_key(url)
+        deadline = time.monotonic() + self.wait_timeout
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                wait = self._budget_wait(proxy, domain, now)
+                if wait <= 0:
+                    self._charge(proxy, domain, now)
+                    return
+                self._wait(wait, deadline, domain)
+
+    def healthy(self, proxy: Proxy) -> bool:
+        with self._cond:
+            return proxy.cooldown_until <= time.monotonic()
+
+    def report(self, proxy: Proxy, success: bool, latency: Optional[float] = None,
+               blocked: bool = False):
+        """Record the outcome of a request sent through ``proxy``"""
+        with self._cond:
+            if latency is not None:
+                proxy.latency = latency if proxy.latency is None else 0.8 * proxy.latency + 0.2 * latency
+            if success and not blocked:
+                proxy.successes += 1
+                proxy.consecutive_failures = 0
+                proxy.strikes = 0
+                return
+            proxy.failures += 1
+            proxy.blocks += int(blocked)
+            proxy.consecutive_failures += 1
+            if blocked or proxy.consecutive_failures >= self.failures_before_backoff:
+                cooldown = min(self.backoff * 2 ** proxy.strikes, self.max_backoff)
+                proxy.strikes += 1
+                proxy.consecutive_failures = 0
+                proxy.cooldown_until = time.monotonic() + cooldown
+                self.logger.warning(f"{proxy} {'blocked' if blocked else 'failing'}, "
+                                    f"out of rotation for {cooldown:.0f}s")
+            self._cond.notify_all()
+
+    def report_text(self) -> str:
+        with self._cond:
+            lines = [
+                f"{proxy.server}: {proxy.successes} ok, {proxy.failures} failed "
+                f"({proxy.blocks} blocked), latency "
+                f"{f'{proxy.latency:.2f}s' if proxy.latency is not None else 'n/a'}"
+                for proxy in self.proxies
+            ]
+        return "Proxy health:\n  " + "\n  ".join(lines)
+
+
+_shared_pool: Optional[ProxyPool] = None
+
+
+def configure_proxies(config: dict) -> Optional[ProxyPool]:
+    """Install the process-wide proxy pool used by drivers, contexts and HTTP fetches"""
+    global _shared_pool
+    _shared_pool = ProxyPool.from_config(config)
+    return _shared_pool
+
+
+def get_proxy_pool() -> Optional[ProxyPool]:
+    return _shared_pool
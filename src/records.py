@@ -0,0 +1,184 @@
+"""
+Compact result records for high-volume output.
+
+Outputs are derived from a run's NDJSON stream without building a
+``ScrapedResult`` per line. (Scrapers still return a ``ScrapedResult`` per
+URL; only reading the stream back skips the models.) Lines are read in batches and each batch is
+validated in one pydantic-core call against the ``ResultRecord`` TypedDict
+schema, which yields plain dicts instead of model instances. A
+``RecordBatch`` then flattens the batch into one tuple per output column
+(one row per delivery option or listing card) and the writers stream those
+columns to CSV, Excel and Parquet; no per-row dicts are built or copied.
+JSON is serialized from the records by pydantic-core.
+"""
+
+import logging
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from pydantic import ConfigDict, TypeAdapter, ValidationError
+# pydantic only accepts typing_extensions.TypedDict before Python 3.12
+from typing_extensions import NotRequired, TypedDict
+
+from product_schema import StockStatus
+from result_sink import iter_lines
+
+# Flattened row layout, fixed so CSV/Excel can be written chunk by chunk
+COLUMNS = [
+    'store', 'url', 'name', 'price', 'currency', 'discount_price', 'sku', 'brand',
+    'category', 'product_url', 'image_url', 'stock_status', 'rating', 'reviews',
+    'seller', 'success', 'error_message', 'failure_kind', 'timestamp', 'scenario',
+    'delivery_company', 'delivery_type', 'delivery_price', 'eta', 'screenshot'
+]
+
+# Scenario columns of a row without a checkout scenario
+_NO_SCENARIO = (None,) * 6
+
+
+class DeliveryOptionRecord(TypedDict):
+    company: str
+    type: str
+    price: str
+    eta: str
+    conditions: NotRequired[Optional[str]]
+
+
+class CheckoutScenarioRecord(TypedDict):
+    scenario_name: str
+    delivery_options: List[DeliveryOptionRecord]
+    screenshot_path: NotRequired[Optional[str]]
+    error_message: NotRequired[Optional[str]]
+    timestamp: NotRequired[datetime]
+
+
+class ProductRecord(TypedDict):
+    # Stock status as its plain string, which every writer accepts as is
+    __pydantic_config__ = ConfigDict(use_enum_values=True)
+
+    name: str
+    price: str
+    currency: NotRequired[Optional[str]]
+    discount_price: NotRequired[Optional[str]]
+    sku: NotRequired[Optional[str]]
+    brand: NotRequired[Optional[str]]
+    category: NotRequired[Optional[str]]
+    product_url: str
+    image_urls: NotRequired[List[str]]
+    stock_status: StockStatus
+    rating: NotRequired[Optional[str]]
+    reviews: NotRequired[Optional[str]]
+    seller: NotRequired[Optional[str]]
+    shipping_info: NotRequired[Optional[str]]
+
+
+class ResultRecord(TypedDict):
+    """``ScrapedResult`` as written by the sink, validated without a model instance"""
+    store: str
+    url: str
+    product: ProductRecord
+    scenarios: NotRequired[Dict[str, CheckoutScenarioRecord]]
+    listing_items: NotRequired[List[ProductRecord]]
+    timestamp: datetime
+    success: NotRequired[bool]
+    error_message: NotRequired[Optional[str]]
+    failure_kind: NotRequired[Optional[str]]
+
+
+_BATCH = TypeAdapter(List[ResultRecord])
+_RECORD = TypeAdapter(ResultRecord)
+
+
+def validate_lines(lines: Sequence[Tuple[int, bytes]], source: str = "") -> List[ResultRecord]:
+    """
+    Validate ``(position, line)`` pairs of NDJSON in one call; when the batch
+    holds a torn or invalid line, fall back to line by line and skip it
+    """
+    try:
+        return _BATCH.validate_json(b"[" + b",".join(line for _, line in lines) + b"]")
+    except ValidationError:
+        pass
+    records = []
+    for position, line in lines:
+        try:
+            records.append(_RECORD.validate_json(line))
+        except ValidationError as e:
+            logging.getLogger(__name__).warning(
+                f"Skipping unreadable line at {position} in {source}: {e.error_count()} errors"
+            )
+    return records
+
+
+def dump_record(record: ResultRecord, indent: Optional[int] = None) -> bytes:
+    """UTF-8 JSON of a record, serialized by pydantic-core from the schema"""
+    return _RECORD.dump_json(record, indent=indent)
+
+
+def _product_values(result: ResultRecord, product: ProductRecord) -> tuple:
+    image_urls = product.get('image_urls')
+    return (
+        result['store'], result['url'], product['name'], product['price'], product.get('currency'),
+        product.get('discount_price'), product.get('sku'), product.get('brand'), product.get('category'),
+        product['product_url'], image_urls[0] if image_urls else '', product['stock_status'],
+        product.get('rating'), product.get('reviews'), product.get('seller'), result.get('success', True),
+        result.get('error_message'), result.get('failure_kind'), result['timestamp'],
+    )
+
+
+def result_rows(result: ResultRecord) -> Iterator[tuple]:
+    """Flattened rows of one result in ``COLUMNS`` order"""
+    listing_items = result.get('listing_items')
+    if listing_items:
+        # A listing page becomes one row per product card
+        for item in listing_items:
+            yield _product_values(result, item) + _NO_SCENARIO
+        return
+
+    base = _product_values(result, result['product'])
+    scenarios = result.get('scenarios')
+    if not scenarios:
+        yield base + _NO_SCENARIO
+        return
+    for scenario_name, scenario in scenarios.items():
+        screenshot = scenario.get('screenshot_path')
+        options = scenario['delivery_options']
+        if not options:
+            yield base + (scenario_name, '', '', '', '', screenshot)
+        for option in options:
+            yield base + (scenario_name, option['company'], option['type'], option['price'],
+                          option['eta'], screenshot)
+
+
+class RecordBatch:
+    """
+    A batch of validated results and their flattened rows, stored as one
+    tuple per output column
+    """
+
+    __slots__ = ('records', 'columns', 'size')
+
+    def __init__(self, records: List[ResultRecord]):
+        self.records = records
+        rows = [row for record in records for row in result_rows(record)]
+        self.size = len(rows)
+        # Transposed in C; the row tuples are freed once this returns
+        columns = zip(*rows) if rows else ((),) * len(COLUMNS)
+        self.columns: Dict[str, tuple] = dict(zip(COLUMNS, columns))
+
+    def __len__(self):
+        return self.size
+
+    def column(self, name: str) -> tuple:
+        return self.columns[name]
+
+    def rows(self) -> Iterator[tuple]:
+        """Rows in ``COLUMNS`` order, rebuilt lazily from the columns"""
+        return zip(*self.columns.values())
+
+
+def read_batches(path: str, offsets: Optional[List[int]] = None,
+                 batch_size: int = 500) -> Iterator[RecordBatch]:
+    """Stream an NDJSON result file as validated batches of ``batch_size`` results"""
+    lines = iter_lines(path, offsets)
+    for chunk in iter(lambda: list(islice(lines, batch_size)), []):
+        yield RecordBatch(validate_lines(chunk, path))
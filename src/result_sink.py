@@ -0,0 +1,188 @@
+"""
+Streaming, crash-safe result sink.
+
+Each finished ``ScrapedResult`` is appended to ``results.ndjson`` as one JSON
+line as soon as it completes, instead of being held in memory until the run
+ends. Lines are written in completion order, flushed in batches and
+fsync'd at least every ``fsync_interval`` seconds, even when the batch is
+not full, so a crash loses at most the last few seconds of results and a
+slow URL never holds back the ones after it. Every line starts with the
+result's input index (``{"index": 7, ...}``); the JSON/CSV/Excel outputs
+are derived from the stream after the run, in input order, from the run
+journal's offsets or from ``input_order``.
+"""
+
+import logging
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from product_schema import ScrapedResult
+
+
+INDEX_PREFIX = b'{"index":'
+
+
+def new_run_id() -> str:
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+class NdjsonSink:
+    """Append-only NDJSON writer fed from any number of worker threads"""
+
+    def __init__(self, path: str, flush_every: int = 20, fsync_interval: float = 5.0,
+                 on_durable: Optional[Callable[[List[Tuple[int, int, bool]]], None]] = None):
+        """
+        ``on_durable`` receives ``(index, byte offset, success)`` for every
+        result once its line has been fsync'd
+        """
+        self.path = path
+        self.flush_every = max(1, flush_every)
+        self.fsync_interval = fsync_interval
+        self.on_durable = on_durable
+        self.logger = logging.getLogger(__name__)
+        self.written = 0
+        self.successful = 0
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, 'ab')
+        if self._file.tell() and not self._ends_with_newline(path):
+            # Terminate a line torn by a crash before appending after it
+            self._file.write(b"\n")
+        self._lock = threading.Lock()
+        self._batch: List[Tuple[int, bytes, bool]] = []
+        self._unsynced: List[Tuple[int, int, bool]] = []
+        self._last_sync = time.monotonic()
+        # Flushes results that are still buffered when no further write comes in
+        self._timer: Optional[threading.Timer] = None
+
+    @staticmethod
+    def _ends_with_newline(path: str) -> bool:
+        with open(path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    @staticmethod
+    def path_for(config: dict, run_id: str) -> str:
+        runs_dir = config.get('output', {}).get('runs_dir', "data/runs")
+        return os.path.join(runs_dir, run_id, "results.ndjson")
+
+    @classmethod
+    def for_run(cls, config: dict, run_id: str, on_durable=None) -> "NdjsonSink":
+        output_config = config.get('output', {})
+        return cls(
+            cls.path_for(config, run_id),
+            flush_every=output_config.get('flush_every', 20),
+            fsync_interval=output_config.get('fsync_interval', 5.0),
+            on_durable=on_durable
+        )
+
+    def write(self, index: int, result: ScrapedResult):
+        """Append the result for input position ``index``"""
+        # The model's JSON object with the index as its first key
+        line = b'%s%d,%s\n' % (INDEX_PREFIX, index, result.model_dump_json().encode('utf-8')[1:])
+        with self._lock:
+            self._batch.append((index, line, result.success))
+            if result.success:
+                self.successful += 1
+            if (len(self._batch) >= self.flush_every
+                    or time.monotonic() - self._last_sync >= self.fsync_interval):
+                self._flush()
+            if (self._batch or self._unsynced) and self._timer is None:
+                self._timer = threading.Timer(
+                    max(0.0, self._last_sync + self.fsync_interval - time.monotonic()), self._flush_due
+                )
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _flush_due(self):
+        with self._lock:
+            self._timer = None
+            if not self._file.closed:
+                self._flush(sync=True)
+
+    def _flush(self, sync: bool = False):
+        if self._batch:
+            offset = self._file.tell()
+            for index, line, success in self._batch:
+                self._unsynced.append((index, offset, success))
+                offset += len(line)
+            self._file.write(b"".join(line for _, line, _ in self._batch))
+            self.written += len(self._batch)
+            self._batch = []
+            self._file.flush()
+        if sync or time.monotonic() - self._last_sync >= self.fsync_interval:
+            os.fsync(self._file.fileno())
+            self._last_sync = time.monotonic()
+            durable, self._unsynced = self._unsynced, []
+            if durable and self.on_durable:
+                self.on_durable(durable)
+
+    def close(self):
+        """Write and fsync everything still buffered"""
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+            if self._file.closed:
+                return
+            self._flush(sync=True)
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def _lines_at(f, offsets: List[int]):
+    for offset in offsets:
+        f.seek(offset)
+        yield offset, f.readline()
+
+
+def iter_lines(path: str, offsets: Optional[List[int]] = None) -> Iterator[Tuple[int, bytes]]:
+    """
+    Non-empty lines of an NDJSON file with their line number (or byte
+    offset). With ``offsets`` only the lines starting at those offsets are read.
+    """
+    with open(path, 'rb') as f:
+        lines = enumerate(f, 1) if offsets is None else _lines_at(f, offsets)
+        for position, line in lines:
+            line = line.strip()
+            if line:
+                yield position, line
+
+
+def input_order(path: str) -> Optional[List[int]]:
+    """
+    Byte offsets of the latest line for every input index, in input order,
+    read from the index prefix of each line without parsing the JSON. None
+    when a line carries no index (a stream written before lines had one).
+    """
+    latest: Dict[int, int] = {}
+    offset = 0
+    with open(path, 'rb') as f:
+        for line in f:
+            if line.startswith(INDEX_PREFIX):
+                try:
+                    latest[int(line[len(INDEX_PREFIX):line.index(b",")])] = offset
+                except ValueError:
+                    pass
+            elif line.strip():
+                return None
+            offset += len(line)
+    return [latest[index] for index in sorted(latest)]
+
+
+def iter_results(path: str, offsets: Optional[List[int]] = None) -> Iterator[ScrapedResult]:
+    """Stream results back from an NDJSON file, skipping torn lines"""
+    for position, line in iter_lines(path, offsets):
+        try:
+            yield ScrapedResult.model_validate_json(line)
+        except ValueError as e:
+            logging.getLogger(__name__).warning(f"Skipping unreadable line at {position} in {path}: {e}")
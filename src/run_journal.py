@@ -0,0 +1,138 @@
+"""
+Run journal for resumable runs.
+
+A small SQLite database records, per run id and input position, the URL,
+its state (``pending``, ``in_flight``, ``done``, ``failed``) and the byte
+offset of its result line in the run's NDJSON stream. A URL is only marked
+finished once its line has been fsync'd, so after a crash ``--resume``
+re-scrapes exactly the URLs whose results were not durably written.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+PENDING = 'pending'
+IN_FLIGHT = 'in_flight'
+DONE = 'done'
+FAILED = 'failed'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    total INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS urls (
+    run_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    url TEXT NOT NULL,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result_offset INTEGER,
+    updated_at REAL,
+    PRIMARY KEY (run_id, idx)
+);
+CREATE INDEX IF NOT EXISTS urls_state ON urls (run_id, state);
+"""
+
+
+class RunJournal:
+    def __init__(self, path: str = "data/runs/journal.sqlite3"):
+        self.path = path
+        self.logger = logging.getLogger(__name__)
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    @classmethod
+    def from_config(cls, config: dict) -> Optional["RunJournal"]:
+        journal_config = config.get('journal', {})
+        if not journal_config.get('enabled', True):
+            return None
+        return cls(journal_config.get('path', "data/runs/journal.sqlite3"))
+
+    def start_run(self, run_id: str, urls: List[str]):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO runs (run_id, created_at, total) VALUES (?, ?, ?)",
+                (run_id, time.time(), len(urls))
+            )
+            self._conn.executemany(
+                "INSERT INTO urls (run_id, idx, url, state) VALUES (?, ?, ?, ?)",
+                ((run_id, idx, url, PENDING) for idx, url in enumerate(urls))
+            )
+
+    def add_urls(self, run_id: str, urls: List[str]) -> int:
+        """Append the URLs run ``run_id`` doesn't list yet as pending; returns how many were added"""
+        with self._lock, self._conn:
+            known = {url for (url,) in self._conn.execute("SELECT url FROM urls WHERE run_id = ?", (run_id,))}
+            first = self._conn.execute(
+                "SELECT COALESCE(MAX(idx), -1) + 1 FROM urls WHERE run_id = ?", (run_id,)
+            ).fetchone()[0]
+            added = [url for url in dict.fromkeys(urls) if url not in known]
+            self._conn.executemany(
+                "INSERT INTO urls (run_id, idx, url, state) VALUES (?, ?, ?, ?)",
+                ((run_id, first + offset, url, PENDING) for offset, url in enumerate(added))
+            )
+            self._conn.execute("UPDATE runs SET total = total + ? WHERE run_id = ?", (len(added), run_id))
+        return len(added)
+
+    def has_run(self, run_id: str) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        return row is not None
+
+    def unfinished(self, run_id: str) -> List[Tuple[int, str]]:
+        """(index, url) of every URL not durably done, in input order"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT idx, url FROM urls WHERE run_id = ? AND state != ? ORDER BY idx",
+                (run_id, DONE)
+            ).fetchall()
+
+    def mark_in_flight(self, run_id: str, idx: int):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE urls SET state = ?, attempts = attempts + 1, updated_at = ? "
+                "WHERE run_id = ? AND idx = ?",
+                (IN_FLIGHT, time.time(), run_id, idx)
+            )
+
+    def mark_written(self, run_id: str, entries: Iterable[Tuple[int, int, bool]]):
+        """Record durably written results as (index, byte offset, success)"""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE urls SET state = ?, result_offset = ?, updated_at = ? "
+                "WHERE run_id = ? AND idx = ?",
+                ((DONE if success else FAILED, offset, now, run_id, idx)
+                 for idx, offset, success in entries)
+            )
+
+    def result_offsets(self, run_id: str) -> List[int]:
+        """Offsets of the latest result line of every URL, in input order"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT result_offset FROM urls WHERE run_id = ? AND result_offset IS NOT NULL "
+                "ORDER BY idx",
+                (run_id,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def summary(self, run_id: str) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT state, COUNT(*) FROM urls WHERE run_id = ? GROUP BY state", (run_id,)
+            ).fetchall()
+        return dict(rows)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,182 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class DomainLimit:
+    """Concurrency cap and minimum start-to-start interval for one domain"""
+
+    def __init__(self, max_concurrency: int = 1, min_interval: float = 0.0):
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.min_interval = max(0.0, float(min_interval))
+
+
+class DomainState:
+    """Queued items and in-flight count of one domain during a run"""
+
+    def __init__(self, limit: DomainLimit):
+        self.limit = limit
+        self.pending = deque()
+        self.active = 0
+        self.last_start = float('-inf')
+
+    def ready_at(self) -> float:
+        return self.last_start + self.limit.min_interval
+
+
+class DomainScheduler:
+    """
+    Runs jobs on a pool of worker threads while honouring per-domain limits.
+
+    Each worker picks the earliest queued URL whose domain has a free slot and
+    whose minimum interval has elapsed, so URLs for different stores proceed
+    in parallel while each store is still paced on its own. Results are
+    returned in input order.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, DomainLimit]] = None,
+                 default_limit: Optional[DomainLimit] = None,
+                 key_func: Optional[Callable[[str], str]] = None,
+                 hold: Optional[Callable[[str], float]] = None):
+        self.limits = limits or {}
+        self.default_limit = default_limit or DomainLimit()
+        self.key_func = key_func or self._default_key
+        # Seconds an item has to wait before it may start (e.g. an open circuit)
+        self.hold = hold
+        self.logger = logging.getLogger(__name__)
+
+    @classmethod
+    def from_config(cls, config: dict, hold: Optional[Callable[[str], float]] = None) -> "DomainScheduler":
+        scheduler_config = config.get('scheduler', {})
+        default_config = scheduler_config.get('default_limits', {})
+        default_limit = DomainLimit(
+            max_concurrency=default_config.get('max_concurrency', 1),
+            min_interval=default_config.get(
+                'min_interval',
+                config.get('scraper', {}).get('delay_between_requests', 2.0)
+            )
+        )
+        limits = {}
+        for domain, domain_config in (scheduler_config.get('domains') or {}).items():
+            limits[domain] = DomainLimit(
+                max_concurrency=domain_config.get('max_concurrency', default_limit.max_concurrency),
+                min_interval=domain_config.get('min_interval', default_limit.min_interval)
+            )
+        return cls(limits=limits, default_limit=default_limit, hold=hold)
+
+    def _default_key(self, url: str) -> str:
+        from scraper_factory import ScraperFactory
+
+        domain = ScraperFactory._extract_domain(url)
+        for key in self.limits:
+            if key in domain:
+                return key
+        return domain
+
+    def limit_for(self, key: str) -> DomainLimit:
+        return self.limits.get(key, self.default_limit)
+
+    def queues(self, items: List[str]) -> Dict[str, DomainState]:
+        """Per-domain queues of ``(index, item)`` in input order"""
+        domains: Dict[str, DomainState] = {}
+        for index, item in enumerate(items):
+            key = self.key_func(item)
+            if key not in domains:
+                domains[key] = DomainState(self.limit_for(key))
+            domains[key].pending.append((index, item))
+        return domains
+
+    def pick(self, domains: Dict[str, DomainState], now: float) -> Tuple[Optional[DomainState], Optional[float]]:
+        """
+        The domain whose next item may start now (earliest input first), or
+        None and the time the first blocked domain becomes ready, if any.
+        """
+        best = None
+        wake_at = None
+        for state in domains.values():
+            if not state.pending or state.active >= state.limit.max_concurrency:
+                continue
+            ready_at = state.ready_at()
+            if self.hold:
+                ready_at = max(ready_at, now + self.hold(state.pending[0][1]))
+            if ready_at > now:
+                wake_at = ready_at if wake_at is None else min(wake_at, ready_at)
+                continue
+            if best is None or state.pending[0][0] < best.pending[0][0]:
+                best = state
+        return best, wake_at
+
+    def run(self, items: List[str], func: Callable[[str], Any], workers: int = 1,
+            on_result: Optional[Callable[[int, Any], None]] = None,
+            keep_results: bool = True,
+            on_start: Optional[Callable[[int], None]] = None) -> List[Any]:
+        """
+        Apply ``func`` to every item and return the results in input order.
+        With ``keep_results=False`` results are only passed to ``on_result``.
+        ``on_start`` is called with an item's index right before it runs.
+        Both callbacks run on the worker threads, possibly concurrently, so
+        they have to guard any state they share.
+        """
+        results: List[Any] = [None] * len(items)
+        if not items:
+            return results
+
+        domains = self.queues(items)
+        cond = threading.Condition()
+        errors: List[BaseException] = []
+
+        def next_job() -> Optional[Tuple[DomainState, int, str]]:
+            with cond:
+                while True:
+                    if errors or not any(state.pending for state in domains.values()):
+                        return None
+                    now = time.monotonic()
+                    best, wake_at = self.pick(domains, now)
+                    if best is not None:
+                        index, item = best.pending.popleft()
+                        best.active += 1
+                        best.last_start = now
+                        return best, index, item
+                    cond.wait(None if wake_at is None else wake_at - now)
+
+        def worker():
+            while True:
+                job = next_job()
+                if job is None:
+                    return
+                state, index, item = job
+                try:
+                    if on_start:
+                        on_start(index)
+                    result = func(item)
+                    if keep_results:
+                        results[index] = result
+                    # Outside ``cond`` so slow sinks don't stall the other workers
+                    if on_result:
+                        on_result(index, result)
+                except BaseException as e:
+                    with cond:
+                        errors.append(e)
+                finally:
+                    with cond:
+                        state.active -= 1
+                        cond.notify_all()
+
+        workers = max(1, min(workers, len(items)))
+        if workers == 1:
+            worker()
+        else:
+            threads = [
+                threading.Thread(target=worker, name=f"scrape-worker-{i + 1}", daemon=True)
+                for i in range(workers)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        if errors:
+            raise errors[0]
+        return results
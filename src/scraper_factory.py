@@ -1,42 +1,42 @@
-from amazon_scraper import AmazonScraper
-# from aliexpress_scraper import AliExpressScraper
-# from ebay_scraper import EbayScraper
-# from etsy_scraper import EtsyScraper
-# from jumia_scraper import JumiaScraper
-# from kilimall_scraper import KilimallScraper
-# from jiji_scraper import JijiScraper
-from base_scraper import BaseScraper
+from platform_registry import get_registry
 from typing import Optional
 import re
 
 class ScraperFactory:
     @staticmethod
-    def create_scraper(url: str, headless: bool = True) -> Optional[BaseScraper]:
+    def create_scraper(url: str, headless: bool = True,
+                       behavior: str = "stealth") -> Optional[object]:
         """
-        Factory method to create appropriate scraper based on URL
+        Factory method to create the platform's ``BaseScraper`` based on URL;
+        the platform's module (and Selenium) is imported on first use
         """
-        domain = ScraperFactory._extract_domain(url)
-        
-        scraper_map = {
-            'amazon': AmazonScraper,
-            # 'aliexpress': AliExpressScraper,
-            # 'ebay': EbayScraper,
-            # 'etsy': EtsyScraper,
-            # 'jumia': JumiaScraper,
-            # 'kilimall': KilimallScraper,
-            # 'jiji': JijiScraper
-        }
-        
-        for platform, scraper_class in scraper_map.items():
-            if platform in domain:
-                return scraper_class(headless=headless)
-        
+        scraper_class = get_registry().scraper_for(url)
+        if scraper_class:
+            return scraper_class(headless=headless, behavior=behavior)
+
+        return None
+
+    @staticmethod
+    def create_async_scraper(url: str, page, behavior: str = "stealth") -> Optional[object]:
+        """
+        Factory method for the Playwright backend's ``AsyncBaseScraper``;
+        ``page`` is the isolated page the scraper should drive
+        """
+        scraper_class = get_registry().scraper_for(url, asynchronous=True)
+        if scraper_class:
+            return scraper_class(page, behavior=behavior)
+
         return None
-    
+
+    @staticmethod
+    def platform_for(url: str, platforms: dict) -> Optional[str]:
+        """Name of the configured platform a URL belongs to"""
+        platform = get_registry().platform_of(url)
+        return platform if platform in (platforms or {}) else None
+
     @staticmethod
     def _extract_domain(url: str) -> str:
         """Extract domain from URL"""
-        import re
         domain_pattern = r'https?://(?:www\.)?([^/]+)'
         match = re.search(domain_pattern, url)
-        return match.group(1).lower() if match else ''
\ No newline at end of file
+        return match.group(1).lower() if match else ''
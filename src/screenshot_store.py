@@ -0,0 +1,239 @@
+"""
+Background screenshot writer with perceptual dedupe.
+
+Scrapers hand over the raw PNG bytes from the browser and get the final
+path back immediately; decoding, re-encoding to WebP/JPEG and disk writes
+happen on a writer thread (Pillow releases the GIL while encoding). Images
+are stored once under ``objects/<perceptual hash>.<ext>``; a capture whose
+difference hash is within ``max_distance`` bits of a stored one is not
+written again. Each capture's path is a small symlink to its object.
+Near-duplicate lookups go through a band index instead of comparing the
+hash with every stored one.
+"""
+
+import io
+import logging
+import os
+import queue
+import shutil
+import threading
+import uuid
+from typing import Dict, List, Optional
+
+from PIL import Image
+
+PIL_FORMATS = {'webp': 'WEBP', 'jpeg': 'JPEG', 'jpg': 'JPEG', 'png': 'PNG'}
+
+
+def perceptual_hash(image: Image.Image, hash_size: int = 16) -> int:
+    """Difference hash: one bit per horizontally adjacent pair of a downscaled grayscale image"""
+    small = image.convert('L').resize((hash_size + 1, hash_size), Image.LANCZOS)
+    pixels = list(small.getdata())
+    bits = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            bits = (bits << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return bits
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+class HashIndex:
+    """
+    Stored hashes bucketed by band (multi-index hashing). The hash is cut
+    into ``max_distance + 1`` bands; two hashes at most ``max_distance``
+    bits apart are identical in at least one of them, so a lookup only
+    compares the hashes sharing a band with the new one.
+    """
+
+    def __init__(self, bits: int, max_distance: int):
+        self.bits = bits
+        self.max_distance = max_distance
+        width = max(1, bits // (max_distance + 1))
+        self._bands = [(shift, (1 << min(width, bits - shift)) - 1) for shift in range(0, bits, width)]
+        self._buckets: List[Dict[int, List[int]]] = [{} for _ in self._bands]
+        self._paths: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def add(self, digest: int, path: str):
+        if digest not in self._paths:
+            for (shift, mask), buckets in zip(self._bands, self._buckets):
+                buckets.setdefault((digest >> shift) & mask, []).append(digest)
+        self._paths[digest] = path
+
+    def find(self, digest: int) -> Optional[str]:
+        """Path of a stored hash within ``max_distance`` bits of ``digest``"""
+        if digest in self._paths:
+            return self._paths[digest]
+        if self.max_distance >= self.bits:
+            return next(iter(self._paths.values()), None)
+        for (shift, mask), buckets in zip(self._bands, self._buckets):
+            for known in buckets.get((digest >> shift) & mask, ()):
+                if hamming(digest, known) <= self.max_distance:
+                    return self._paths[known]
+        return None
+
+
+class ScreenshotStore:
+    def __init__(self, root: str = "data/screenshots", image_format: str = "webp",
+                 quality: int = 60, hash_size: int = 16, max_distance: int = 3,
+                 queue_size: int = 32):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.image_format = image_format.lower()
+        if self.image_format not in PIL_FORMATS:
+            raise ValueError(f"Unsupported screenshot format: {image_format}")
+        self.extension = 'jpg' if self.image_format == 'jpeg' else self.image_format
+        self.quality = quality
+        self.hash_size = hash_size
+        self.max_distance = max_distance
+        self.logger = logging.getLogger(__name__)
+
+        self.captures = 0
+        self.duplicates = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self._hashes = self._load_index()
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, queue_size))
+        self._thread = threading.Thread(target=self._work, name="screenshot-writer", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def from_config(cls, config: dict) -> Optional["ScreenshotStore"]:
+        screenshot_config = config.get('screenshots', {})
+        if not screenshot_config.get('enabled', True):
+            return None
+        return cls(
+            root=config.get('output', {}).get('screenshots_dir', "data/screenshots"),
+            image_format=screenshot_config.get('format', "webp"),
+            quality=screenshot_config.get('quality', 60),
+            hash_size=screenshot_config.get('hash_size', 16),
+            max_distance=screenshot_config.get('max_distance', 3),
+            queue_size=screenshot_config.get('queue_size', 32)
+        )
+
+    def _load_index(self) -> HashIndex:
+        """Hashes of the objects already stored by earlier runs"""
+        width = self.hash_size * self.hash_size // 4
+        index = HashIndex(self.hash_size * self.hash_size, self.max_distance)
+        for name in os.listdir(self.objects_dir):
+            stem, ext = os.path.splitext(name)
+            if ext == f".{self.extension}" and len(stem) == width:
+                try:
+                    index.add(int(stem, 16), os.path.join(self.objects_dir, name))
+                except ValueError:
+                    continue
+        return index
+
+    def submit(self, png: bytes, name: str) -> str:
+        """Queue a capture; returns the path it will be available at"""
+        path = os.path.join(self.root, f"{name}_{uuid.uuid4().hex[:8]}.{self.extension}")
+        self._queue.put((png, path))
+        return path
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self._write(*item)
+            except Exception as e:
+                self.logger.error(f"Could not write screenshot {item[1]}: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _write(self, png: bytes, path: str):
+        image = Image.open(io.BytesIO(png))
+        image.load()
+        digest = perceptual_hash(image, self.hash_size)
+        target = self._match(digest)
+        if target:
+            self.duplicates += 1
+        else:
+            target = self._save(image, digest)
+        self.captures += 1
+        self.bytes_in += len(png)
+        self._link(target, path)
+
+    def _match(self, digest: int) -> Optional[str]:
+        return self._hashes.find(digest)
+
+    def _save(self, image: Image.Image, digest: int) -> str:
+        width = self.hash_size * self.hash_size // 4
+        path = os.path.join(self.objects_dir, f"{digest:0{width}x}.{self.extension}")
+        options = {'optimize': True} if self.image_format == 'png' else {'quality': self.quality}
+        if image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        temp_path = f"{path}.tmp"
+        image.save(temp_path, format=PIL_FORMATS[self.image_format], **options)
+        os.replace(temp_path, path)
+        self.bytes_out += os.path.getsize(path)
+        self._hashes.add(digest, path)
+        return path
+
+    @staticmethod
+    def _link(target: str, path: str):
+        try:
+            os.symlink(os.path.relpath(target, os.path.dirname(path)), path)
+        except OSError:
+            # No symlink support (e.g. Windows without developer mode)
+            try:
+                os.link(target, path)
+            except OSError:
+                shutil.copyfile(target, path)
+
+    def flush(self):
+        """Block until every queued capture is on disk"""
+        self._queue.join()
+
+    def report(self) -> str:
+        ratio = self.bytes_out / self.bytes_in if self.bytes_in else 0.0
+        return (f"Screenshots: {self.captures} captured, {self.duplicates} deduplicated, "
+                f"{self.bytes_out / 1024:.0f} KB written for {self.bytes_in / 1024:.0f} KB of PNG ({ratio:.0%})")
+
+    def close(self):
+        if not self._thread.is_alive():
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self.logger.info(self.report())
+
+
+_shared_store: Optional[ScreenshotStore] = None
+_shared_config: Optional[dict] = None
+_shared_lock = threading.Lock()
+
+
+def configure_screenshots(config: dict):
+    """Install the screenshot settings; the writer starts on the first capture"""
+    global _shared_store, _shared_config
+    with _shared_lock:
+        _shared_store = None
+        _shared_config = config
+
+
+def get_screenshot_store() -> Optional[ScreenshotStore]:
+    """The process-wide screenshot writer, started on first use"""
+    global _shared_store, _shared_config
+    with _shared_lock:
+        if _shared_config is not None:
+            _shared_store = ScreenshotStore.from_config(_shared_config)
+            _shared_config = None
+        return _shared_store
+
+
+def close_screenshots():
+    """Finish pending captures, if the writer was ever started"""
+    global _shared_store, _shared_config
+    with _shared_lock:
+        store, _shared_store, _shared_config = _shared_store, None, None
+    if store:
+        store.close()
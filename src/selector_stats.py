@@ -0,0 +1,137 @@
+"""
+Per-platform, per-field selector hit statistics.
+
+Every extraction records which fallback selector matched. Selectors are then
+tried most-successful-first, and selectors that have missed ``stale_after``
+times in a row are moved off the hot path into a fallback tier that is only
+evaluated when every hot selector misses. Counts persist in a small JSON
+file between runs.
+"""
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class SelectorStats:
+    def __init__(self, path: str = "data/selector_stats.json", stale_after: int = 25,
+                 autosave_every: int = 50):
+        self.path = path
+        self.stale_after = stale_after
+        self.autosave_every = autosave_every
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._unsaved = 0
+        self._stats: Dict[str, Dict[str, Dict[str, Dict[str, int]]]] = self._load()
+
+    @classmethod
+    def from_config(cls, config: dict) -> Optional["SelectorStats"]:
+        stats_config = config.get('selector_stats', {})
+        if not stats_config.get('enabled', True):
+            return None
+        return cls(
+            path=stats_config.get('path', "data/selector_stats.json"),
+            stale_after=stats_config.get('stale_after', 25),
+            autosave_every=stats_config.get('autosave_every', 50)
+        )
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable selector stats {self.path}: {e}")
+            return {}
+
+    def save(self):
+        with self._lock:
+            snapshot = json.dumps(self._stats, indent=1, sort_keys=True)
+            self._unsaved = 0
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(snapshot)
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def _score(entry: Dict[str, int]) -> float:
+        # Laplace-smoothed hit rate so unseen selectors rank in the middle
+        return (entry.get('hits', 0) + 1) / (entry.get('hits', 0) + entry.get('misses', 0) + 2)
+
+    def order(self, platform: str, field: str, selectors: List[str]) -> Tuple[List[str], List[str]]:
+        """Split ``selectors`` into (hot, stale), each most-successful-first"""
+        with self._lock:
+            field_stats = self._stats.get(platform, {}).get(field, {})
+            entries = [(selector, dict(field_stats.get(selector, {}))) for selector in selectors]
+
+        # sorted() is stable, so ties keep selectors.yaml order
+        ranked = sorted(entries, key=lambda item: -self._score(item[1]))
+        hot = [s for s, e in ranked if e.get('streak', 0) < self.stale_after]
+        stale = [s for s, e in ranked if e.get('streak', 0) >= self.stale_after]
+        if not hot:
+            return [s for s, _ in ranked], []
+        return hot, stale
+
+    def record(self, platform: str, plan: Dict[str, Dict[str, Any]], fields: Dict[str, Any]):
+        """Update counts from one extraction of ``plan``"""
+        if not platform:
+            return
+        with self._lock:
+            platform_stats = self._stats.setdefault(platform, {})
+            for field, spec in plan.items():
+                hits, evaluated = self._outcome(spec, fields.get(field))
+                field_stats = platform_stats.setdefault(field, {})
+                for selector in evaluated:
+                    entry = field_stats.setdefault(selector, {'hits': 0, 'misses': 0, 'streak': 0})
+                    if selector in hits:
+                        entry['hits'] += 1
+                        entry['streak'] = 0
+                    else:
+                        entry['misses'] += 1
+                        entry['streak'] += 1
+            self._unsaved += 1
+            should_save = self.autosave_every and self._unsaved >= self.autosave_every
+
+        if should_save:
+            try:
+                self.save()
+            except OSError as e:
+                self.logger.warning(f"Could not save selector stats: {e}")
+
+    @staticmethod
+    def _outcome(spec: Dict[str, Any], value) -> Tuple[set, List[str]]:
+        """Selectors that matched, and every selector the extractor evaluated"""
+        hot = list(spec.get('selectors', []))
+        fallback = list(spec.get('fallback', []))
+
+        if spec.get('multiple'):
+            hits = {item.get('selector') for item in value or []}
+            evaluated = hot + (fallback if not hits & set(hot) else [])
+            return hits, evaluated
+
+        if not value:
+            return set(), hot + fallback
+        winner = value.get('selector')
+        sequence = hot + fallback
+        if winner not in sequence:
+            return set(), []
+        return {winner}, sequence[:sequence.index(winner) + 1]
+
+
+_shared_stats: Optional[SelectorStats] = None
+
+
+def configure_selector_stats(config: dict) -> Optional[SelectorStats]:
+    """Install the process-wide stats instance used by every scraper"""
+    global _shared_stats
+    _shared_stats = SelectorStats.from_config(config)
+    return _shared_stats
+
+
+def get_selector_stats() -> Optional[SelectorStats]:
+    return _shared_stats
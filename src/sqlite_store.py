@@ -0,0 +1,23 @@
+"""
+Helpers shared by the SQLite-backed stores (work queue, price history).
+"""
+
+import sqlite3
+from contextlib import contextmanager
+from typing import Iterator
+
+
+@contextmanager
+def immediate_transaction(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    """
+    Write transaction on an autocommit connection (``isolation_level=None``).
+    BEGIN IMMEDIATE takes the write lock up front, so concurrent writers wait
+    on the busy timeout instead of failing when they upgrade a read.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
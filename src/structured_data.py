@@ -0,0 +1,202 @@
+"""
+Structured-data fast path.
+
+Product pages usually embed schema.org ``Product``/``Offer`` blocks as
+``application/ld+json`` or inside a hydration-state blob (``__NEXT_DATA__``,
+``window.__INITIAL_STATE__`` ...). One script read plus one JSON parse gives
+name, price, currency, SKU, brand, availability, rating and images; the
+selector plan is then only evaluated for the fields still missing.
+"""
+
+import json
+from typing import Any, Dict, Iterable, List, Optional
+
+from product_schema import StockStatus
+
+# Hydration-state globals checked in the browser; lxml only sees <script> tags
+STATE_GLOBALS = ['__INITIAL_STATE__', '__PRELOADED_STATE__', '__STORE__', '__NUXT__']
+
+MAX_BLOB_CHARS = 2_000_000
+
+STRUCTURED_FUNCTION = r"""
+(args) => {
+    const blobs = [];
+    const push = (text) => { if (text && text.length <= args.maxChars) blobs.push(text); };
+    for (const el of document.querySelectorAll('script[type="application/ld+json"], script#__NEXT_DATA__')) {
+        push(el.textContent);
+    }
+    for (const name of args.globals) {
+        try { if (window[name]) push(JSON.stringify(window[name])); } catch (e) {}
+    }
+    return blobs;
+}
+"""
+
+# ProductData field -> selectors.yaml fields it makes redundant
+SELECTOR_FIELDS = {
+    'name': ['product_name'],
+    'price': ['price'],
+    'sku': ['sku'],
+    'brand': ['brand'],
+    'category': ['category'],
+    'image_urls': ['image'],
+    'stock_status': ['stock_status'],
+    'rating': ['rating'],
+    'reviews': ['reviews'],
+    'seller': ['seller'],
+}
+
+AVAILABILITY = {
+    'instock': StockStatus.IN_STOCK,
+    'onlineonly': StockStatus.IN_STOCK,
+    'instoreonly': StockStatus.IN_STOCK,
+    'limitedavailability': StockStatus.LIMITED_STOCK,
+    'preorder': StockStatus.PRE_ORDER,
+    'presale': StockStatus.PRE_ORDER,
+    'outofstock': StockStatus.OUT_OF_STOCK,
+    'soldout': StockStatus.OUT_OF_STOCK,
+    'discontinued': StockStatus.OUT_OF_STOCK,
+}
+
+CURRENCY_SYMBOLS = {'USD': '$', 'EUR': '€', 'GBP': '£', 'JPY': '¥', 'NGN': '₦'}
+
+
+def collect_with_driver(driver) -> List[str]:
+    """Raw JSON blobs from the live page, in one ``execute_script`` call"""
+    args = {'globals': STATE_GLOBALS, 'maxChars': MAX_BLOB_CHARS}
+    return driver.execute_script(f"return ({STRUCTURED_FUNCTION})(arguments[0]);", args) or []
+
+
+async def collect_with_page(page) -> List[str]:
+    args = {'globals': STATE_GLOBALS, 'maxChars': MAX_BLOB_CHARS}
+    return await page.evaluate(STRUCTURED_FUNCTION, args) or []
+
+
+def collect_from_tree(tree) -> List[str]:
+    blobs = []
+    for element in tree.xpath('//script[@type="application/ld+json" or @id="__NEXT_DATA__"]'):
+        text = element.text_content()
+        if text and len(text) <= MAX_BLOB_CHARS:
+            blobs.append(text)
+    return blobs
+
+
+def _is_product(node: Dict[str, Any]) -> bool:
+    types = node.get('@type')
+    if isinstance(types, str):
+        types = [types]
+    return any(str(t).split('/')[-1] in ('Product', 'ProductGroup') for t in types or [])
+
+
+def _walk(value: Any, depth: int = 0) -> Iterable[Dict[str, Any]]:
+    """Every dict in a JSON document, depth limited to keep huge states cheap"""
+    if depth > 12:
+        return
+    if isinstance(value, dict):
+        yield value
+        for child in value.values():
+            if isinstance(child, (dict, list)):
+                yield from _walk(child, depth + 1)
+    elif isinstance(value, list):
+        for child in value:
+            if isinstance(child, (dict, list)):
+                yield from _walk(child, depth + 1)
+
+
+def find_product_node(blobs: List[str]) -> Optional[Dict[str, Any]]:
+    """First schema.org Product node in any of the blobs"""
+    for blob in blobs:
+        try:
+            document = json.loads(blob)
+        except (TypeError, ValueError):
+            continue
+        for node in _walk(document):
+            if _is_product(node):
+                return node
+    return None
+
+
+def _text(value: Any) -> Optional[str]:
+    if isinstance(value, dict):
+        value = value.get('name') or value.get('@id')
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if value is None:
+        return None
+    text = str(value).strip()
+    return text or None
+
+
+def _offer(node: Dict[str, Any]) -> Dict[str, Any]:
+    offers = node.get('offers')
+    if isinstance(offers, list):
+        offers = offers[0] if offers else None
+    if isinstance(offers, dict) and isinstance(offers.get('offers'), list) and offers['offers']:
+        # AggregateOffer wrapping individual offers
+        return {**offers['offers'][0], **{k: v for k, v in offers.items() if k != 'offers'}}
+    return offers if isinstance(offers, dict) else {}
+
+
+def _images(value: Any) -> List[str]:
+    if not isinstance(value, list):
+        value = [value]
+    images = []
+    for item in value:
+        if isinstance(item, dict):
+            item = item.get('url') or item.get('contentUrl')
+        if isinstance(item, str) and item.startswith('http') and item not in images:
+            images.append(item)
+    return images
+
+
+def format_price(amount: Any, currency: Optional[str]) -> Optional[str]:
+    if amount in (None, ''):
+        return None
+    amount = str(amount).strip()
+    if not currency:
+        return amount
+    symbol = CURRENCY_SYMBOLS.get(currency.upper())
+    return f"{symbol}{amount}" if symbol else f"{currency.upper()} {amount}"
+
+
+def parse_structured(blobs: List[str]) -> Dict[str, Any]:
+    """ProductData fields (plus ``currency``) found in the page's structured data"""
+    node = find_product_node(blobs)
+    if not node:
+        return {}
+
+    offer = _offer(node)
+    currency = _text(offer.get('priceCurrency'))
+    amount = offer.get('price', offer.get('lowPrice'))
+    if amount is None and isinstance(offer.get('priceSpecification'), dict):
+        amount = offer['priceSpecification'].get('price')
+        currency = currency or _text(offer['priceSpecification'].get('priceCurrency'))
+
+    availability = _text(offer.get('availability'))
+    rating = node.get('aggregateRating') if isinstance(node.get('aggregateRating'), dict) else {}
+    reviews = rating.get('reviewCount', rating.get('ratingCount'))
+
+    fields = {
+        'name': _text(node.get('name')),
+        'price': format_price(amount, currency),
+        'currency': currency.upper() if currency else None,
+        'sku': _text(node.get('sku') or node.get('mpn') or node.get('productID')),
+        'brand': _text(node.get('brand')),
+        'category': _text(node.get('category')),
+        'image_urls': _images(node.get('image')),
+        'stock_status': AVAILABILITY.get(availability.split('/')[-1].lower()) if availability else None,
+        'rating': _text(rating.get('ratingValue')),
+        'reviews': _text(reviews),
+        'seller': _text(offer.get('seller')),
+    }
+    return {key: value for key, value in fields.items() if value}
+
+
+def remaining_plan(plan: Dict[str, Dict[str, Any]], structured: Dict[str, Any],
+                   aliases: Optional[Dict[str, List[str]]] = None) -> Dict[str, Dict[str, Any]]:
+    """The part of ``plan`` still needed after the structured data was applied"""
+    covered = set()
+    for field in structured:
+        covered.update(SELECTOR_FIELDS.get(field, []))
+        covered.update((aliases or {}).get(field, []))
+    return {field: spec for field, spec in plan.items() if field not in covered}
@@ -4,6 +4,9 @@ from typing import Callable, Any
 from retrying import retry
 from functools import wraps
 import random
+import re
+from typing import Optional
+from product_schema import StockStatus
 
 def setup_logging():
     """Setup basic logging configuration"""
@@ -61,4 +64,50 @@ def read_urls_from_file(file_path: str) -> list:
                     urls.append(url)
     except FileNotFoundError:
         logging.warning(f"File {file_path} not found")
-    return urls
\ No newline at end of file
+    return urls
+
+def parse_stock_status(text: Optional[str]) -> StockStatus:
+    """Map a store's availability text to a StockStatus"""
+    text = (text or '').lower()
+    if 'in stock' in text:
+        return StockStatus.IN_STOCK
+    elif 'out of stock' in text:
+        return StockStatus.OUT_OF_STOCK
+    elif 'limited' in text:
+        return StockStatus.LIMITED_STOCK
+    return StockStatus.OUT_OF_STOCK
+
+_PRICE_NOISE = re.compile(r'[^\d.,$€£¥₦]')
+
+def clean_price(text: Optional[str]) -> Optional[str]:
+    """Price text without anything but digits, separators and currency symbols"""
+    if text:
+        return _PRICE_NOISE.sub('', text)
+    return None
+
+# Scalar counterparts of normalize.RATING_PATTERN / REVIEWS_PATTERN for the scrape
+# path, which handles one product at a time; exports re-parse in batch with normalize
+_RATING = re.compile(r'(\d+(?:[.,]\d+)?)(?:\s*(?:out of|of|/|von|sur|de|su)\s*(\d+(?:[.,]\d+)?))?')
+_REVIEWS = re.compile(r"(\d(?:[\d.,' \u00a0\u202f\u2009]*\d)?)\s*([kKmM])?(?![^\W\d_])")
+_NUMBER_SPACES = re.compile(r"[ \u00a0\u202f\u2009']")
+
+def parse_rating(text: Optional[str], scale: float = 5.0) -> Optional[str]:
+    """Rating on a 0-``scale`` scale: "4.5 out of 5", "4,5 von 5", "9/10" -> "4.5" """
+    match = _RATING.search(text or '')
+    if not match:
+        return None
+    value = float(match.group(1).replace(',', '.'))
+    of = float(match.group(2).replace(',', '.')) if match.group(2) else 0.0
+    return str(round(value * scale / of if of > 0 else value, 2))
+
+def parse_reviews(text: Optional[str]) -> Optional[str]:
+    """Review count: "1,234 ratings" -> "1234", "1.2K" -> "1200" """
+    match = _REVIEWS.search(text or '')
+    if not match:
+        return None
+    number = _NUMBER_SPACES.sub('', match.group(1))
+    suffix = (match.group(2) or '').lower()
+    multiplier = {'k': 1e3, 'm': 1e6}.get(suffix, 1.0)
+    if multiplier > 1 and number.count(',') + number.count('.') <= 1:
+        return str(int(round(float(number.replace(',', '.')) * multiplier)))
+    return str(int(number.replace(',', '').replace('.', '')))
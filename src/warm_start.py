@@ -0,0 +1,172 @@
+"""
+Process-wide warm-start state.
+
+Cold starts were dominated by work every scraper repeated: building a
+``fake_useragent.UserAgent`` database, re-reading ``selectors.yaml`` and
+letting undetected-chromedriver download and re-patch chromedriver for every
+driver. Here the UA database and selector config are loaded once and shared,
+and the patched chromedriver binary is cached on disk and handed to every
+``Chrome()`` as a custom executable (which uc only checks, never re-patches).
+Drivers can optionally start from a copy of a pre-seeded profile directory.
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import weakref
+from typing import Any, Dict, Optional
+
+import yaml
+
+_lock = threading.Lock()
+_user_agent = None
+_selectors: Dict[str, Dict[str, Any]] = {}
+
+
+def shared_user_agent():
+    """The process-wide ``fake_useragent.UserAgent`` instance"""
+    global _user_agent
+    with _lock:
+        if _user_agent is None:
+            from fake_useragent import UserAgent
+            _user_agent = UserAgent()
+        return _user_agent
+
+
+def shared_selectors(path: str = 'config/selectors.yaml') -> Dict[str, Any]:
+    """Parsed selector config, read once per path; treat it as read-only"""
+    with _lock:
+        if path not in _selectors:
+            try:
+                with open(path, 'r') as f:
+                    _selectors[path] = yaml.safe_load(f) or {}
+            except FileNotFoundError:
+                logging.getLogger(__name__).warning("Selectors config file not found")
+                _selectors[path] = {}
+        return _selectors[path]
+
+
+class WarmStart:
+    """Cached chromedriver binary and optional profile template for new drivers"""
+
+    def __init__(self, driver_cache_dir: Optional[str] = "data/cache/chromedriver",
+                 profile_template: Optional[str] = None):
+        self.driver_cache_dir = driver_cache_dir
+        self.profile_template = profile_template
+        self.logger = logging.getLogger(__name__)
+        self._driver_path: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: dict) -> "WarmStart":
+        warm_config = config.get('warm_start', {})
+        if not warm_config.get('enabled', True):
+            return cls(driver_cache_dir=None)
+        return cls(
+            driver_cache_dir=warm_config.get('driver_cache_dir', "data/cache/chromedriver"),
+            profile_template=warm_config.get('profile_template')
+        )
+
+    @property
+    def cached_binary(self) -> Optional[str]:
+        if not self.driver_cache_dir:
+            return None
+        name = "chromedriver.exe" if os.name == 'nt' else "chromedriver"
+        return os.path.abspath(os.path.join(self.driver_cache_dir, name))
+
+    def driver_path(self) -> Optional[str]:
+        """
+        Path of a patched chromedriver, patching at most once per process.
+        None means caching is disabled or failed and uc should patch itself.
+        """
+        target = self.cached_binary
+        if not target:
+            return None
+        with self._lock:
+            if self._driver_path:
+                return self._driver_path
+            try:
+                from undetected_chromedriver.patcher import Patcher
+
+                if not (os.path.exists(target) and Patcher(executable_path=target).is_binary_patched(target)):
+                    patcher = Patcher()
+                    patcher.auto()
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    tmp_path = f"{target}.tmp"
+                    shutil.copy2(patcher.executable_path, tmp_path)
+                    os.replace(tmp_path, target)
+                    self.logger.info(f"Cached patched chromedriver at {target}")
+                self._driver_path = target
+            except Exception as e:
+                self.logger.warning(f"Could not cache patched chromedriver: {e}")
+                return None
+            return self._driver_path
+
+    def invalidate_driver(self):
+        """Drop the cached binary, e.g. after Chrome updated past its version"""
+        with self._lock:
+            self._driver_path = None
+            target = self.cached_binary
+            if target and os.path.exists(target):
+                try:
+                    os.remove(target)
+                except OSError as e:
+                    self.logger.warning(f"Could not remove cached chromedriver: {e}")
+
+    def profile_dir(self) -> Optional[str]:
+        """A private copy of the profile template, or None to use a fresh profile"""
+        if not self.profile_template:
+            return None
+        if not os.path.isdir(self.profile_template):
+            self.logger.warning(f"Profile template {self.profile_template} not found")
+            return None
+        path = tempfile.mkdtemp(prefix="scraper-profile-")
+        shutil.copytree(self.profile_template, path, dirs_exist_ok=True,
+                        ignore=shutil.ignore_patterns('Singleton*', '*.lock', 'lockfile'))
+        return path
+
+    def chrome_kwargs(self) -> Dict[str, Any]:
+        """Extra ``undetected_chromedriver.Chrome`` arguments for a new driver"""
+        kwargs: Dict[str, Any] = {}
+        driver_path = self.driver_path()
+        if driver_path:
+            kwargs['driver_executable_path'] = driver_path
+        profile_dir = self.profile_dir()
+        if profile_dir:
+            kwargs['user_data_dir'] = profile_dir
+        return kwargs
+
+    @staticmethod
+    def discard(kwargs: Dict[str, Any]):
+        """Remove the copied profile of a driver that failed to start"""
+        if kwargs.get('user_data_dir'):
+            shutil.rmtree(kwargs['user_data_dir'], ignore_errors=True)
+
+    @staticmethod
+    def cleanup_with(driver, kwargs: Dict[str, Any]):
+        """Remove a copied profile directory once ``driver`` is gone"""
+        profile_dir = kwargs.get('user_data_dir')
+        if profile_dir:
+            weakref.finalize(driver, shutil.rmtree, profile_dir, True)
+
+
+_warm_start: Optional[WarmStart] = None
+_warm_start_config: dict = {'warm_start': {'enabled': False}}
+
+
+def configure_warm_start(config: dict):
+    """Install the process-wide warm-start settings; the first driver builds from them"""
+    global _warm_start, _warm_start_config
+    with _lock:
+        _warm_start = None
+        _warm_start_config = config
+
+
+def get_warm_start() -> WarmStart:
+    global _warm_start
+    with _lock:
+        if _warm_start is None:
+            _warm_start = WarmStart.from_config(_warm_start_config)
+        return _warm_start
@@ -0,0 +1,261 @@
+"""
+Work queue for multi-process and multi-node scraping.
+
+A producer loads URLs into a named batch (``main.py --enqueue``) and any
+number of worker processes (``main.py --worker``) lease jobs from it. A
+lease hides the job from other workers for ``visibility_timeout`` seconds;
+workers heartbeat to extend it while scraping and write the result back
+when done. Leases that expire (crashed or stuck worker) are put back in the
+queue until ``max_attempts`` is reached.
+
+``WorkQueue`` is the interface; ``SqliteWorkQueue`` implements it for a
+single node, where SQLite's file locking coordinates the processes.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from canonical import canonical_url, product_key
+from product_schema import ScrapedResult
+from sqlite_store import immediate_transaction
+
+QUEUED = 'queued'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    batch TEXT NOT NULL,
+    product_key TEXT NOT NULL,
+    url TEXT NOT NULL,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_expires REAL,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL,
+    UNIQUE (batch, product_key)
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, id);
+"""
+
+
+class Job:
+    """One leased URL"""
+
+    def __init__(self, job_id: int, batch: str, url: str, attempts: int):
+        self.id = job_id
+        self.batch = batch
+        self.url = url
+        self.attempts = attempts
+
+
+class WorkQueue(ABC):
+    """Operations a queue backend must provide"""
+
+    @abstractmethod
+    def enqueue(self, batch: str, urls: List[str], platform_of=None) -> int:
+        """Add URLs to ``batch`` once per product; returns how many were new"""
+
+    @abstractmethod
+    def lease(self, worker_id: str, limit: int = 1) -> List[Job]:
+        """Take up to ``limit`` queued jobs, oldest first"""
+
+    @abstractmethod
+    def heartbeat(self, job: Job, worker_id: str) -> bool:
+        """Extend the lease; False if the worker no longer holds it"""
+
+    @abstractmethod
+    def complete(self, job: Job, worker_id: str, result: ScrapedResult) -> bool:
+        """Store a successful result; False if another worker finished the job"""
+
+    @abstractmethod
+    def fail(self, job: Job, worker_id: str, result: ScrapedResult) -> bool:
+        """Record a failed attempt; the job is queued again until ``max_attempts``"""
+
+    @abstractmethod
+    def requeue_expired(self) -> int:
+        """Return jobs whose lease expired to the queue; returns how many"""
+
+    @abstractmethod
+    def counts(self, batch: Optional[str] = None) -> Dict[str, int]:
+        """Number of jobs per state"""
+
+    @abstractmethod
+    def results(self, batch: str) -> Iterator[ScrapedResult]:
+        """Stored results of a batch in enqueue order"""
+
+    def close(self):
+        pass
+
+
+class SqliteWorkQueue(WorkQueue):
+    def __init__(self, path: str = "data/queue/queue.sqlite3", visibility_timeout: float = 300,
+                 max_attempts: int = 3):
+        self.path = path
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max(1, max_attempts)
+        self.logger = logging.getLogger(__name__)
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Autocommit; transactions are opened explicitly with BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def enqueue(self, batch: str, urls: List[str], platform_of=None) -> int:
+        now = time.time()
+        rows = []
+        for url in urls:
+            platform = platform_of(url) if platform_of else None
+            rows.append((batch, product_key(url, platform), canonical_url(url, platform), QUEUED, now))
+        with self._lock, immediate_transaction(self._conn) as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO jobs (batch, product_key, url, state, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            return conn.total_changes - before
+
+    def _requeue_expired(self, conn, now: float) -> int:
+        conn.execute(
+            "UPDATE jobs SET state = ?, worker = NULL, lease_expires = NULL, "
+            "error = 'Lease expired after the last attempt', updated_at = ? "
+            "WHERE state = ? AND lease_expires < ? AND attempts >= ?",
+            (FAILED, now, LEASED, now, self.max_attempts)
+        )
+        return conn.execute(
+            "UPDATE jobs SET state = ?, worker = NULL, lease_expires = NULL, updated_at = ? "
+            "WHERE state = ? AND lease_expires < ?",
+            (QUEUED, now, LEASED, now)
+        ).rowcount
+
+    def requeue_expired(self) -> int:
+        with self._lock, immediate_transaction(self._conn) as conn:
+            return self._requeue_expired(conn, time.time())
+
+    def lease(self, worker_id: str, limit: int = 1) -> List[Job]:
+        now = time.time()
+        with self._lock, immediate_transaction(self._conn) as conn:
+            requeued = self._requeue_expired(conn, now)
+            if requeued:
+                self.logger.info(f"Re-queued {requeued} jobs with expired leases")
+            rows = conn.execute(
+                "SELECT id, batch, url, attempts FROM jobs WHERE state = ? ORDER BY id LIMIT ?",
+                (QUEUED, max(1, limit))
+            ).fetchall()
+            conn.executemany(
+                "UPDATE jobs SET state = ?, worker = ?, lease_expires = ?, attempts = attempts + 1, "
+                "updated_at = ? WHERE id = ?",
+                ((LEASED, worker_id, now + self.visibility_timeout, now, row[0]) for row in rows)
+            )
+        return [Job(job_id, batch, url, attempts + 1) for job_id, batch, url, attempts in rows]
+
+    def heartbeat(self, job: Job, worker_id: str) -> bool:
+        now = time.time()
+        with self._lock, immediate_transaction(self._conn) as conn:
+            return conn.execute(
+                "UPDATE jobs SET lease_expires = ?, updated_at = ? "
+                "WHERE id = ? AND worker = ? AND state = ?",
+                (now + self.visibility_timeout, now, job.id, worker_id, LEASED)
+            ).rowcount == 1
+
+    def _finish(self, job: Job, worker_id: str, state: str, result: ScrapedResult) -> bool:
+        # A job whose lease expired but was not re-leased yet can still be finished
+        with self._lock, immediate_transaction(self._conn) as conn:
+            return conn.execute(
+                "UPDATE jobs SET state = ?, result = ?, error = ?, worker = NULL, "
+                "lease_expires = NULL, updated_at = ? "
+                "WHERE id = ? AND ((state = ? AND worker = ?) OR state = ?)",
+                (state, result.model_dump_json(),
+                 result.error_message, time.time(), job.id, LEASED, worker_id, QUEUED)
+            ).rowcount == 1
+
+    def complete(self, job: Job, worker_id: str, result: ScrapedResult) -> bool:
+        return self._finish(job, worker_id, DONE, result)
+
+    def fail(self, job: Job, worker_id: str, result: ScrapedResult) -> bool:
+        return self._finish(job, worker_id, FAILED if job.attempts >= self.max_attempts else QUEUED, result)
+
+    def counts(self, batch: Optional[str] = None) -> Dict[str, int]:
+        query = "SELECT state, COUNT(*) FROM jobs"
+        params: tuple = ()
+        if batch:
+            query += " WHERE batch = ?"
+            params = (batch,)
+        with self._lock:
+            return dict(self._conn.execute(query + " GROUP BY state", params).fetchall())
+
+    def results(self, batch: str) -> Iterator[ScrapedResult]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT result FROM jobs WHERE batch = ? AND result IS NOT NULL ORDER BY id", (batch,)
+            ).fetchall()
+        for (result,) in rows:
+            yield ScrapedResult.model_validate_json(result)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class LeaseKeeper:
+    """Background heartbeats for the jobs a worker is holding"""
+
+    def __init__(self, queue: WorkQueue, worker_id: str, interval: float):
+        self.queue = queue
+        self.worker_id = worker_id
+        self.interval = interval
+        self.logger = logging.getLogger(__name__)
+        self._jobs: Dict[int, Job] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._beat, name="lease-keeper", daemon=True)
+        self._thread.start()
+
+    def hold(self, job: Job):
+        with self._lock:
+            self._jobs[job.id] = job
+
+    def release(self, job: Job):
+        with self._lock:
+            self._jobs.pop(job.id, None)
+
+    def _beat(self):
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                jobs = list(self._jobs.values())
+            for job in jobs:
+                try:
+                    if not self.queue.heartbeat(job, self.worker_id):
+                        self.logger.warning(f"Lease on job {job.id} was lost: {job.url}")
+                        self.release(job)
+                except Exception as e:
+                    self.logger.warning(f"Heartbeat failed for job {job.id}: {e}")
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+
+def open_work_queue(config: dict) -> WorkQueue:
+    queue_config = config.get('queue', {})
+    backend = queue_config.get('backend', 'sqlite')
+    if backend != 'sqlite':
+        raise ValueError(f"Unknown queue backend: {backend}")
+    return SqliteWorkQueue(
+        path=queue_config.get('path', "data/queue/queue.sqlite3"),
+        visibility_timeout=queue_config.get('visibility_timeout', 300),
+        max_attempts=queue_config.get('max_attempts', 3)
+    )
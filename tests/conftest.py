@@ -0,0 +1,64 @@
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+
+class StandInProxy:
+    """
+    Local forward proxy that answers every proxied request itself: a plain
+    page, an error status, a captcha page or a slow response, as set by
+    ``status``, ``body`` and ``delay``. ``requests`` records the absolute
+    URLs it was asked for.
+    """
+
+    def __init__(self, status: int = 200, body: str = "<html><title>ok</title></html>", delay: float = 0.0):
+        self.status = status
+        self.body = body
+        self.delay = delay
+        self.requests = []
+        proxy = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                proxy.requests.append(self.path)
+                if proxy.delay:
+                    time.sleep(proxy.delay)
+                payload = proxy.body.encode('utf-8')
+                self.send_response(proxy.status)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stand_in_proxy():
+    """Factory for local stand-in proxies, shut down after the test"""
+    proxies = []
+
+    def start(**kwargs) -> StandInProxy:
+        proxy = StandInProxy(**kwargs)
+        proxies.append(proxy)
+        return proxy
+
+    yield start
+    for proxy in proxies:
+        proxy.close()
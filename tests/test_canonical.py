@@ -0,0 +1,14 @@
+from canonical import canonical_url, product_key
+
+
+def test_keywords_stripped_from_product_pages_only():
+    search = "https://www.amazon.com/s?keywords=usb+cable&qid=1700000000&ref=sr_pg_1"
+    assert canonical_url(search, 'amazon') == "https://www.amazon.com/s?keywords=usb+cable"
+    assert product_key(search, 'amazon') != product_key(
+        "https://www.amazon.com/s?keywords=hdmi+cable", 'amazon')
+
+    # A product page without a full ASIN still drops the carried-over search terms
+    product = "https://www.amazon.com/gp/product/B0BAD/?keywords=usb+cable&color=red"
+    assert canonical_url(product, 'amazon') == "https://www.amazon.com/gp/product/B0BAD?color=red"
+    assert canonical_url("https://www.amazon.com/dp/B09XYZ1234?keywords=usb", 'amazon') == \
+        "https://www.amazon.com/dp/B09XYZ1234"
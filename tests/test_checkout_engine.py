@@ -0,0 +1,90 @@
+import pytest
+
+from amazon_scraper import AmazonScraper
+from checkout_engine import CheckoutSettings, configure_checkout, scenario_name
+from failures import CHECKOUT_FAILED, ScrapeFailure, configure_failures
+from product_schema import CheckoutScenario, ProductData
+
+URL = "https://www.amazon.com/dp/B09XYZ1234"
+
+
+@pytest.fixture
+def checkout():
+    """Installs checkout settings for one test, without retry delays"""
+    configure_failures({'retries': {'delay': 0}})
+    yield lambda **settings: configure_checkout({'checkout': settings})
+    configure_checkout({})
+    configure_failures({})
+
+
+def test_sample_rate_is_stable_per_product():
+    settings = CheckoutSettings(sample_rate=0.3)
+    urls = [f"https://www.amazon.com/dp/B0{index:08d}" for index in range(2000)]
+    sampled = [url for url in urls if settings.should_simulate(url, 'amazon')]
+
+    assert 0.25 < len(sampled) / len(urls) < 0.35
+    # Another run, or another URL of the same product, makes the same choice
+    assert sampled == [url for url in urls if CheckoutSettings(sample_rate=0.3).should_simulate(url, 'amazon')]
+    variant = sampled[0].replace("https://www.amazon.com/", "https://amazon.com/Desk-Lamp/") + "?ref=sr_1_1"
+    assert settings.should_simulate(variant, 'amazon')
+    # A larger rate keeps every product the smaller one chose
+    assert all(CheckoutSettings(sample_rate=0.6).should_simulate(url, 'amazon') for url in sampled)
+
+
+def test_sample_rate_bounds_and_disabled():
+    assert CheckoutSettings(sample_rate=2).should_simulate(URL, 'amazon')
+    assert not CheckoutSettings(sample_rate=0).should_simulate(URL, 'amazon')
+    assert not CheckoutSettings(enabled=False).should_simulate(URL, 'amazon')
+    assert CheckoutSettings().tiers == {'below_threshold': 1, 'above_threshold': 5}
+
+
+def scraper_with(outcomes):
+    """AmazonScraper whose checkout tiers answer from ``outcomes`` (quantity -> errors to raise first)"""
+    scraper = AmazonScraper()
+    calls = []
+
+    def checkout_tier(quantity):
+        calls.append(quantity)
+        errors = outcomes.get(quantity, [])
+        if errors:
+            raise errors.pop(0)
+        return CheckoutScenario(scenario_name=scenario_name(quantity), delivery_options=[])
+
+    scraper._checkout_tier = checkout_tier
+    return scraper, calls
+
+
+def product():
+    return ProductData(name="Desk lamp", price="$20.00", product_url=URL, stock_status="In Stock")
+
+
+def test_every_configured_tier_becomes_a_scenario(checkout):
+    checkout(tiers={'single': 1, 'bulk': 5, 'pallet': 20})
+    scraper, calls = scraper_with({5: [ValueError("quantity box missing")]})
+
+    scenarios = scraper._simulate_checkout_scenarios(product())
+
+    # The failed tier is retried on its own; the others run once
+    assert calls == [1, 5, 5, 20]
+    assert {name: scenario.scenario_name for name, scenario in scenarios.items()} == \
+        {'single': "1_item", 'bulk': "5_items", 'pallet': "20_items"}
+    assert all(scenario.error_message is None for scenario in scenarios.values())
+
+
+def test_unretryable_failure_fails_the_remaining_tiers(checkout):
+    checkout(tiers={'single': 1, 'bulk': 5, 'pallet': 20})
+    no_cart = ScrapeFailure(CHECKOUT_FAILED, "Add to cart unavailable", 'checkout', retryable=False)
+    scraper, calls = scraper_with({1: [no_cart]})
+
+    scenarios = scraper._simulate_checkout_scenarios(product())
+
+    assert calls == [1]
+    assert [s.error_message for s in scenarios.values()] == ["Add to cart unavailable"] * 3
+    assert [s.scenario_name for s in scenarios.values()] == ["1_item", "5_items", "20_items"]
+
+
+def test_unsampled_products_skip_checkout(checkout):
+    checkout(sample_rate=0)
+    scraper, calls = scraper_with({})
+    assert scraper._simulate_checkout_scenarios(product()) == {}
+    assert calls == []
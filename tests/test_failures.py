@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+
+from failures import (BLOCKED, CHECKOUT_FAILED, DRIVER_CRASH, NAVIGATION_TIMEOUT, SELECTOR_MISS, UNKNOWN,
+                      CircuitBreaker, RetryPolicy, ScrapeFailure, classify)
+
+
+class Flaky:
+    """Raises the queued errors one per call, then returns ``value``"""
+
+    def __init__(self, *errors, value="ok"):
+        self.errors = list(errors)
+        self.value = value
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return self.value
+
+
+def test_classify_uses_crash_markers_then_the_stage():
+    assert classify(RuntimeError("Message: invalid session id"), 'extract') == DRIVER_CRASH
+    assert classify(RuntimeError("Target closed"), 'checkout') == DRIVER_CRASH
+    assert classify(TimeoutError("timed out"), 'navigate') == NAVIGATION_TIMEOUT
+    assert classify(ValueError("no title"), 'extract') == SELECTOR_MISS
+    assert classify(ValueError("no button"), 'checkout') == CHECKOUT_FAILED
+    assert classify(ValueError("odd")) == UNKNOWN
+    assert classify(ScrapeFailure(BLOCKED, "captcha"), 'extract') == BLOCKED
+
+
+def test_stage_is_retried_within_the_budget_of_its_kind():
+    policy = RetryPolicy(delay=0)
+    navigate = Flaky(TimeoutError("slow"), TimeoutError("slow"))
+    assert policy.run('navigate', navigate) == "ok"
+    assert navigate.calls == 3
+
+    extract = Flaky(ValueError("missing"), ValueError("missing"))
+    with pytest.raises(ScrapeFailure) as raised:
+        policy.run('extract', extract)
+    assert raised.value.kind == SELECTOR_MISS and extract.calls == 2
+
+
+def test_blocks_and_non_retryable_failures_are_not_retried():
+    policy = RetryPolicy(attempts={CHECKOUT_FAILED: 5}, delay=0)
+    blocked = Flaky(ScrapeFailure(BLOCKED, "captcha"))
+    with pytest.raises(ScrapeFailure):
+        policy.run('extract', blocked)
+    assert blocked.calls == 1
+
+    no_button = Flaky(ScrapeFailure(CHECKOUT_FAILED, "no add-to-cart button", retryable=False))
+    with pytest.raises(ScrapeFailure):
+        policy.run('checkout', no_button)
+    assert no_button.calls == 1
+
+
+def test_driver_crash_recovers_before_the_retry():
+    policy = RetryPolicy(delay=0)
+    relaunched = []
+    extract = Flaky(RuntimeError("chrome not reachable"))
+    assert policy.run('extract', extract, recover=lambda: relaunched.append(extract.calls)) == "ok"
+    assert relaunched == [1]
+
+    # A selector miss is retried without relaunching the browser
+    extract = Flaky(ValueError("missing"))
+    assert policy.run('extract', extract, recover=lambda: relaunched.append("again")) == "ok"
+    assert relaunched == [1]
+
+
+def test_run_async_recovers_from_a_crash():
+    policy = RetryPolicy(delay=0)
+    relaunched = []
+    crash = Flaky(RuntimeError("Page crashed"))
+
+    async def stage():
+        return crash()
+
+    async def recover():
+        relaunched.append(True)
+
+    assert asyncio.run(policy.run_async('navigate', stage, recover=recover)) == "ok"
+    assert relaunched == [True]
+
+
+def test_breaker_trips_doubles_its_cooldown_and_resets_on_success():
+    breaker = CircuitBreaker(threshold=2, window=60, cooldown=10, max_cooldown=15, max_trips=5)
+    url = "https://www.shop.test/item/1"
+
+    breaker.record(url, blocked=True)
+    assert breaker.paused_for(url) == 0
+    breaker.record(url, blocked=True)
+    assert 9 < breaker.paused_for(url) <= 10
+    assert breaker.paused_for("https://other.test/item/1") == 0
+
+    # After a trip a single block reopens the circuit for twice as long, up to max_cooldown
+    breaker.record(url, blocked=True)
+    assert 14 < breaker.paused_for(url) <= 15
+
+    # A success resets the trips: the next lone block no longer extends the pause
+    breaker.record(url, blocked=False, success=True)
+    paused = breaker.paused_for(url)
+    breaker.record(url, blocked=True)
+    assert breaker.paused_for(url) <= paused
+
+
+def test_breaker_abandons_a_store_after_max_trips():
+    breaker = CircuitBreaker(threshold=1, cooldown=10, max_trips=2)
+    url = "https://shop.test/item/1"
+
+    breaker.record(url, blocked=True)
+    assert not breaker.abandoned(url)
+    breaker.record(url, blocked=True)
+    assert breaker.abandoned("https://www.shop.test/item/2")
+    # Abandoned stores fail fast instead of waiting out the cooldown
+    assert breaker.paused_for(url) == 0
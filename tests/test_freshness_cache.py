@@ -0,0 +1,106 @@
+import time
+
+from freshness_cache import FreshnessCache
+from product_schema import ProductData, ScrapedResult
+
+URL = "https://www.shop.test/item/1"
+SELECTORS = {'shop': {'product_name': ["h1"], 'price': [".price"]}}
+
+
+def page(price: str) -> str:
+    return f"<html><body><h1>Desk lamp</h1><span class='price'>{price}</span></body></html>"
+
+
+class Response:
+    def __init__(self, status_code, text="", headers=None):
+        self.status_code = status_code
+        self.text = text
+        self.content = text.encode('utf-8')
+        self.headers = headers or {}
+
+
+class StubFetcher:
+    """Answers probes with ``response`` and records the headers they sent"""
+
+    def __init__(self, response=None):
+        self.response = response
+        self.requests = []
+
+    def get(self, url, headers=None):
+        self.requests.append(headers or {})
+        return self.response
+
+
+def result(price: str = "$20.00") -> ScrapedResult:
+    return ScrapedResult(store="shop.test", url=URL, product=ProductData(
+        name="Desk lamp", price=price, product_url=URL, stock_status="In Stock"))
+
+
+def open_cache(tmp_path, fetcher, ttl=3600):
+    return FreshnessCache(str(tmp_path / "freshness.sqlite3"), default_ttl=ttl,
+                          fetcher=fetcher, selectors=SELECTORS)
+
+
+def expire(cache):
+    with cache._conn:
+        cache._conn.execute("UPDATE products SET checked_at = ?", (time.time() - 7200,))
+
+
+def test_cold_cache_does_not_probe_and_fresh_entries_are_served(tmp_path):
+    fetcher = StubFetcher(Response(200, page("$20.00")))
+    cache = open_cache(tmp_path, fetcher)
+
+    assert cache.lookup(URL, 'shop') is None
+    assert fetcher.requests == []
+
+    cache.store(URL, 'shop', result())
+    cached = cache.lookup("https://shop.test/item/1?utm_source=mail", 'shop')
+    assert cached.product.price == "$20.00" and cached.url.endswith("utm_source=mail")
+    assert fetcher.requests == [] and cache.hits == 1
+    cache.close()
+
+
+def test_expired_entry_is_revalidated_by_etag(tmp_path):
+    fetcher = StubFetcher(Response(200, page("$20.00"), {'ETag': '"v1"'}))
+    cache = open_cache(tmp_path, fetcher)
+    cache.store(URL, 'shop', result())
+    expire(cache)
+
+    # First expiry: nothing to compare with yet, so the page is scraped and the probe kept
+    assert cache.lookup(URL, 'shop') is None
+    cache.store(URL, 'shop', result())
+    expire(cache)
+
+    fetcher.response = Response(304)
+    assert cache.lookup(URL, 'shop').product.price == "$20.00"
+    assert fetcher.requests[-1] == {'If-None-Match': '"v1"'}
+    assert cache.probe_hits == 1
+    # Renewed: served from the TTL again without another probe
+    assert cache.lookup(URL, 'shop') is not None and len(fetcher.requests) == 2
+    cache.close()
+
+
+def test_fingerprint_decides_without_validators(tmp_path):
+    fetcher = StubFetcher(Response(200, page("$20.00")))
+    cache = open_cache(tmp_path, fetcher)
+    cache.store(URL, 'shop', result())
+    expire(cache)
+    assert cache.lookup(URL, 'shop') is None
+    cache.store(URL, 'shop', result())
+    expire(cache)
+
+    # Same name and price: unchanged
+    assert cache.lookup(URL, 'shop') is not None
+
+    expire(cache)
+    fetcher.response = Response(200, page("$18.00"))
+    assert cache.lookup(URL, 'shop') is None
+    cache.close()
+
+
+def test_expired_entry_without_probe_needs_a_scrape(tmp_path):
+    cache = open_cache(tmp_path, StubFetcher(Response(304)), ttl=0.1)
+    cache.store(URL, 'shop', result())
+    time.sleep(0.15)
+    assert cache.lookup(URL, 'shop', probe=False) is None
+    cache.close()
@@ -0,0 +1,23 @@
+from http_scraper import StaticScraper
+from proxy_pool import ProxyUnavailable
+
+
+class StubFetcher:
+    """Answers every fetch with ``response``, or raises it if it is an exception"""
+
+    def __init__(self, response):
+        self.response = response
+
+    def fetch(self, url):
+        if isinstance(self.response, Exception):
+            raise self.response
+        return self.response
+
+
+def test_unusable_pages_leave_the_url_to_the_browser():
+    url = "https://www.shop.test/item/1"
+    for response in [ProxyUnavailable("every proxy is cooling down"),
+                     (200, "   \n ", url),
+                     (503, "<html></html>", url)]:
+        scraper = StaticScraper(fetcher=StubFetcher(response))
+        assert scraper.scrape(url, 'shop', 'shop.test') == (None, ['product_name', 'price'])
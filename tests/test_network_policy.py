@@ -0,0 +1,54 @@
+import logging
+
+import network_policy
+from network_policy import ResourcePolicy, apply_to_driver, configure_network_policies
+
+
+class RecordingDriver:
+    """Stands in for a Selenium driver and records its CDP commands"""
+
+    def __init__(self):
+        self.commands = []
+
+    def execute_cdp_cmd(self, command, params):
+        self.commands.append((command, params))
+
+
+def blocked_urls(driver):
+    return dict(driver.commands)["Network.setBlockedURLs"]["urls"]
+
+
+def test_playwright_decision_uses_resource_type_and_allow_list():
+    policy = ResourcePolicy(['image'], ['*doubleclick.net*'], ['*cdn.shop.test/product/*'])
+
+    assert policy.blocks("https://cdn.shop.test/x", 'image')
+    assert not policy.blocks("https://cdn.shop.test/product/1", 'image')
+    assert policy.blocks("https://ad.doubleclick.net/x.js", 'script')
+    assert not policy.blocks("https://shop.test/app.js", 'script')
+
+
+def test_selenium_deny_list_drops_only_identical_allow_entries():
+    policy = ResourcePolicy(['image'], ['*doubleclick.net*'], ['*.svg*', '*cdn.shop.test/product/*'])
+
+    patterns = policy.blocked_url_patterns()
+    assert '*.svg*' not in patterns and '*.png*' in patterns and '*doubleclick.net*' in patterns
+    assert policy.unenforced_allow_patterns() == ['*cdn.shop.test/product/*']
+
+
+def test_unenforced_allow_patterns_are_logged_once_per_platform(caplog, monkeypatch):
+    monkeypatch.setattr(network_policy, '_warned_platforms', set())
+    configure_network_policies({
+        'browser': {'block_resources': {'types': ['image'], 'deny': []}},
+        'platforms': {'amazon': {'block_resources': {'allow': ['*m.media-amazon.com/images/I/*']}}},
+    })
+
+    with caplog.at_level(logging.WARNING, logger='network_policy'):
+        first, second = RecordingDriver(), RecordingDriver()
+        apply_to_driver(first, 'amazon')
+        apply_to_driver(second, 'amazon')
+        apply_to_driver(RecordingDriver(), 'ebay')
+
+    assert '*.jpg*' in blocked_urls(first) and blocked_urls(first) == blocked_urls(second)
+    warnings = [record.getMessage() for record in caplog.records]
+    assert len(warnings) == 1 and 'm.media-amazon.com' in warnings[0]
+    configure_network_policies({'browser': {'block_resources': {'enabled': False}}})
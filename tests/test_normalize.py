@@ -0,0 +1,37 @@
+import math
+
+from normalize import normalize_columns, normalize_ratings, normalize_reviews
+from utils import parse_rating, parse_reviews
+
+
+def test_price_without_amount_has_no_currency():
+    urls = ["https://www.amazon.ca/dp/B000000001"] * 3
+    columns = normalize_columns({
+        'price': ["", "CDN$ 12.99", None],
+        'discount_price': [None, None, "$10.00"],
+        'delivery_price': ["FREE", None, None],
+        'rating': [None] * 3,
+        'reviews': [None] * 3,
+        'product_url': urls,
+    })
+
+    assert list(columns['currency_code']) == [None, 'CAD', None]
+    assert math.isnan(columns['price_value'][0])
+    # The store's country still resolves "$" on a discount next to a missing price
+    assert columns['discount_price_value'][2] == 10.0
+
+
+RATINGS = ["4.5 out of 5 stars", "4,5 von 5", "9/10", "4 out of 5", "3.8", "", None, "no rating"]
+REVIEWS = ["1,234 ratings", "1.2K ratings", "2,5k", "3M", "12 345 avis", "1.234.567", "no reviews", "", None]
+
+
+def as_text(value, digits):
+    return None if math.isnan(value) else str(round(value, 2) if digits else int(value))
+
+
+def test_scalar_parsers_agree_with_the_vectorized_ones():
+    assert [parse_rating(text) for text in RATINGS] == \
+        [as_text(value, True) for value in normalize_ratings(RATINGS)]
+    assert [parse_reviews(text) for text in REVIEWS] == \
+        [as_text(value, False) for value in normalize_reviews(REVIEWS)]
+    assert parse_rating("9/10") == "4.5" and parse_reviews("1.2K ratings") == "1200"
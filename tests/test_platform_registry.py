@@ -0,0 +1,21 @@
+from platform_registry import BUILTIN_PLATFORMS, Platform, PlatformRegistry
+
+
+def test_hosts_resolve_by_domain_not_by_label_alone():
+    registry = PlatformRegistry(BUILTIN_PLATFORMS)
+
+    assert registry.platform_of("https://smile.amazon.co.uk/dp/B000000001") == 'amazon'
+    assert registry.platform_of("https://www.amazon.com.ng/dp/B000000001") == 'amazon'
+    assert registry.platform_of("https://www.ebay.co.ke/itm/1") == 'ebay'
+    assert registry.platform_of("https://amazon.evil.com/dp/B000000001") is None
+    assert registry.platform_of("https://shop.amazon.evil.co.uk/dp/B000000001") is None
+    assert registry.platform_of("https://www.notamazon.com/dp/B000000001") is None
+
+
+def test_config_domains_extend_the_known_suffixes():
+    registry = PlatformRegistry(BUILTIN_PLATFORMS)
+    assert registry.platform_of("https://www.amazon.com.be/dp/B000000001") is None
+
+    registry.register(Platform('amazon', ['amazon.com.be']))
+    assert registry.platform_of("https://www.amazon.com.be/dp/B000000001") == 'amazon'
+    assert registry.platform_of("https://www.ebay.com.be/itm/1") == 'ebay'
@@ -0,0 +1,67 @@
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager
+
+import playwright_backend
+from playwright_backend import PlaywrightRunner
+from scheduler import DomainLimit, DomainScheduler
+
+
+class StandInBrowser:
+    async def close(self):
+        pass
+
+
+@asynccontextmanager
+async def stand_in_playwright():
+    class Chromium:
+        async def launch(self, **kwargs):
+            return StandInBrowser()
+
+    class Playwright:
+        chromium = Chromium()
+
+    yield Playwright()
+
+
+class CountingRunner(PlaywrightRunner):
+    """Runner whose pages just sleep, counting how many are open at once"""
+
+    def __init__(self, scheduler, max_contexts):
+        super().__init__(lambda url, page: None, scheduler, max_contexts=max_contexts)
+        self.open = 0
+        self.peak = 0
+
+    async def _scrape_one(self, browser, url):
+        self.open += 1
+        self.peak = max(self.peak, self.open)
+        await asyncio.sleep(0.05)
+        self.open -= 1
+        return self._failed_result(url, "shop", "stand-in")
+
+
+def test_contexts_are_bounded_and_on_result_runs_off_the_loop(monkeypatch):
+    monkeypatch.setattr(playwright_backend, 'async_playwright', stand_in_playwright)
+    scheduler = DomainScheduler(default_limit=DomainLimit(max_concurrency=10),
+                                key_func=lambda url: url.split('/')[2])
+    runner = CountingRunner(scheduler, max_contexts=3)
+    urls = [f"https://shop{i % 2}.test/item/{i}" for i in range(12)]
+    reported = []
+    loop_threads = set()
+
+    def on_result(index, result):
+        loop_threads.add(threading.current_thread())
+        # A slow sink write must not hold up the pages in flight
+        time.sleep(0.05)
+        reported.append(index)
+
+    started = time.monotonic()
+    results = runner.scrape_urls(urls, on_result=on_result)
+
+    assert runner.peak == 3
+    assert sorted(reported) == list(range(12))
+    assert [result.url for result in results] == urls
+    assert threading.current_thread() not in loop_threads
+    # Reports run in parallel with other pages; on the loop they alone would take 0.6s
+    assert time.monotonic() - started < 0.55
@@ -0,0 +1,89 @@
+from datetime import datetime
+
+from canonical import product_key
+from price_history import DELIVERY, PRICE, STOCK_STATUS, PriceHistory
+from product_schema import CheckoutScenario, DeliveryOption, ProductData, ScrapedResult
+from result_sink import NdjsonSink
+
+URL = "https://www.shop.test/item/1"
+KEY = product_key(URL)
+
+
+def snapshot(day: int, price: str = "$1,299.99", stock: str = "In Stock", options=None,
+             scenario_error=None) -> ScrapedResult:
+    scenarios = {}
+    if options is not None or scenario_error:
+        scenarios['standard'] = CheckoutScenario(
+            scenario_name='standard', error_message=scenario_error,
+            delivery_options=[DeliveryOption(company=company, type=kind, price=cost, eta="2 days")
+                              for company, kind, cost in options or []])
+    return ScrapedResult(store="shop.test", url=URL, timestamp=datetime(2026, 3, day), scenarios=scenarios,
+                         product=ProductData(name="Desk lamp", price=price, product_url=URL, stock_status=stock))
+
+
+def open_history(tmp_path) -> PriceHistory:
+    return PriceHistory(str(tmp_path / "history.sqlite3"))
+
+
+def test_formatting_only_price_changes_are_not_recorded(tmp_path):
+    history = open_history(tmp_path)
+    assert history.ingest([snapshot(1, "$1,299.99")]) == 2
+    assert history.ingest([snapshot(2, "$1299.99"), snapshot(3, "USD 1,299.99")]) == 0
+
+    assert history.ingest([snapshot(4, "$1,199.99", stock="Out of Stock")]) == 2
+    changes = history.history(KEY, start=datetime(2026, 3, 2))
+    assert [(c.field, c.old_value, c.new_value) for c in changes] == [
+        (PRICE, "$1,299.99", "$1,199.99"), (STOCK_STATUS, "In Stock", "Out of Stock")]
+    assert changes[0].amount == 1199.99 and changes[0].currency == "USD"
+    history.close()
+
+
+def test_ingesting_a_stream_twice_is_idempotent(tmp_path):
+    path = str(tmp_path / "results.ndjson")
+    with NdjsonSink(path) as sink:
+        sink.write(0, snapshot(1, "$20.00"))
+        sink.write(1, snapshot(2, "$18.00"))
+    history = open_history(tmp_path)
+
+    assert history.ingest_stream(path) == 3
+    assert history.ingest_stream(path) == 0
+    assert [c.new_value for c in history.history(KEY, fields=[PRICE])] == ["$20.00", "$18.00"]
+    # An older snapshot arriving late does not rewrite the current state
+    assert history.ingest([snapshot(1, "$25.00")]) == 0
+    assert {c.field: c.new_value for c in history.state_at(KEY)} == {PRICE: "$18.00", STOCK_STATUS: "In Stock"}
+    history.close()
+
+
+def test_delivery_option_removed_in_a_completed_scenario_is_recorded(tmp_path):
+    history = open_history(tmp_path)
+    history.ingest([snapshot(1, options=[("UPS", "Standard", "$5.00"), ("DHL", "Express", "$15.00")])])
+
+    # A failed checkout says nothing about which options are still offered
+    assert history.ingest([snapshot(2, scenario_error="Checkout timed out")]) == 0
+    assert history.ingest([snapshot(3, options=[("UPS", "Standard", "$5.00")])]) == 1
+
+    removed = history.history(KEY, fields=[DELIVERY])[-1]
+    assert (removed.scenario, removed.company, removed.delivery_type) == ('standard', "DHL", "Express")
+    assert (removed.old_value, removed.new_value) == ("$15.00", None)
+    assert [c.company for c in history.state_at(KEY) if c.field == DELIVERY] == ["UPS"]
+    history.close()
+
+
+def test_feed_resumes_from_each_consumers_cursor(tmp_path):
+    history = open_history(tmp_path)
+    history.ingest([snapshot(1, "$20.00"), snapshot(2, "$19.00"), snapshot(3, "$18.00")])
+
+    pages = history.feed('alerts', limit=2)
+    first = next(pages)
+    assert [c.new_value for c in first] == ["$20.00", "In Stock"]
+    # Stopping before the next page leaves the cursor before the unfinished page
+    assert history.cursor('alerts') == 0
+    second = next(pages)
+    assert history.cursor('alerts') == first[-1].seq
+    pages.close()
+
+    assert [c.new_value for page in history.feed('alerts', limit=2) for c in page] == ["$19.00", "$18.00"]
+    assert history.cursor('alerts') == second[-1].seq
+    assert list(history.feed('alerts')) == []
+    assert sum(len(page) for page in history.feed('reports')) == 4
+    history.close()
@@ -0,0 +1,18 @@
+import pytest
+
+from product_schema import CheckoutScenario, DeliveryOption, ProductData, ScrapedResult
+from records import CheckoutScenarioRecord, DeliveryOptionRecord, ProductRecord, ResultRecord
+
+
+@pytest.mark.parametrize("record, model", [
+    (DeliveryOptionRecord, DeliveryOption),
+    (CheckoutScenarioRecord, CheckoutScenario),
+    (ProductRecord, ProductData),
+    (ResultRecord, ScrapedResult),
+])
+def test_records_mirror_the_model_fields(record, model):
+    """A field added to a model must be added to its record, or reading streams drops it"""
+    assert set(record.__annotations__) == set(model.model_fields)
+    # Records may require more: defaulted fields such as timestamps are always dumped
+    required = {name for name, field in model.model_fields.items() if field.is_required()}
+    assert required <= set(record.__required_keys__)
@@ -0,0 +1,64 @@
+import time
+
+from product_schema import ProductData, ScrapedResult
+from records import read_batches
+from result_sink import NdjsonSink, input_order, iter_results
+
+
+def result(index: int) -> ScrapedResult:
+    url = f"https://shop.test/item/{index}"
+    return ScrapedResult(store="shop", url=url, product=ProductData(
+        name=f"Product {index}", price="$1.00", product_url=url, stock_status="In Stock"))
+
+
+def test_results_are_written_without_waiting_for_earlier_ones(tmp_path):
+    path = str(tmp_path / "results.ndjson")
+    durable = []
+    sink = NdjsonSink(path, flush_every=1, fsync_interval=0, on_durable=durable.extend)
+    # Input 0 is still being scraped; 1 and 2 reach the disk anyway
+    sink.write(2, result(2))
+    sink.write(1, result(1))
+    assert [index for index, _, _ in durable] == [2, 1]
+    assert [item.product.name for item in iter_results(path)] == ["Product 2", "Product 1"]
+
+    sink.write(0, result(0))
+    sink.close()
+    assert [item.product.name for item in iter_results(path, input_order(path))] == \
+        ["Product 0", "Product 1", "Product 2"]
+
+
+def test_input_order_keeps_latest_line_and_skips_torn_ones(tmp_path):
+    path = str(tmp_path / "results.ndjson")
+    with NdjsonSink(path) as sink:
+        sink.write(1, result(1))
+        sink.write(0, result(0))
+    with open(path, 'ab') as f:
+        f.write(b'{"index":2,"sto')
+    # A resumed run appends after the torn line; index 1 was scraped again
+    with NdjsonSink(path) as sink:
+        sink.write(1, result(11))
+
+    batch = next(read_batches(path, input_order(path)))
+    assert batch.column('name') == ("Product 0", "Product 11")
+
+
+def test_results_below_the_batch_size_become_durable_on_time(tmp_path):
+    path = str(tmp_path / "results.ndjson")
+    durable = []
+    sink = NdjsonSink(path, flush_every=20, fsync_interval=0.2, on_durable=durable.extend)
+    sink.write(0, result(0))
+    sink.write(1, result(1))
+    assert durable == []
+
+    # No further write and no close: the interval alone makes them durable
+    deadline = time.monotonic() + 5
+    while len(durable) < 2 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert sorted(index for index, _, _ in durable) == [0, 1]
+    assert [item.product.name for item in iter_results(path)] == ["Product 0", "Product 1"]
+
+    # A slow run: each write after the interval has passed goes straight to disk
+    time.sleep(0.25)
+    sink.write(2, result(2))
+    assert [index for index, _, _ in durable][-1] == 2
+    sink.close()
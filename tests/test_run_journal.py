@@ -0,0 +1,15 @@
+from run_journal import DONE, RunJournal
+
+
+def test_add_urls_extends_an_existing_run(tmp_path):
+    journal = RunJournal(str(tmp_path / "journal.sqlite3"))
+    journal.start_run("run-products", ["https://shop.test/a", "https://shop.test/b"])
+    journal.mark_written("run-products", [(0, 0, True)])
+
+    added = journal.add_urls("run-products", ["https://shop.test/b", "https://shop.test/c",
+                                              "https://shop.test/c"])
+
+    assert added == 1
+    assert journal.unfinished("run-products") == [(1, "https://shop.test/b"), (2, "https://shop.test/c")]
+    assert journal.summary("run-products") == {DONE: 1, 'pending': 2}
+    journal.close()
@@ -0,0 +1,23 @@
+import threading
+
+from scheduler import DomainLimit, DomainScheduler
+
+
+def test_slow_on_result_does_not_block_other_workers():
+    scheduler = DomainScheduler(default_limit=DomainLimit(max_concurrency=2), key_func=lambda url: 'shop')
+    first_reported = threading.Event()
+    second_reported = threading.Event()
+
+    def on_result(index, result):
+        if index == 0:
+            first_reported.set()
+            # Holds its callback until the other worker has reported too
+            assert second_reported.wait(5)
+        else:
+            assert first_reported.wait(5)
+            second_reported.set()
+
+    results = scheduler.run(["a", "b"], str.upper, workers=2, on_result=on_result)
+
+    assert results == ["A", "B"]
+    assert second_reported.is_set()
@@ -0,0 +1,86 @@
+import asyncio
+import io
+import random
+import threading
+
+from PIL import Image
+
+from amazon_playwright_scraper import AmazonPlaywrightScraper
+from screenshot_store import HashIndex, close_screenshots, configure_screenshots, get_screenshot_store, hamming
+
+
+def brute_force(known, digest, max_distance):
+    return any(hamming(digest, other) <= max_distance for other in known)
+
+
+def test_band_index_finds_exactly_what_a_full_scan_finds():
+    rng = random.Random(7)
+    bits, max_distance = 256, 3
+    index = HashIndex(bits, max_distance)
+    known = [rng.getrandbits(bits) for _ in range(500)]
+    for digest in known:
+        index.add(digest, f"{digest:064x}.webp")
+
+    queries = []
+    for digest in rng.sample(known, 100):
+        # Flip up to five bits: some stay within the distance, some don't
+        for flips in range(6):
+            query = digest
+            for bit in rng.sample(range(bits), flips):
+                query ^= 1 << bit
+            queries.append(query)
+    queries += [rng.getrandbits(bits) for _ in range(100)]
+
+    for digest in queries:
+        found = index.find(digest)
+        assert (found is not None) == brute_force(known, digest, max_distance)
+        if found:
+            assert hamming(int(found.split('.')[0], 16), digest) <= max_distance
+
+
+def test_small_hashes_and_large_distances():
+    index = HashIndex(8, 5)
+    index.add(0b11110000, "a")
+    assert index.find(0b11111111) == "a"
+    assert index.find(0b00001111) is None
+    assert HashIndex(4, 4).find(0) is None
+
+
+class StubPage:
+    url = "https://www.amazon.com/dp/B09XYZ1234"
+
+    async def screenshot(self) -> bytes:
+        buffer = io.BytesIO()
+        Image.new('RGB', (32, 32), 'white').save(buffer, format='PNG')
+        return buffer.getvalue()
+
+
+def test_capture_waits_for_a_full_writer_off_the_event_loop(tmp_path):
+    configure_screenshots({'screenshots': {'queue_size': 1}, 'output': {'screenshots_dir': str(tmp_path)}})
+    store = get_screenshot_store()
+    release = threading.Event()
+    write = store._write
+    store._write = lambda png, path: release.wait(5) and write(png, path)
+    scraper = AmazonPlaywrightScraper(StubPage())
+
+    async def capture_while_full():
+        png = await StubPage().screenshot()
+        # One capture being written and one waiting: the queue is full
+        store.submit(png, "busy")
+        store.submit(png, "waiting")
+        ticks = 0
+        capture = asyncio.ensure_future(scraper.capture_screenshot("checkout"))
+        while ticks < 10:
+            await asyncio.sleep(0.01)
+            ticks += 1
+        assert not capture.done()
+        release.set()
+        return await capture
+
+    try:
+        path = asyncio.run(capture_while_full())
+        store.flush()
+        assert path.startswith(str(tmp_path)) and store.captures == 3
+    finally:
+        release.set()
+        close_screenshots()
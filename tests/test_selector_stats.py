@@ -0,0 +1,71 @@
+from selector_stats import SelectorStats
+
+
+def hit(selector):
+    return {'value': "Desk lamp", 'selector': selector}
+
+
+def open_stats(tmp_path, **kwargs) -> SelectorStats:
+    return SelectorStats(str(tmp_path / "selector_stats.json"), autosave_every=0, **kwargs)
+
+
+def test_smoothed_hit_rate_orders_selectors(tmp_path):
+    stats = open_stats(tmp_path)
+    plan = {'product_name': {'selectors': ["h1.old", "h1.title", "h1"]}}
+    selectors = ["h1.old", "h1.title", "h1", "h1.unseen"]
+
+    # Unseen selectors keep the configured order
+    assert stats.order('shop', 'product_name', selectors) == (selectors, [])
+
+    stats.record('shop', plan, {'product_name': hit("h1.title")})
+    # h1.old: 0/1, h1.title: 1/1, h1 was never evaluated
+    assert stats.order('shop', 'product_name', selectors)[0] == ["h1.title", "h1", "h1.unseen", "h1.old"]
+
+    # One lucky hit does not outrank a long record: 2/2 -> 0.75, 9/10 -> ~0.83
+    for _ in range(9):
+        stats.record('shop', {'product_name': {'selectors': ["h1"]}}, {'product_name': hit("h1")})
+    stats.record('shop', {'product_name': {'selectors': ["h1"]}}, {})
+    stats.record('shop', plan, {'product_name': hit("h1.title")})
+    assert stats.order('shop', 'product_name', selectors)[0][:2] == ["h1", "h1.title"]
+
+
+def test_selectors_missing_in_a_row_go_stale_until_they_hit(tmp_path):
+    stats = open_stats(tmp_path, stale_after=3)
+    plan = {'price': {'selectors': [".price-old"], 'fallback': [".price"]}}
+
+    for _ in range(3):
+        stats.record('shop', plan, {'price': hit(".price")})
+    assert stats.order('shop', 'price', [".price-old", ".price"]) == ([".price"], [".price-old"])
+
+    stats.record('shop', plan, {'price': hit(".price-old")})
+    assert stats.order('shop', 'price', [".price-old", ".price"])[1] == []
+
+
+def test_all_stale_selectors_stay_on_the_hot_path(tmp_path):
+    stats = open_stats(tmp_path, stale_after=2)
+    plan = {'sku': {'selectors': [".sku", "[itemprop=sku]"]}}
+    for _ in range(2):
+        stats.record('shop', plan, {})
+    assert stats.order('shop', 'sku', [".sku", "[itemprop=sku]"]) == ([".sku", "[itemprop=sku]"], [])
+
+
+def test_multiple_fields_only_evaluate_fallbacks_when_hot_selectors_miss(tmp_path):
+    stats = open_stats(tmp_path, stale_after=1)
+    plan = {'image': {'multiple': True, 'selectors': ["img.main"], 'fallback': ["img"]}}
+
+    stats.record('shop', plan, {'image': [{'value': "a.jpg", 'selector': "img.main"}]})
+    # The fallback was never evaluated, so it has not missed
+    assert stats.order('shop', 'image', ["img.main", "img"]) == (["img.main", "img"], [])
+
+    stats.record('shop', plan, {'image': [{'value': "a.jpg", 'selector': "img"}]})
+    assert stats.order('shop', 'image', ["img.main", "img"]) == (["img"], ["img.main"])
+
+
+def test_counts_persist_between_runs(tmp_path):
+    stats = open_stats(tmp_path)
+    stats.record('shop', {'price': {'selectors': [".a", ".b"]}}, {'price': hit(".b")})
+    stats.save()
+
+    reopened = open_stats(tmp_path)
+    assert reopened.order('shop', 'price', [".a", ".b"])[0] == [".b", ".a"]
+    assert reopened.order('other', 'price', [".a", ".b"])[0] == [".a", ".b"]
@@ -0,0 +1,70 @@
+import json
+
+from lxml import html
+
+from product_schema import StockStatus
+from structured_data import collect_from_tree, parse_structured, remaining_plan
+
+JSON_LD_PAGE = """
+<html><head>
+<script type="application/ld+json">{"@context": "https://schema.org", "@type": "BreadcrumbList"}</script>
+<script type="application/ld+json">
+{"@context": "https://schema.org", "@graph": [
+  {"@type": "WebPage", "name": "Lamps"},
+  {"@type": "Product", "name": " Desk lamp ", "sku": "DL-100", "brand": {"@type": "Brand", "name": "Lumen"},
+   "image": ["https://cdn.shop.test/lamp.jpg", {"url": "https://cdn.shop.test/lamp-2.jpg"}, "/relative.jpg"],
+   "aggregateRating": {"ratingValue": 4.6, "reviewCount": 1289},
+   "offers": {"@type": "Offer", "price": "29.99", "priceCurrency": "usd",
+              "availability": "https://schema.org/InStock", "seller": {"name": "Lumen Store"}}}
+]}
+</script>
+<script type="application/ld+json">{not json</script>
+</head><body><h1>Desk lamp</h1></body></html>
+"""
+
+NEXT_DATA = {"props": {"pageProps": {"product": {
+    "@type": "ProductGroup", "name": "Rain jacket", "productID": "RJ-7",
+    "offers": {"@type": "AggregateOffer", "lowPrice": 59, "priceCurrency": "EUR",
+               "offers": [{"availability": "http://schema.org/OutOfStock", "seller": "Outdoor GmbH"}]},
+}}}}
+
+
+def test_json_ld_product_in_a_graph():
+    blobs = collect_from_tree(html.fromstring(JSON_LD_PAGE))
+    assert len(blobs) == 3
+
+    assert parse_structured(blobs) == {
+        'name': "Desk lamp",
+        'price': "$29.99",
+        'currency': "USD",
+        'sku': "DL-100",
+        'brand': "Lumen",
+        'image_urls': ["https://cdn.shop.test/lamp.jpg", "https://cdn.shop.test/lamp-2.jpg"],
+        'stock_status': StockStatus.IN_STOCK,
+        'rating': "4.6",
+        'reviews': "1289",
+        'seller': "Lumen Store",
+    }
+
+
+def test_next_data_with_an_aggregate_offer():
+    page = (f'<html><body><script id="__NEXT_DATA__" type="application/json">{json.dumps(NEXT_DATA)}'
+            f'</script></body></html>')
+    fields = parse_structured(collect_from_tree(html.fromstring(page)))
+
+    assert fields == {
+        'name': "Rain jacket",
+        'price': "€59",
+        'currency': "EUR",
+        'sku': "RJ-7",
+        'stock_status': StockStatus.OUT_OF_STOCK,
+        'seller': "Outdoor GmbH",
+    }
+
+
+def test_pages_without_a_product_fall_back_to_selectors():
+    assert parse_structured(['{"@type": "Organization", "name": "Shop"}', 'null', '']) == {}
+
+    plan = {'product_name': {}, 'price': {}, 'description': {}, 'title_alt': {}}
+    assert remaining_plan(plan, {'name': "Desk lamp"}, aliases={'name': ['title_alt']}) == \
+        {'price': {}, 'description': {}}
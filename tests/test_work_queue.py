@@ -0,0 +1,99 @@
+import time
+
+from product_schema import ProductData, ScrapedResult
+from work_queue import DONE, FAILED, LEASED, QUEUED, SqliteWorkQueue
+
+
+def open_queue(tmp_path, **kwargs) -> SqliteWorkQueue:
+    return SqliteWorkQueue(str(tmp_path / "queue.sqlite3"), **kwargs)
+
+
+def result(url: str, success: bool = True) -> ScrapedResult:
+    product = ProductData(name="Desk lamp", price="$20.00", product_url=url, stock_status="In Stock")
+    return ScrapedResult(store="shop.test", url=url, product=product, success=success,
+                         error_message=None if success else "Navigation timeout")
+
+
+def test_enqueue_adds_each_product_once_per_batch(tmp_path):
+    queue = open_queue(tmp_path)
+    urls = [
+        "https://www.amazon.com/dp/B09XYZ1234",
+        "https://amazon.com/Desk-Lamp/dp/B09XYZ1234/ref=sr_1_1?keywords=lamp",
+        "https://www.amazon.com/dp/B01ABC5678",
+    ]
+
+    assert queue.enqueue("first", urls, platform_of=lambda url: 'amazon') == 2
+    assert queue.enqueue("first", urls[1:], platform_of=lambda url: 'amazon') == 0
+    assert queue.enqueue("second", urls[:1], platform_of=lambda url: 'amazon') == 1
+    assert queue.counts("first") == {QUEUED: 2}
+
+    jobs = queue.lease("worker-1", limit=5)
+    assert [job.url for job in jobs] == ["https://www.amazon.com/dp/B09XYZ1234",
+                                         "https://www.amazon.com/dp/B01ABC5678",
+                                         "https://www.amazon.com/dp/B09XYZ1234"]
+    queue.close()
+
+
+def test_leased_jobs_are_hidden_and_only_the_holder_heartbeats(tmp_path):
+    queue = open_queue(tmp_path, visibility_timeout=60)
+    queue.enqueue("batch", ["https://shop.test/item/1", "https://shop.test/item/2"])
+
+    first = queue.lease("worker-1")
+    second = queue.lease("worker-2")
+    assert [job.url for job in first + second] == ["https://shop.test/item/1", "https://shop.test/item/2"]
+    assert queue.lease("worker-3") == []
+
+    assert queue.heartbeat(first[0], "worker-1")
+    assert not queue.heartbeat(first[0], "worker-2")
+    assert not queue.complete(first[0], "worker-2", result(first[0].url))
+    assert queue.complete(first[0], "worker-1", result(first[0].url))
+    assert not queue.heartbeat(first[0], "worker-1")
+    assert queue.counts() == {DONE: 1, LEASED: 1}
+    assert [r.url for r in queue.results("batch")] == ["https://shop.test/item/1"]
+    queue.close()
+
+
+def test_expired_leases_are_requeued_until_max_attempts(tmp_path):
+    queue = open_queue(tmp_path, visibility_timeout=0.05, max_attempts=2)
+    queue.enqueue("batch", ["https://shop.test/item/1"])
+
+    first = queue.lease("worker-1")[0]
+    time.sleep(0.1)
+    # The crashed worker's lease ran out; another worker picks the job up
+    second = queue.lease("worker-2")[0]
+    assert second.id == first.id and second.attempts == 2
+    assert not queue.heartbeat(first, "worker-1")
+
+    time.sleep(0.1)
+    assert queue.requeue_expired() == 0
+    assert queue.counts() == {FAILED: 1}
+    assert queue.lease("worker-3") == []
+    queue.close()
+
+
+def test_failed_attempts_are_retried_then_recorded(tmp_path):
+    queue = open_queue(tmp_path, max_attempts=2)
+    queue.enqueue("batch", ["https://shop.test/item/1"])
+
+    job = queue.lease("worker-1")[0]
+    assert queue.fail(job, "worker-1", result(job.url, success=False))
+    assert queue.counts() == {QUEUED: 1}
+
+    job = queue.lease("worker-1")[0]
+    assert job.attempts == 2
+    assert queue.fail(job, "worker-1", result(job.url, success=False))
+    assert queue.counts() == {FAILED: 1}
+    assert [r.error_message for r in queue.results("batch")] == ["Navigation timeout"]
+    queue.close()
+
+
+def test_late_result_after_expiry_is_still_accepted(tmp_path):
+    queue = open_queue(tmp_path, visibility_timeout=0.05)
+    queue.enqueue("batch", ["https://shop.test/item/1"])
+
+    job = queue.lease("worker-1")[0]
+    time.sleep(0.1)
+    assert queue.requeue_expired() == 1
+    assert queue.complete(job, "worker-1", result(job.url))
+    assert queue.counts() == {DONE: 1}
+    queue.close()